@@ -6,13 +6,77 @@ import json
 from pathlib import Path
 from agents.utils import (
     get_anthropic_client,
-    load_json,
     load_markdown,
     print_section,
     print_success,
     print_info,
     print_warning
 )
+from agents.embeddings import EmbeddingStore, embeddings_available
+from agents.model_router import routed_call, route_for
+from agents.prompt_budget import PromptBudget, fit_text
+from agents.research_context import (
+    load_context_bundle,
+    select_slice,
+    search_bundle
+)
+from agents.linking import (
+    find_link_candidates,
+    rerank_with_llm,
+    strip_link_suggestions
+)
+
+
+# Each command's routed task, and the share of its prompt budget
+# (agents/configs/model_routes.yaml) given to the research context
+COMMAND_CONTEXT_SHARES = {
+    'find source': ('find_source', 0.8),
+    'draft': ('draft_section', 0.65),
+    'verify': ('verify_claim', 0.9)
+}
+# Tokens of each corpus match's text shown to find_source
+MATCH_TEXT_TOKENS = 75
+
+# Prompt tails; the research context (and any matches or draft) come first
+FIND_SOURCE_PROMPT = """
+
+The writer is looking for sources about: {query}
+
+Search the research context and provide:
+1. The 2-3 most relevant sources
+2. Specific claims/data from those sources
+3. Direct quotes if available
+
+Format as:
+1. [Title] - [URL]
+   Claim: "..."
+   Quote: "..."
+"""
+
+DRAFT_INSTRUCTIONS = """
+
+The writer needs a draft of: {description}
+
+Write a 2-3 paragraph draft that:
+- Is grounded in the research context (cite sources)
+- Focuses on mechanisms and latency budgets
+- Uses precise technical language
+- Includes specific claims with confidence levels
+
+Draft:"""
+
+VERIFY_CLAIM_PROMPT = """
+
+The writer wants to verify this claim: "{claim}"
+
+Check the research context and assess:
+1. Is this claim supported by the sources?
+2. What is the confidence level? (high/medium/low)
+3. Which specific sources support it?
+4. Are there any caveats or limitations?
+5. Should the claim be softened or strengthened?
+
+Provide a verification report:"""
 
 
 def interactive_assistant(research_path, draft_path=None):
@@ -23,23 +87,20 @@ def interactive_assistant(research_path, draft_path=None):
         find source: <query>       - Find source from research corpus
         draft: <section description> - Draft a section
         verify: <claim>            - Verify claim against sources
-        suggest links             - Suggest evergreen hub links
+        suggest links              - Suggest internal links (--rerank: LLM re-rank)
         help                       - Show commands
         exit                       - Exit assistant
     """
     print_section("WRITING ASSISTANT")
 
-    # Load research context
+    # Load precompiled research context (rebuilt only if the research JSON changed)
     try:
-        research_data = load_json(research_path)
+        bundle = load_context_bundle(research_path)
         print_success(f"Research context loaded: {research_path}")
-
-        num_sources = len(research_data.get('relevant_sources', []))
-        num_claims = len(research_data.get('extracted_claims', []))
-        print_info(f"Context: {num_sources} sources, {num_claims} claims")
+        print_info(f"Context: {bundle['total_sources']} sources, {bundle['total_claims']} claims")
     except Exception as e:
         print_warning(f"Could not load research: {e}")
-        research_data = {}
+        bundle = {}
 
     # Load draft if provided
     draft_content = None
@@ -57,8 +118,10 @@ def interactive_assistant(research_path, draft_path=None):
 
     client = get_anthropic_client()
 
-    # Prepare research context for Claude
-    research_context = format_research_for_claude(research_data)
+    def context_for(command):
+        task, share = COMMAND_CONTEXT_SHARES[command]
+        chosen = select_slice(bundle, int(route_for(task)['prompt_budget'] * share))
+        return chosen['text']
 
     # Interactive loop
     while True:
@@ -79,18 +142,19 @@ def interactive_assistant(research_path, draft_path=None):
             # Parse command
             if user_input.lower().startswith('find source:'):
                 query = user_input.split(':', 1)[1].strip()
-                find_source(client, research_context, query)
+                find_source(client, context_for('find source'), query, bundle)
 
             elif user_input.lower().startswith('draft:'):
                 description = user_input.split(':', 1)[1].strip()
-                draft_section(client, research_context, draft_content, description)
+                draft_section(client, context_for('draft'), draft_content, description)
 
             elif user_input.lower().startswith('verify:'):
                 claim = user_input.split(':', 1)[1].strip()
-                verify_claim(client, research_context, claim)
+                verify_claim(client, context_for('verify'), claim)
 
-            elif user_input.lower() == 'suggest links':
-                suggest_links(client, draft_content, research_data)
+            elif user_input.lower().startswith('suggest links'):
+                rerank = '--rerank' in user_input.lower()
+                suggest_links(client, draft_content, draft_path, rerank)
 
             else:
                 print_warning(f"Unknown command. Type 'help' for available commands.")
@@ -102,55 +166,54 @@ def interactive_assistant(research_path, draft_path=None):
             print_warning(f"Error: {e}")
 
 
-def format_research_for_claude(research_data):
-    """Format research data for Claude context"""
-    sources = research_data.get('relevant_sources', [])
-    claims = research_data.get('extracted_claims', [])
-
-    context = "RESEARCH CONTEXT:\n\n"
-    context += "SOURCES:\n"
-    for i, source in enumerate(sources[:20], 1):  # Limit to avoid token overflow
-        context += f"{i}. {source.get('title', 'Unknown')} - {source.get('url', '')}\n"
-        context += f"   Relevance: {source.get('relevance_score', 'N/A')}\n"
-        context += f"   Key claims: {', '.join(source.get('key_claims', [])[:3])}\n\n"
-
-    context += "\nEXTRACTED CLAIMS:\n"
-    for i, claim in enumerate(claims[:30], 1):
-        context += f"{i}. \"{claim.get('claim_text', '')}\"\n"
-        context += f"   Source: {claim.get('source_url', '')}\n"
-        context += f"   Evidence: \"{claim.get('evidence_snippet', '')}\"\n"
-        context += f"   Confidence: {claim.get('confidence', 'unknown')}\n\n"
-
-    return context
+def local_source_matches(query, k=5):
+    """Nearest briefs and claims in the shared embedding store"""
+    if not embeddings_available():
+        return []
+    try:
+        return EmbeddingStore().top_k(query, k=k)
+    except OSError:
+        return []
 
 
-def find_source(client, research_context, query):
+def find_source(client, research_context, query, bundle=None):
     """Find source from research corpus"""
     print_info(f"Searching for: {query}")
 
-    prompt = f"""{research_context}
-
-The writer is looking for sources about: {query}
-
-Search the research context and provide:
-1. The 2-3 most relevant sources
-2. Specific claims/data from those sources
-3. Direct quotes if available
-
-Format as:
-1. [Title] - [URL]
-   Claim: "..."
-   Quote: "..."
-"""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
+    budget = PromptBudget('find_source')
+    budget.reserve(research_context + FIND_SOURCE_PROMPT.format(query=query))
+    corpus_context = ""
+    research_matches = search_bundle(bundle, query) if bundle else []
+    if research_matches:
+        print_info("Best matches in this research summary:")
+        for score, passage in research_matches:
+            print(f"  {score:5.2f}  [{passage['kind']}] {passage['title'][:80]} - {passage['url']}")
+        listed, _ = budget.items('research matches', (
+            f"- [{p['kind']}] {p['title']} - {p['url']}" for _, p in research_matches
+        ), separator='\n')
+        corpus_context += budget.reserve("\n\nBEST LOCAL MATCHES IN RESEARCH:\n") + listed
+
+    matches = local_source_matches(query)
+    if matches:
+        print_info("Closest matches in intake/research corpus:")
+        for score, record in matches:
+            print(f"  {score:.2f}  {record.get('title', '')[:80]} - {record.get('url', '')}")
+        listed, _ = budget.items('corpus matches', (
+            f"- [{record['kind']}] {record.get('title', '')} - {record.get('url', '')}\n"
+            f"  {fit_text(record.get('text', ''), MATCH_TEXT_TOKENS)[0]}"
+            for _, record in matches
+        ), separator='\n')
+        corpus_context += budget.reserve("\n\nCORPUS MATCHES (nearest by embedding):\n") + listed
+
+    prompt = research_context + corpus_context + FIND_SOURCE_PROMPT.format(query=query)
+
+    result, _ = routed_call(
+        client, 'find_source',
+        messages=[{"role": "user", "content": prompt}],
         max_tokens=1500,
         temperature=0.3,
-        messages=[{"role": "user", "content": prompt}]
+        budget=budget
     )
-
-    result = response.content[0].text
     print(f"\n{result}\n")
 
 
@@ -158,30 +221,23 @@ def draft_section(client, research_context, draft_content, description):
     """Draft a section based on description"""
     print_info(f"Drafting: {description}")
 
+    instructions = DRAFT_INSTRUCTIONS.format(description=description)
+    budget = PromptBudget('draft_section')
+    budget.reserve(research_context + instructions)
     draft_context = ""
     if draft_content:
-        draft_context = f"\n\nCURRENT DRAFT (for context):\n{draft_content['body'][:2000]}"
-
-    prompt = f"""{research_context}{draft_context}
-
-The writer needs a draft of: {description}
+        header = budget.reserve("\n\nCURRENT DRAFT (for context):\n")
+        draft_context = header + budget.text('draft', draft_content['body'])
 
-Write a 2-3 paragraph draft that:
-- Is grounded in the research context (cite sources)
-- Focuses on mechanisms and latency budgets
-- Uses precise technical language
-- Includes specific claims with confidence levels
+    prompt = research_context + draft_context + instructions
 
-Draft:"""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
+    result, _ = routed_call(
+        client, 'draft_section',
+        messages=[{"role": "user", "content": prompt}],
         max_tokens=2000,
         temperature=0.7,  # Higher temperature for creative drafting
-        messages=[{"role": "user", "content": prompt}]
+        budget=budget
     )
-
-    result = response.content[0].text
     print(f"\n{result}\n")
     print_info("Copy to clipboard? (y/n)")
 
@@ -190,28 +246,17 @@ def verify_claim(client, research_context, claim):
     """Verify claim against sources"""
     print_info(f"Verifying: {claim}")
 
-    prompt = f"""{research_context}
-
-The writer wants to verify this claim: "{claim}"
-
-Check the research context and assess:
-1. Is this claim supported by the sources?
-2. What is the confidence level? (high/medium/low)
-3. Which specific sources support it?
-4. Are there any caveats or limitations?
-5. Should the claim be softened or strengthened?
-
-Provide a verification report:"""
+    budget = PromptBudget('verify_claim')
+    prompt = budget.reserve(research_context + VERIFY_CLAIM_PROMPT.format(claim=claim))
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
+    result, _ = routed_call(
+        client, 'verify_claim',
+        messages=[{"role": "user", "content": prompt}],
         max_tokens=1500,
         temperature=0.3,
-        messages=[{"role": "user", "content": prompt}]
+        budget=budget
     )
 
-    result = response.content[0].text
-
     # Check for warnings
     if any(word in result.lower() for word in ['weak', 'unsupported', 'no evidence', 'soften']):
         print()
@@ -223,42 +268,29 @@ Provide a verification report:"""
     print(f"\n{result}\n")
 
 
-def suggest_links(client, draft_content, research_data):
-    """Suggest evergreen hub links"""
+def suggest_links(client, draft_content, draft_path=None, rerank=False):
+    """Suggest internal links from the local content index"""
     if not draft_content:
         print_warning("No draft loaded. Use --draft flag when starting assistant.")
         return
 
     print_info("Analyzing draft for internal linking opportunities...")
 
-    # TODO: Load actual evergreen hub topics
-    evergreen_hubs = [
-        "/evergreen/adverse-selection/",
-        "/evergreen/inventory-risk/",
-        "/evergreen/coordination-cost/",
-        "/evergreen/arbitrage-capture/",
-        "/evergreen/information-asymmetry/",
-        "/evergreen/queue-priority/"
-    ]
-
-    prompt = f"""DRAFT:
-{draft_content['body'][:3000]}
-
-AVAILABLE EVERGREEN HUBS:
-{chr(10).join(evergreen_hubs)}
-
-Suggest 2-5 evergreen hub links that would be relevant to add to this draft.
-For each suggestion, explain why and where in the draft it should be linked."""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1000,
-        temperature=0.5,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    body = strip_link_suggestions(draft_content['body'])
+    candidates = find_link_candidates(body, draft_path)
 
-    result = response.content[0].text
-    print(f"\n{result}\n")
+    if not candidates:
+        print_info("No internal link candidates found")
+        return
+
+    if rerank:
+        candidates = rerank_with_llm(client, body, candidates)
+
+    print()
+    for i, c in enumerate(candidates, 1):
+        print(f"{i}. \"{c['phrase']}\" -> {c['url']}")
+        print(f"   {c['reason']}")
+    print()
 
 
 def show_help():
@@ -275,7 +307,8 @@ Available commands:
   verify: <claim>            - Verify claim against sources
                                Example: verify: 1ms improvement reduces spreads by 0.8bp
 
-  suggest links              - Suggest evergreen hub links for current draft
+  suggest links              - Suggest internal links for current draft
+                               Add --rerank to have Claude pick the best ones
 
   help                       - Show this help message
 
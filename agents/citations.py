@@ -0,0 +1,168 @@
+"""
+Citation Index
+Maps sentence and paragraph spans of a draft to the links they cite, so
+claims can be located (even when paraphrased) and matched to nearby URLs
+"""
+import re
+from bisect import bisect_left, bisect_right
+from agents.text_match import fold_case
+
+
+MARKDOWN_LINK_PATTERN = re.compile(r'\[[^\]]*\]\((https?://[^)\s]+)[^)]*\)')
+BARE_URL_PATTERN = re.compile(r'https?://[^\s\)"\'<>\]]+')
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"*\[(])|\n(?=\s*(?:[-*+] |\d+\. |#))')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:\.[0-9]+)?')
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could do does for from had has have how
+if in into is it its may more most not of on or our so than that the their them
+then there these they this those to was we were what when where which while who
+will with would you your
+""".split())
+
+# Fraction of the claim's content words a span must contain to count as a match
+MIN_SENTENCE_COVERAGE = 0.5
+MIN_PARAGRAPH_COVERAGE = 0.6
+
+DEFAULT_WINDOW = 500
+
+
+def tokenize(text):
+    """Content-word tokens (numbers kept, stopwords dropped)"""
+    return [t for t in TOKEN_PATTERN.findall(fold_case(text)) if t not in STOPWORDS]
+
+
+class CitationIndex:
+    """
+    One-time index of a draft's spans and citations
+
+    Built once per draft; each lookup costs a few binary searches plus an
+    inverted-index pass over the claim's own tokens.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._folded = fold_case(text)
+        self.urls = self._find_urls(text)
+        self._url_positions = [pos for pos, _ in self.urls]
+        self.paragraphs = self._split(text, PARAGRAPH_BREAK, 0, len(text))
+        self._paragraph_starts = [start for start, _ in self.paragraphs]
+
+        self.sentences = []
+        for start, end in self.paragraphs:
+            self.sentences.extend(self._split(text, SENTENCE_END, start, end))
+        self._sentence_starts = [start for start, _ in self.sentences]
+
+        self._postings = {}
+        for i, (start, end) in enumerate(self.sentences):
+            for token in set(tokenize(text[start:end])):
+                self._postings.setdefault(token, []).append(i)
+
+    @staticmethod
+    def _find_urls(text):
+        """(position, url) for markdown links and bare URLs, in document order"""
+        found = {}
+        for m in MARKDOWN_LINK_PATTERN.finditer(text):
+            found[m.start(1)] = m.group(1)
+        for m in BARE_URL_PATTERN.finditer(text):
+            if m.start() not in found:
+                found[m.start()] = m.group().rstrip('.,;:')
+        return sorted(found.items())
+
+    @staticmethod
+    def _split(text, pattern, start, end):
+        """Non-empty (start, end) spans of text[start:end] between separators"""
+        spans = []
+        pos = start
+        for m in pattern.finditer(text, start, end):
+            if text[pos:m.start()].strip():
+                spans.append((pos, m.start()))
+            pos = m.end()
+        if text[pos:end].strip():
+            spans.append((pos, end))
+        return spans
+
+    def locate(self, claim_text):
+        """
+        Return the (start, end) span of the draft that states the claim
+
+        Tries an exact case-insensitive match first, then the sentence (or
+        paragraph) containing most of the claim's content words. Returns
+        None when nothing is a convincing match.
+        """
+        needle = ' '.join(fold_case(claim_text).split())
+        if needle:
+            pos = self._folded.find(needle)
+            if pos != -1:
+                return pos, pos + len(needle)
+
+        claim_tokens = set(tokenize(claim_text))
+        if not claim_tokens:
+            return None
+
+        hits = {}
+        for token in claim_tokens:
+            for i in self._postings.get(token, ()):
+                hits[i] = hits.get(i, 0) + 1
+
+        if hits:
+            best = max(hits, key=lambda i: (hits[i], -(self.sentences[i][1] - self.sentences[i][0])))
+            if hits[best] / len(claim_tokens) >= MIN_SENTENCE_COVERAGE:
+                return self.sentences[best]
+
+        # Claim may be paraphrased across sentences: try whole paragraphs
+        by_paragraph = {}
+        for i, count in hits.items():
+            p = bisect_right(self._paragraph_starts, self.sentences[i][0]) - 1
+            by_paragraph[p] = by_paragraph.get(p, 0) + count
+        if by_paragraph:
+            best = max(by_paragraph, key=by_paragraph.get)
+            start, end = self.paragraphs[best]
+            if len(claim_tokens & set(tokenize(self.text[start:end]))) / len(claim_tokens) >= MIN_PARAGRAPH_COVERAGE:
+                return start, end
+
+        return None
+
+    def urls_in(self, start, end):
+        """URLs positioned within [start, end)"""
+        lo = bisect_left(self._url_positions, start)
+        hi = bisect_left(self._url_positions, end)
+        return [url for _, url in self.urls[lo:hi]]
+
+    def paragraph_of(self, pos):
+        """The (start, end) span of the paragraph containing pos"""
+        i = bisect_right(self._paragraph_starts, pos) - 1
+        return self.paragraphs[max(i, 0)] if self.paragraphs else (0, len(self.text))
+
+    def sentence_of(self, pos):
+        """The (start, end) span of the sentence containing pos"""
+        i = bisect_right(self._sentence_starts, pos) - 1
+        return self.sentences[max(i, 0)] if self.sentences else (0, len(self.text))
+
+    def urls_near(self, claim_text, window=DEFAULT_WINDOW):
+        """
+        URLs cited near a claim, closest first
+
+        Order: the claim's own sentence, then its paragraph, then anything
+        within `window` characters. Returns [] if the claim can't be found.
+        """
+        span = self.locate(claim_text)
+        if span is None:
+            return []
+
+        start, end = span
+        sentence = self.sentence_of(start)
+        paragraph = self.paragraph_of(start)
+        ranges = [
+            (min(start, sentence[0]), max(end, sentence[1])),
+            (min(start, paragraph[0]), max(end, paragraph[1])),
+            (max(0, start - window), min(len(self.text), end + window))
+        ]
+
+        urls = []
+        for range_start, range_end in ranges:
+            for url in self.urls_in(range_start, range_end):
+                if url not in urls:
+                    urls.append(url)
+        return urls
@@ -0,0 +1,197 @@
+"""
+Claim Registry
+Global, append-only record of verified claims across posts, indexed by
+normalized fingerprint and token postings for near-duplicate lookups
+"""
+import hashlib
+import json
+import re
+from datetime import datetime
+from agents.citations import tokenize
+from agents.utils import (
+    append_jsonl,
+    load_jsonl,
+    atomic_write
+)
+
+
+REGISTRY_PATH = 'data/claims/registry.jsonl'
+
+# Jaccard similarity of claim tokens to count as the same claim
+DUPLICATE_SIMILARITY = 0.85
+# Jaccard similarity of the non-numeric tokens to compare numbers at all
+CONTRADICTION_SIMILARITY = 0.7
+
+# Verdicts worth reusing; 'warning' usually means "could not verify"
+REUSABLE_STATUSES = ('pass', 'fail')
+
+NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+
+# Skip postings lists longer than this when gathering candidates (stopword-like tokens)
+MAX_POSTINGS = 5000
+
+
+def normalize_claim(text):
+    """Lowercase, strip punctuation, split numbers from units ("0.8bp" -> "0.8 bp")"""
+    text = NUMBER_PATTERN.sub(lambda m: f" {m.group().replace(',', '')} ", text.lower())
+    text = re.sub(r'[^\w\s.%$-]', ' ', text)
+    return ' '.join(t.strip('.-') for t in text.split() if t.strip('.-'))
+
+
+def claim_fingerprint(text):
+    return hashlib.sha1(normalize_claim(text).encode()).hexdigest()[:16]
+
+
+def claim_numbers(text):
+    return sorted({float(n.replace(',', '')) for n in NUMBER_PATTERN.findall(text)})
+
+
+def _words(text):
+    """Non-numeric content tokens"""
+    return {t for t in tokenize(text) if not NUMBER_PATTERN.fullmatch(t)}
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+class ClaimRegistry:
+    """
+    Latest verdict per (claim fingerprint, post), with a token index
+
+    Lookups only touch the postings of the query's own tokens, so cost
+    grows with the number of related claims, not with the registry size.
+    """
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        self.records = {}
+        self._by_fingerprint = {}
+        self._postings = {}
+        for record in load_jsonl(path):
+            self._index(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _index(self, record):
+        key = (record['fingerprint'], record.get('post'))
+        self.records[key] = record
+        self._by_fingerprint.setdefault(record['fingerprint'], set()).add(key)
+        for token in set(tokenize(record['claim_text'])):
+            self._postings.setdefault(token, set()).add(key)
+
+    def _candidates(self, tokens):
+        keys = set()
+        for token in tokens:
+            postings = self._postings.get(token, ())
+            if len(postings) <= MAX_POSTINGS:
+                keys.update(postings)
+        return keys
+
+    def lookup(self, claim_text, exclude_post=None):
+        """
+        Best prior record for an equivalent claim, or None
+
+        Exact fingerprint matches win; otherwise the most similar claim
+        above DUPLICATE_SIMILARITY. Returns (similarity, record).
+        """
+        exact = [
+            self.records[key] for key in self._by_fingerprint.get(claim_fingerprint(claim_text), ())
+            if key[1] != exclude_post
+        ]
+        if exact:
+            return 1.0, max(exact, key=lambda r: r.get('verified_at', ''))
+
+        tokens = set(tokenize(claim_text))
+        best = None
+        for key in self._candidates(tokens):
+            record = self.records[key]
+            if record.get('post') == exclude_post:
+                continue
+            similarity = _jaccard(tokens, set(tokenize(record['claim_text'])))
+            if similarity >= DUPLICATE_SIMILARITY and (best is None or similarity > best[0]):
+                best = (similarity, record)
+        return best
+
+    def contradictions(self, claim_text, post=None):
+        """
+        Claims in other posts that say the same thing with different numbers
+
+        Returns [{claim_text, post, numbers, status}].
+        """
+        numbers = claim_numbers(claim_text)
+        if not numbers:
+            return []
+
+        words = _words(claim_text)
+        found = []
+        for key in self._candidates(words):
+            record = self.records[key]
+            if record.get('post') == post or not record.get('numbers'):
+                continue
+            if record['numbers'] == numbers:
+                continue
+            if _jaccard(words, _words(record['claim_text'])) >= CONTRADICTION_SIMILARITY:
+                found.append({
+                    'claim_text': record['claim_text'],
+                    'post': record.get('post'),
+                    'numbers': record['numbers'],
+                    'status': record.get('status')
+                })
+        return found
+
+    def reusable_verdict(self, claim_text, cited_urls, post=None):
+        """
+        A prior verdict from another post that applies to this claim, or None
+
+        The claim must be equivalent, state the same numbers (a near-duplicate
+        saying 3.5bp where the record says 0.8bp is a different claim) and be
+        backed by the same evidence: at least one shared URL, or no URLs on
+        either side.
+        """
+        match = self.lookup(claim_text, exclude_post=post)
+        if match is None:
+            return None
+        similarity, record = match
+        if record.get('status') not in REUSABLE_STATUSES:
+            return None
+        prior_numbers = record.get('numbers')
+        if prior_numbers is None:
+            prior_numbers = claim_numbers(record['claim_text'])
+        if claim_numbers(claim_text) != prior_numbers:
+            return None
+        prior_urls = set(record.get('evidence_urls') or [])
+        if (prior_urls or cited_urls) and not prior_urls & set(cited_urls):
+            return None
+        return similarity, record
+
+    def record(self, results, post):
+        """Append verification results for a post"""
+        now = datetime.now().isoformat()
+        records = []
+        for result in results:
+            claim_text = result.get('claim_text')
+            if not claim_text or result.get('reused_from'):
+                continue
+            records.append({
+                'fingerprint': claim_fingerprint(claim_text),
+                'claim_text': claim_text,
+                'numbers': claim_numbers(claim_text),
+                'post': post,
+                'status': result.get('status'),
+                'reason': result.get('reason', ''),
+                'evidence_urls': result.get('evidence_urls', []),
+                'verified_at': now
+            })
+        if records:
+            append_jsonl(records, self.path)
+            for record in records:
+                self._index(record)
+        return len(records)
+
+    def compact(self):
+        """Rewrite the log with only the latest record per claim and post"""
+        with atomic_write(self.path) as f:
+            for record in self.records.values():
+                f.write(json.dumps(record) + '\n')
@@ -0,0 +1,261 @@
+"""
+Content Index - Cached frontmatter metadata for the Hugo content tree
+Walks content/ once, parses frontmatter with the C YAML loader, and answers
+metadata queries without rescanning or reparsing unchanged files
+"""
+import os
+import unicodedata
+from pathlib import Path
+from agents.text_match import PhraseMatcher
+from agents.utils import (
+    load_json,
+    save_json,
+    parse_frontmatter
+)
+
+
+CONTENT_DIR = 'content'
+CACHE_PATH = 'data/cache/content_index.json'
+
+# Bump when the cached entry layout changes
+CACHE_VERSION = 2
+
+# Frontmatter fields with an inverted index for fast lookups
+INDEXED_FIELDS = ('markets', 'mechanisms', 'latency_budget', 'status', 'sources')
+
+# Frontmatter `mechanisms` ids (see README: Frontmatter Schema)
+MECHANISM_NAMES = {
+    1: 'adverse selection',
+    2: 'inventory risk',
+    3: 'coordination cost',
+    4: 'arbitrage',
+    5: 'information asymmetry',
+    6: 'queue priority'
+}
+
+# Extra phrases that signal a mechanism, beyond its name
+MECHANISM_ALIASES = {
+    1: ['toxic flow', 'picked off', 'stale quotes'],
+    2: ['inventory', 'position risk'],
+    3: ['coordination', 'consensus'],
+    4: ['arbitrageur', 'arbitrage opportunity', 'mev'],
+    5: ['informed traders', 'information advantage', 'private information'],
+    6: ['queue position', 'price-time priority', 'time priority']
+}
+
+
+def build_mechanism_matcher():
+    """PhraseMatcher from mechanism names and aliases to mechanism ids"""
+    matcher = PhraseMatcher()
+    for mechanism_id, name in MECHANISM_NAMES.items():
+        for phrase in [name] + MECHANISM_ALIASES.get(mechanism_id, []):
+            matcher.add(phrase, mechanism_id)
+    return matcher.build()
+
+
+def split_frontmatter(content):
+    """Split markdown content into (frontmatter_str, body)"""
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            return parts[1].strip(), parts[2].strip()
+    return '', content
+
+
+# Characters Hugo keeps in a urlized path besides letters, digits and marks
+URL_SAFE_CHARS = set('./\\_#+~-@')
+
+
+def urlize(text):
+    """
+    Hugo's urlize: drop characters not allowed in a path, turn runs of
+    whitespace into one hyphen, lowercase
+    """
+    out = []
+    was_hyphen = False
+    for ch in text.strip():
+        if ch in URL_SAFE_CHARS or ch.isalpha() or ch.isdigit() or unicodedata.category(ch).startswith('M'):
+            out.append(ch)
+            was_hyphen = ch == '-'
+        elif ch.isspace() and not was_hyphen:
+            out.append('-')
+            was_hyphen = True
+    return ''.join(out).lower()
+
+
+def _as_list(value):
+    """Normalize a frontmatter value to a list of hashable items"""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, (str, int, float, bool))]
+    return [value]
+
+
+class ContentIndex:
+    """
+    Queryable index of content pages keyed by path
+
+    Entries are cached on disk with the file's mtime and size; refresh()
+    only reparses files whose stat signature changed.
+    """
+
+    def __init__(self, content_dir=CONTENT_DIR, cache_path=CACHE_PATH):
+        self.content_dir = Path(content_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.entries = {}
+        self._by_field = {}
+        self._loaded = False
+
+    def refresh(self):
+        """Rescan the content tree, reparsing only changed files"""
+        cached = self.entries or self._load_cache()
+        entries = {}
+        changed = False
+
+        for path in self._walk():
+            key = path.as_posix()
+            st = path.stat()
+            entry = cached.get(key)
+            if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+                entries[key] = entry
+                continue
+
+            entries[key] = self._parse_entry(path, st)
+            changed = True
+
+        self.entries = entries
+        if changed or len(entries) != len(cached):
+            self._save_cache()
+
+        self._build_field_index()
+        self._loaded = True
+        return self
+
+    def _walk(self):
+        """Yield markdown files under the content directory"""
+        if not self.content_dir.exists():
+            return
+        for root, dirs, files in os.walk(self.content_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.md'):
+                    yield Path(root) / name
+
+    def _parse_entry(self, path, st):
+        """Parse a single file's frontmatter into an index entry"""
+        with open(path, 'r') as f:
+            frontmatter_str, _ = split_frontmatter(f.read())
+        data = parse_frontmatter(frontmatter_str)
+
+        rel = path.relative_to(self.content_dir)
+        section = rel.parts[0] if len(rel.parts) > 1 else ''
+        if path.name == '_index.md':
+            slug = url_slug = rel.parent.name or ''
+        else:
+            slug = data.get('slug') or path.stem
+            # Hugo's :slug is the frontmatter slug, else the title, urlized
+            url_slug = urlize(str(data.get('slug') or data.get('title') or '')) or path.stem
+
+        return {
+            'path': path.as_posix(),
+            'section': section,
+            'slug': slug,
+            'url_slug': url_slug,
+            'title': data.get('title', ''),
+            'is_index': path.name == '_index.md',
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'frontmatter': data
+        }
+
+    def _load_cache(self):
+        """Load cached entries, discarding caches from other layouts"""
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            cache = load_json(self.cache_path)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('version') != CACHE_VERSION:
+            return {}
+        return cache.get('entries', {})
+
+    def _save_cache(self):
+        """Persist entries for the next process"""
+        if not self.cache_path:
+            return
+        save_json({'version': CACHE_VERSION, 'entries': self.entries}, self.cache_path, compact=True)
+
+    def _build_field_index(self):
+        """Build value -> paths maps for the indexed fields"""
+        by_field = {field: {} for field in INDEXED_FIELDS}
+        for key, entry in self.entries.items():
+            fm = entry['frontmatter']
+            for field in INDEXED_FIELDS:
+                for value in _as_list(fm.get(field)):
+                    by_field[field].setdefault(value, set()).add(key)
+        self._by_field = by_field
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    def get(self, path):
+        """Return the entry for a content path, or None"""
+        self._ensure_loaded()
+        return self.entries.get(Path(path).as_posix())
+
+    def pages(self, section=None, include_index=False):
+        """List entries, optionally limited to one section"""
+        self._ensure_loaded()
+        return [
+            e for e in self.entries.values()
+            if (section is None or e['section'] == section)
+            and (include_index or not e['is_index'])
+        ]
+
+    def values(self, field):
+        """Distinct values seen for an indexed field"""
+        self._ensure_loaded()
+        return sorted(self._by_field.get(field, {}), key=str)
+
+    def query(self, section=None, **filters):
+        """
+        Find pages whose frontmatter matches every filter
+
+        Each filter is a field name from INDEXED_FIELDS and a value or list
+        of values; a page matches a filter if it has any of the values.
+            index.query(section='posts', mechanisms=[2, 4], status='reference')
+        """
+        self._ensure_loaded()
+        keys = None
+        for field, wanted in filters.items():
+            if field not in self._by_field:
+                raise ValueError(f"Field not indexed: {field}")
+            matched = set()
+            for value in _as_list(wanted):
+                matched |= self._by_field[field].get(value, set())
+            keys = matched if keys is None else keys & matched
+
+        if keys is None:
+            candidates = self.entries.values()
+        else:
+            candidates = (self.entries[k] for k in keys)
+
+        return sorted(
+            (e for e in candidates
+             if not e['is_index'] and (section is None or e['section'] == section)),
+            key=lambda e: e['path']
+        )
+
+
+_default_index = None
+
+
+def get_content_index(content_dir=CONTENT_DIR):
+    """Return the shared, freshly refreshed content index"""
+    global _default_index
+    if _default_index is None or _default_index.content_dir != Path(content_dir):
+        _default_index = ContentIndex(content_dir)
+    return _default_index.refresh()
@@ -0,0 +1,370 @@
+"""
+Daemon - keep the LLM client, caches and indexes warm between commands
+
+`run.py daemon start` serves run.py commands over a Unix socket in the
+working directory. While it runs, `run.py <command>` forwards its
+arguments there instead of importing the agents and rebuilding state, and
+the daemon streams output (and prompts for input) back to the terminal.
+
+The daemon keeps module-level state alive between commands: the pooled
+Anthropic client, parsed intake files, the evidence index, the content
+index, the risky-content scanner, the routing config and the frontmatter
+schema. Before each command it drops whichever caches have stale inputs
+on disk.
+
+Commands run one at a time, in the daemon's process. `--profile`, `--local`,
+`--help` and `gate --watch` (which never finishes on its own) always run
+locally. This module only imports the standard library at the top so the
+forwarding client stays cheap.
+"""
+import ctypes
+import importlib
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+
+SOCKET_PATH = 'data/daemon.sock'
+CONFIG_DIR = Path(__file__).parent / 'configs'
+
+# Arguments that always run in the calling process; --watch runs until
+# interrupted and would hold the daemon's only worker
+LOCAL_ONLY = {'--profile', '--local', '-h', '--help', 'daemon', '--watch'}
+
+# (module, cache attribute, inputs it is built from)
+WARM_CACHES = [
+    ('agents.retrieval', '_evidence_index', ('content/posts', 'data/snapshots', 'data/intake')),
+    ('agents.risk_scan', '_default_scanner', (CONFIG_DIR / 'risky_content.yaml',)),
+    ('agents.model_router', '_config', (CONFIG_DIR / 'model_routes.yaml',)),
+    ('agents.frontmatter', '_config', (CONFIG_DIR / 'frontmatter.yaml',)),
+]
+
+
+def inputs_signature(paths):
+    """Cheap change detector: (path, mtime, size) of every file under paths, plus today's date"""
+    stamps = [date.today().isoformat()]
+    for root in map(Path, paths):
+        files = [root] if root.is_file() else sorted(p for p in root.rglob('*') if p.is_file()) if root.exists() else []
+        for path in files:
+            stat = path.stat()
+            stamps.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return hash(tuple(stamps))
+
+
+class WarmState:
+    """Tracks the inputs of each warm cache and drops caches that went stale"""
+
+    def __init__(self):
+        self.signatures = {}
+
+    def refresh(self):
+        dropped = []
+        for module_name, attr, inputs in WARM_CACHES:
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            signature = inputs_signature(inputs)
+            key = (module_name, attr)
+            if key in self.signatures and self.signatures[key] != signature and getattr(module, attr) is not None:
+                setattr(module, attr, None)
+                dropped.append(f"{module_name}.{attr}")
+            self.signatures[key] = signature
+        return dropped
+
+    def summary(self):
+        return {
+            f"{module_name}.{attr}": getattr(sys.modules[module_name], attr, None) is not None
+            for module_name, attr, _ in WARM_CACHES if module_name in sys.modules
+        }
+
+
+class SocketStream:
+    """
+    stdout/stderr/stdin for one forwarded command
+
+    Output is sent to the client as {"out": text} lines; readline() asks the
+    client for a line of stdin with {"read": true}.
+    """
+
+    def __init__(self, conn, reader, channel='out'):
+        self.conn = conn
+        self.reader = reader
+        self.channel = channel
+        self.buffer = ''
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        self.conn.sendall((json.dumps(message) + '\n').encode())
+
+    def write(self, text):
+        with self.lock:
+            self.buffer += text
+            if '\n' not in text:
+                return len(text)
+        self.flush()
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            text, self.buffer = self.buffer, ''
+        if text:
+            self.send({self.channel: text})
+
+    def readline(self):
+        self.flush()  # Show the prompt before waiting
+        self.send({'read': True})
+        line = self.reader.lines.get()
+        return '' if line is None else line
+
+    def isatty(self):
+        return False
+
+    def fileno(self):
+        raise OSError("forwarded stream has no file descriptor")
+
+
+class ClientDisconnected(BaseException):
+    """Raised in a forwarded command when its client goes away (not an Exception, so agents can't swallow it)"""
+
+
+class ClientReader(threading.Thread):
+    """
+    Reads the client's side of the connection while a command runs
+
+    Stdin replies are queued for SocketStream.readline(). On EOF (the
+    client was interrupted or killed) the command's thread gets
+    ClientDisconnected, so an abandoned command stops instead of running
+    on, making LLM calls and holding the daemon, until its next write.
+    """
+
+    def __init__(self, rfile, thread_id):
+        super().__init__(daemon=True)
+        self.rfile = rfile
+        self.thread_id = thread_id
+        self.lines = queue.Queue()
+        self.lock = threading.Lock()
+        self.finished = False
+        self.interrupted = False
+
+    def run(self):
+        try:
+            for raw in self.rfile:
+                self.lines.put(json.loads(raw).get('line', ''))
+        except (OSError, ValueError):
+            pass
+        self.lines.put(None)
+        with self.lock:
+            if not self.finished:
+                self.interrupted = True
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self.thread_id), ctypes.py_object(ClientDisconnected))
+
+    def finish(self):
+        """The command is over: stop interrupting, and drop a pending interrupt"""
+        with self.lock:
+            self.finished = True
+            if self.interrupted:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self.thread_id), None)
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """One connection = one run.py command (or a control message)"""
+
+    def handle(self):
+        server = self.server
+        request = json.loads(self.rfile.readline() or '{}')
+        control = request.get('control')
+
+        if control == 'status':
+            self.reply({'status': {
+                'pid': os.getpid(),
+                'cwd': os.getcwd(),
+                'uptime_s': round(time.time() - server.started),
+                'commands_served': server.served,
+                'warm': server.warm.summary()
+            }})
+            return
+        if control == 'stop':
+            self.reply({'stopping': True})
+            # shutdown() waits for serve_forever, so it can't run on this thread
+            threading.Thread(target=server.shutdown).start()
+            return
+
+        if request.get('cwd') != os.getcwd():
+            self.reply({'refused': f"daemon serves {os.getcwd()}"})
+            return
+
+        server.warm.refresh()
+        reader = ClientReader(self.rfile, threading.get_ident())
+        out = SocketStream(self.connection, reader)
+        err = SocketStream(self.connection, reader, 'err')
+        saved = sys.stdout, sys.stderr, sys.stdin
+        sys.stdout, sys.stderr, sys.stdin = out, err, out
+        code = 130
+        try:
+            reader.start()
+            code = self.run_command(request.get('argv') or [], err)
+        except (ClientDisconnected, BrokenPipeError, ConnectionResetError):
+            # Client went away (e.g. Ctrl-C); abandon the command
+            pass
+        finally:
+            try:
+                reader.finish()
+            except ClientDisconnected:
+                pass
+            sys.stdout, sys.stderr, sys.stdin = saved
+            server.served += 1
+        if reader.interrupted:
+            print(f"Client disconnected; abandoned: {' '.join(request.get('argv') or [])}", file=sys.stderr)
+            return
+        try:
+            out.flush()
+            err.flush()
+            self.reply({'exit': code})
+        except OSError:
+            pass
+
+    def run_command(self, argv, err):
+        """Exit code of one forwarded command"""
+        try:
+            self.server.execute(argv)
+        except SystemExit as e:
+            if not isinstance(e.code, (int, type(None))):
+                print(e.code, file=err)
+                return 1
+            return e.code or 0
+        return 0
+
+    def reply(self, message):
+        self.wfile.write((json.dumps(message) + '\n').encode())
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    def __init__(self, path, execute):
+        super().__init__(path, CommandHandler)
+        os.chmod(path, 0o600)
+        self.execute = execute
+        self.warm = WarmState()
+        self.started = time.time()
+        self.served = 0
+
+
+def _connect(path):
+    """Connected socket, or None when no daemon is listening at path"""
+    if not Path(path).exists():
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+def _request(path, message):
+    conn = _connect(path)
+    if conn is None:
+        return None
+    with conn, conn.makefile('rb') as rfile:
+        conn.sendall((json.dumps(message) + '\n').encode())
+        line = rfile.readline()
+    return json.loads(line) if line else None
+
+
+def forward_to_daemon(argv, path=SOCKET_PATH):
+    """
+    Run a command through the daemon, relaying its output and stdin
+
+    Returns the command's exit code, or None if it should run locally (no
+    daemon, a local-only flag, or a daemon serving another directory).
+    """
+    if not argv or LOCAL_ONLY.intersection(argv):
+        return None
+    conn = _connect(path)
+    if conn is None:
+        return None
+
+    try:
+        return _relay(conn, argv)
+    except KeyboardInterrupt:
+        # Closing the connection makes the daemon abandon the command
+        conn.close()
+        print(file=sys.stderr)
+        return 130
+
+
+def _relay(conn, argv):
+    """Send argv and relay messages until the command exits"""
+    with conn, conn.makefile('rb') as rfile:
+        conn.sendall((json.dumps({'argv': argv, 'cwd': os.getcwd()}) + '\n').encode())
+        for line in rfile:
+            message = json.loads(line)
+            if 'out' in message:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+            elif 'err' in message:
+                sys.stderr.write(message['err'])
+                sys.stderr.flush()
+            elif 'read' in message:
+                reply = sys.stdin.readline()
+                conn.sendall((json.dumps({'line': reply}) + '\n').encode())
+            elif 'exit' in message:
+                return message['exit']
+            elif 'refused' in message:
+                return None
+    # Daemon died mid-command
+    print("\n✗ Daemon connection lost", file=sys.stderr)
+    return 1
+
+
+def run_daemon(action, execute, path=SOCKET_PATH):
+    """`run.py daemon start|stop|status`"""
+    if action == 'status':
+        status = _request(path, {'control': 'status'})
+        if not status:
+            print(f"No daemon listening on {path}")
+            return False
+        info = status['status']
+        print(f"Daemon pid {info['pid']} serving {info['cwd']}")
+        print(f"  Up {info['uptime_s']}s, {info['commands_served']} commands served")
+        for cache, warm in info['warm'].items():
+            print(f"  {cache}: {'warm' if warm else 'cold'}")
+        return True
+
+    if action == 'stop':
+        if not _request(path, {'control': 'stop'}):
+            print(f"No daemon listening on {path}")
+            return False
+        print("Daemon stopping")
+        return True
+
+    # start: runs in the foreground until stopped
+    if _connect(path) is not None:
+        print(f"A daemon is already listening on {path}")
+        return False
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).unlink(missing_ok=True)  # Stale socket from a killed daemon
+
+    # Import everything now so the first forwarded command is already warm
+    for module_name, _, _ in WARM_CACHES:
+        importlib.import_module(module_name)
+
+    server = DaemonServer(path, execute)
+    print(f"Daemon listening on {path} (pid {os.getpid()}); stop with `run.py daemon stop`")
+    try:
+        server.serve_forever(poll_interval=0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        Path(path).unlink(missing_ok=True)
+    print("Daemon stopped")
+    return True
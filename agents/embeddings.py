@@ -0,0 +1,253 @@
+"""
+Embedding Store
+Append-only, memory-mapped float32 matrix of embeddings for intake briefs
+and extracted claims, with a JSONL sidecar of row ids and metadata
+"""
+import fcntl
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+from agents.citations import tokenize
+from agents.utils import (
+    append_jsonl,
+    load_jsonl
+)
+
+try:
+    import numpy as np
+except ImportError:  # Embeddings are optional; callers check embeddings_available()
+    np = None
+
+
+STORE_DIR = 'data/embeddings'
+EMBEDDING_DIM = 512
+
+# Cosine similarity above which two briefs are treated as duplicates
+DUPLICATE_THRESHOLD = 0.92
+
+
+def embeddings_available():
+    """True when NumPy is installed"""
+    return np is not None
+
+
+def hash_embed(tokens, dim=EMBEDDING_DIM):
+    """
+    Feature-hashed bag of unigrams and bigrams, L2-normalized
+
+    A model-free local embedding: deterministic, no download or API call,
+    good enough to catch paraphrases that share vocabulary.
+    """
+    vec = np.zeros(dim, dtype=np.float32)
+    grams = list(tokens) + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for gram in grams:
+        h = int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), 'little')
+        vec[h % dim] += 1.0 if (h >> 63) else -1.0
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def embed_text(text):
+    """Local embedding for a piece of text"""
+    return hash_embed(tokenize(text))
+
+
+def brief_id(brief):
+    key = brief.get('url') or brief.get('title', '')
+    return 'brief:' + hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def claim_id(claim):
+    key = f"{claim.get('claim_text', '')}|{claim.get('source_url', '')}"
+    return 'claim:' + hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+class EmbeddingStore:
+    """
+    data/embeddings/
+        vectors.f32   row-major float32 matrix, one row per item, append-only
+        ids.jsonl     one {id, kind, title, url, text} record per row
+
+    Readers memory-map the matrix, so every process shares the same pages
+    and nothing is parsed at startup. Appends take an exclusive flock;
+    rows without a sidecar record (a torn append) are ignored.
+    """
+
+    def __init__(self, root=STORE_DIR, dim=EMBEDDING_DIM):
+        if np is None:
+            raise ImportError("The embedding store requires numpy: pip install numpy")
+        self.root = Path(root)
+        self.dim = dim
+        self.vectors_path = self.root / 'vectors.f32'
+        self.ids_path = self.root / 'ids.jsonl'
+        self.lock_path = self.root / '.lock'
+        self._records = None
+        self._rows = None
+        self._matrix = None
+
+    def _load(self):
+        if self._records is not None:
+            return
+        self._records = list(load_jsonl(self.ids_path))
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        rows = min(len(self._records), size // (4 * self.dim))
+        self._records = self._records[:rows]
+        self._rows = {record['id']: i for i, record in enumerate(self._records)}
+        self._matrix = None
+
+    def __len__(self):
+        self._load()
+        return len(self._records)
+
+    def __contains__(self, item_id):
+        self._load()
+        return item_id in self._rows
+
+    @property
+    def matrix(self):
+        """Zero-copy (n, dim) view of the stored vectors"""
+        self._load()
+        if self._matrix is None:
+            if not self._records:
+                self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                         shape=(len(self._records), self.dim))
+        return self._matrix
+
+    def record(self, item_id):
+        self._load()
+        row = self._rows.get(item_id)
+        return None if row is None else self._records[row]
+
+    @contextmanager
+    def _locked(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def append(self, items):
+        """
+        Append (record, vector) pairs, skipping ids already stored
+
+        record needs at least 'id' and 'kind'. Returns the number added.
+        """
+        with self._locked():
+            # Another process may have appended since we last looked
+            self._records = None
+            self._load()
+
+            new = []
+            for record, vector in items:
+                if record['id'] in self._rows:
+                    continue
+                self._rows[record['id']] = -1
+                new.append((record, np.asarray(vector, dtype=np.float32).reshape(self.dim)))
+            if not new:
+                return 0
+
+            # Drop any torn rows past the last indexed record before appending
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(len(self._records) * 4 * self.dim)
+                f.write(np.vstack([v for _, v in new]).tobytes())
+            append_jsonl([r for r, _ in new], self.ids_path)
+
+        self._records = None
+        return len(new)
+
+    def add_texts(self, entries):
+        """Embed and append entries of {id, kind, text, ...}"""
+        return self.append(
+            (dict(e, text=e['text'][:500]), embed_text(e['text']))
+            for e in entries if e['id'] not in self
+        )
+
+    def top_k(self, query, k=5, kind=None, ids=None):
+        """
+        Most similar stored items to query (text or vector) by cosine
+
+        kind and ids restrict the candidates. Returns [(score, record)].
+        """
+        matrix = self.matrix
+        if not len(matrix):
+            return []
+        vector = embed_text(query) if isinstance(query, str) else np.asarray(query, dtype=np.float32)
+        scores = matrix @ vector
+
+        if kind is not None or ids is not None:
+            wanted = set(ids) if ids is not None else None
+            mask = np.fromiter(
+                ((kind is None or r['kind'] == kind) and (wanted is None or r['id'] in wanted)
+                 for r in self._records),
+                dtype=bool, count=len(self._records)
+            )
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self._records[i]) for i in top if np.isfinite(scores[i])]
+
+
+def brief_entries(briefs):
+    """Store entries for intake briefs"""
+    return [
+        {
+            'id': brief_id(b),
+            'kind': 'brief',
+            'title': b.get('title', ''),
+            'url': b.get('url', ''),
+            'text': f"{b.get('title', '')}\n{b.get('summary', '')}"
+        }
+        for b in briefs
+    ]
+
+
+def claim_entries(claims):
+    """Store entries for research claims"""
+    return [
+        {
+            'id': claim_id(c),
+            'kind': 'claim',
+            'title': c.get('claim_text', '')[:120],
+            'url': c.get('source_url', ''),
+            'text': f"{c.get('claim_text', '')}\n{c.get('evidence_snippet', '')}"
+        }
+        for c in claims
+    ]
+
+
+def dedupe_briefs(briefs, store=None, threshold=DUPLICATE_THRESHOLD):
+    """
+    Drop briefs that duplicate each other or anything already stored
+
+    Returns (kept, dropped). Exact URL repeats, within the batch or of a
+    brief already in the store, are always dropped.
+    """
+    kept, dropped, kept_vectors, seen_urls = [], [], [], set()
+    for brief in briefs:
+        url = brief.get('url')
+        if (url and url in seen_urls) or (store is not None and brief_id(brief) in store):
+            dropped.append(brief)
+            continue
+
+        vector = embed_text(f"{brief.get('title', '')}\n{brief.get('summary', '')}")
+        duplicate = False
+        if kept_vectors and float(np.max(np.vstack(kept_vectors) @ vector)) >= threshold:
+            duplicate = True
+        elif store is not None:
+            match = store.top_k(vector, k=1, kind='brief')
+            duplicate = bool(match) and match[0][0] >= threshold
+
+        if duplicate:
+            dropped.append(brief)
+        else:
+            kept.append(brief)
+            kept_vectors.append(vector)
+            if url:
+                seen_urls.add(url)
+    return kept, dropped
@@ -2,11 +2,12 @@
 Evidence Gate - Hard blocker for weakly supported claims
 """
 import json
-import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from agents.utils import (
     get_anthropic_client,
     load_markdown,
+    parse_frontmatter,
     save_json,
     print_section,
     print_success,
@@ -14,12 +15,98 @@ from agents.utils import (
     print_warning,
     print_info
 )
+from agents.citations import CitationIndex
+from agents.claim_registry import ClaimRegistry, claim_numbers
+from agents.glossary import check_glossary_terms
+from agents.risk_scan import get_scanner, body_line_offset
+from agents.retrieval import retrieve_evidence, get_evidence_index
+from agents.profiling import mark_stage
+from agents.model_router import routed_call
+from agents.prompt_budget import PromptBudget, split_text
 
 
-def run_evidence_gate(draft_path):
+# Parallel claim verifications
+GATE_CONCURRENCY = 4
+
+EXTRACT_PROMPT = """Extract all factual claims from this draft that require evidence/citation:
+
+DRAFT:
+{text}
+
+For each claim, identify:
+1. The specific factual assertion
+2. Whether it needs a source/citation
+3. The confidence level implied
+
+Return a JSON array of claims:
+[
+  {{"claim_id": 1, "claim_text": "...", "needs_evidence": true, "implied_confidence": "high"}},
+  ...
+]
+
+Focus on quantitative claims, market structure assertions, and mechanism explanations.
+Exclude: definitions, obvious truths, logical deductions."""
+
+VERIFY_PROMPT = """Verify this claim:
+
+CLAIM: "{claim_text}"
+
+DRAFT CONTEXT (for finding citations):
+{draft_context}
+
+CITED URLS NEARBY:
+{urls}
+
+RELEVANT SOURCE PASSAGES (retrieved from stored sources; "(cited)" = cited near the claim):
+{passages}
+
+Assess:
+1. Does the claim have a credible source cited?
+2. Is the claim appropriately hedged for its evidence?
+3. Is it overstated relative to available evidence?
+4. Do the retrieved passages actually support the claim?
+
+Return JSON:
+{{
+  "status": "pass"|"warning"|"fail",
+  "reason": "explanation",
+  "evidence_urls": ["url1", "url2"],
+  "confidence_assessment": "appropriate"|"overstated"|"understated",
+  "suggested_revision": "if needed",
+  "verdict_confidence": "high"|"medium"|"low"
+}}
+
+FAIL if: no credible source, claim is overstated, or appears to be speculation presented as fact.
+WARNING if: weak source, hedge needed, or missing context.
+PASS if: claim has credible source and appropriate confidence level."""
+
+
+def claim_risk(claim, citations):
+    """
+    How likely a claim is to fail verification (higher = check first)
+
+    Uncited claims fail most often, then quantitative ones, then claims
+    stated with high confidence.
+    """
+    claim_text = claim.get('claim_text', claim.get('text', ''))
+    score = 0
+    if not citations.urls_near(claim_text):
+        score += 3
+    if claim_numbers(claim_text):
+        score += 2
+    if str(claim.get('implied_confidence', '')).lower() == 'high':
+        score += 1
+    return score
+
+
+def run_evidence_gate(draft_path, fail_fast=False):
     """
     Run evidence gate on draft
     Returns: (passed: bool, claim_table: dict, issues: list)
+
+    With fail_fast, local checks run first, claims are verified riskiest
+    first, and the first blocking failure cancels the verifications still
+    queued (claims left unchecked are marked 'skipped').
     """
     print_section("EVIDENCE GATE")
 
@@ -32,53 +119,81 @@ def run_evidence_gate(draft_path):
         return False, {}, [f"Could not load draft: {e}"]
 
     draft_text = draft['body']
+    frontmatter = parse_frontmatter(draft['frontmatter'])
     word_count = len(draft_text.split())
     print_info(f"Draft length: {word_count} words")
 
-    # Extract claims from draft
-    print_info("Extracting claims from draft...")
-    claims = extract_claims(draft_text)
-    print_info(f"Found {len(claims)} claims to verify")
-
-    # Verify each claim
-    print_info("Verifying claims against evidence...")
-    client = get_anthropic_client()
-
-    verification_results = []
     issues = []
+    warnings = []
 
-    for i, claim in enumerate(claims, 1):
-        claim_text = claim.get('claim_text', claim.get('text', 'Unknown claim'))
-        print(f"  [{i}/{len(claims)}] Verifying: {claim_text[:80]}...")
-
-        result = verify_single_claim(client, claim, draft_text)
-        verification_results.append(result)
-
-        if result['status'] == 'fail':
-            issues.append(result)
-            print_error(f"    FAIL: {result['reason']}")
-        elif result['status'] == 'warning':
-            print_warning(f"    WARNING: {result['reason']}")
-        else:
-            print_success(f"    PASS")
-
-    # Check for risky content
+    # Check for risky content (local and instant, so it goes first)
+    mark_stage("gate: content checks")
     print_info("Checking for risky content...")
-    risky_content = check_risky_content(draft_text)
+    allow = get_scanner().allowed_for(frontmatter.get('slug') or Path(draft_path).stem, frontmatter)
+    risky_content = check_risky_content(draft_text, allow, body_line_offset(draft['full'], draft_text))
     if risky_content:
         issues.extend(risky_content)
         for risk in risky_content:
             print_error(f"  RISKY: {risk['reason']}")
 
+    # Cross-reference technical terms with the glossary (warnings only)
+    print_info("Checking technical terms against glossary...")
+    undefined_terms = check_glossary_terms(draft_text)
+    if undefined_terms:
+        print_warning(f"  {len(undefined_terms)} terms not defined in content/glossary/:")
+        print(f"    {', '.join(w['claim_text'] for w in undefined_terms)}")
+    warnings.extend(undefined_terms)
+
+    claims = []
+    if fail_fast and issues:
+        print_warning("Fail-fast: skipping claim verification")
+    else:
+        # Extract claims from draft
+        mark_stage("gate: extract claims")
+        print_info("Extracting claims from draft...")
+        claims = extract_claims(draft_text)
+        print_info(f"Found {len(claims)} claims to verify")
+        if not claims and claim_numbers(draft_text):
+            print_warning("  Draft states numbers but no claims were extracted")
+            warnings.append({
+                'status': 'warning',
+                'reason': "Draft states numbers but no claims were extracted; nothing was verified",
+                'claim_text': '',
+                'type': 'no_claims'
+            })
+
+    # Verify each claim
+    mark_stage("gate: verify claims")
+    citations = CitationIndex(draft_text)
+    registry = ClaimRegistry()
+    post = Path(draft_path).stem
+    results = verify_claims(claims, draft_text, citations, registry, post, fail_fast, warnings)
+
+    verification_results = [results.get(i) or {
+        'claim_text': claim.get('claim_text', claim.get('text', 'Unknown claim')),
+        'status': 'skipped',
+        'reason': 'Not verified: gate stopped at the first failure (fail-fast)'
+    } for i, claim in enumerate(claims)]
+    skipped = sum(1 for r in verification_results if r['status'] == 'skipped')
+    reused = sum(1 for r in verification_results if r.get('reused_from'))
+    issues.extend(r for r in verification_results if r['status'] == 'fail')
+
+    # Share verdicts with future gate runs on other posts
+    registry.record([r for r in verification_results if r['status'] != 'skipped'], post)
+
     # Generate claim table
     claim_table = {
         'draft_path': draft_path,
         'generated_at': Path(draft_path).stat().st_mtime,
         'word_count': word_count,
         'total_claims': len(claims),
+        'reused_verdicts': reused,
+        'skipped_claims': skipped,
+        'fail_fast': fail_fast,
         'claims': verification_results,
         'gate_status': 'PASSED' if not issues else 'FAILED',
-        'issues': issues
+        'issues': issues,
+        'warnings': warnings
     }
 
     # Print summary
@@ -86,6 +201,8 @@ def run_evidence_gate(draft_path):
     print("="*70)
     if issues:
         print_error(f"GATE FAILED: {len(issues)} blocking issues found")
+        if skipped:
+            print_info(f"{skipped} claims not checked (fail-fast)")
         print()
         print("Issues:")
         for issue in issues:
@@ -101,55 +218,132 @@ def run_evidence_gate(draft_path):
     return len(issues) == 0, claim_table, issues
 
 
-def extract_claims(text):
+def verify_claims(claims, draft_text, citations, registry, post, fail_fast=False, warnings=None,
+                  max_workers=GATE_CONCURRENCY):
     """
-    Extract factual claims from draft text
-    Returns list of {text, paragraph_index}
+    Verify claims in parallel; returns {claim index: result}
+
+    Verdicts reusable from other posts are applied without an LLM call.
+    With fail_fast, claims are submitted riskiest first and the first
+    'fail' cancels everything not yet started; calls already in flight
+    are abandoned rather than awaited.
     """
+    if not claims:
+        return {}
+    warnings = warnings if warnings is not None else []
+    order = list(range(len(claims)))
+    if fail_fast:
+        order.sort(key=lambda i: -claim_risk(claims[i], citations))
+
+    print_info("Verifying claims against evidence..." + (" (riskiest first, fail-fast)" if fail_fast else ''))
     client = get_anthropic_client()
+    # Build the shared index once here rather than racing in the workers
+    get_evidence_index()
+
+    results = {}
+    failed = False
+
+    def report(i, result):
+        nonlocal failed
+        claim_text = result['claim_text']
+        results[i] = result
+        print(f"  [{i + 1}/{len(claims)}] {claim_text[:80]}...")
+        if result.get('reused_from'):
+            print_info(f"    Reusing verdict from {result['reused_from']}")
+        for other in registry.contradictions(claim_text, post):
+            warnings.append({
+                'status': 'warning',
+                'reason': f"Numbers differ from {other['post']}: \"{other['claim_text']}\"",
+                'claim_text': claim_text,
+                'type': 'contradiction',
+                'other_post': other['post']
+            })
+            print_warning(f"    CONTRADICTS {other['post']}: {other['claim_text'][:80]}")
+        if result['status'] == 'fail':
+            failed = True
+            print_error(f"    FAIL: {result['reason']}")
+        elif result['status'] == 'warning':
+            print_warning(f"    WARNING: {result['reason']}")
+        else:
+            print_success(f"    PASS")
 
-    prompt = f"""Extract all factual claims from this draft that require evidence/citation:
-
-DRAFT:
-{text}
-
-For each claim, identify:
-1. The specific factual assertion
-2. Whether it needs a source/citation
-3. The confidence level implied
-
-Return a JSON array of claims:
-[
-  {{"claim_id": 1, "claim_text": "...", "needs_evidence": true, "implied_confidence": "high"}},
-  ...
-]
+    # Same claim with the same evidence was already judged in another post
+    pending = []
+    for i in order:
+        claim_text = claims[i].get('claim_text', claims[i].get('text', 'Unknown claim'))
+        prior = registry.reusable_verdict(claim_text, citations.urls_near(claim_text), post)
+        if prior:
+            similarity, record = prior
+            report(i, {
+                'claim_text': claim_text,
+                'status': record['status'],
+                'reason': record['reason'],
+                'evidence_urls': record.get('evidence_urls', []),
+                'reused_from': record['post'],
+                'reuse_similarity': round(similarity, 2)
+            })
+            if failed and fail_fast:
+                return results
+        else:
+            pending.append(i)
 
-Focus on quantitative claims, market structure assertions, and mechanism explanations.
-Exclude: definitions, obvious truths, logical deductions."""
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {pool.submit(verify_single_claim, client, claims[i], draft_text, citations): i for i in pending}
+    try:
+        for future in as_completed(futures):
+            report(futures[future], future.result())
+            if failed and fail_fast:
+                print_warning("Fail-fast: cancelling remaining verifications")
+                break
+    finally:
+        pool.shutdown(wait=not (failed and fail_fast), cancel_futures=True)
+    return results
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4000,
-        temperature=0.3,
-        messages=[{"role": "user", "content": prompt}]
-    )
 
-    result_text = response.content[0].text
+def extract_claims(text):
+    """
+    Extract factual claims from draft text
+    Returns list of {claim_id, claim_text, needs_evidence, implied_confidence}
 
-    # Extract JSON
-    try:
-        start = result_text.find('[')
-        end = result_text.rfind(']') + 1
-        if start != -1 and end > start:
-            claims_data = json.loads(result_text[start:end])
-            return [c for c in claims_data if c.get('needs_evidence', True)]
-    except:
-        pass
+    A draft over the prompt budget is read in budget-sized chunks, one call
+    each, so claims late in a long draft are never cut off. A chunk that
+    states numbers but comes back with no claims counts as low confidence.
+    """
+    client = get_anthropic_client()
 
-    return []
+    template = EXTRACT_PROMPT.format(text='')
+    sizing = PromptBudget('extract_claims')
+    sizing.reserve(template)
+    chunks = split_text(text, sizing.remaining)
+    if len(chunks) > 1:
+        print_info(f"  Draft is over the extraction budget; reading it in {len(chunks)} parts")
+
+    claims = []
+    for chunk in chunks:
+        budget = PromptBudget('extract_claims')
+        budget.reserve(template)
+        prompt = EXTRACT_PROMPT.format(text=budget.text('draft', chunk))
+
+        claims_data, _ = routed_call(
+            client, 'extract_claims',
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=4000,
+            temperature=0.3,
+            parse=parse_json_array,
+            low_confidence=lambda found, chunk=chunk: not found and bool(claim_numbers(chunk)),
+            budget=budget
+        )
+        if claims_data is None:
+            continue
+        claims.extend(c for c in claims_data if isinstance(c, dict) and c.get('needs_evidence', True))
+
+    # Chunks number their claims from 1 each
+    for i, claim in enumerate(claims, 1):
+        claim['claim_id'] = i
+    return claims
 
 
-def verify_single_claim(client, claim, full_draft):
+def verify_single_claim(client, claim, full_draft, citations=None):
     """
     Verify a single claim
     Returns: {status: 'pass'|'warning'|'fail', reason, evidence_urls, confidence}
@@ -157,55 +351,47 @@ def verify_single_claim(client, claim, full_draft):
     claim_text = claim['claim_text']
 
     # Check if claim has citation in draft
-    urls = extract_urls_near_claim(full_draft, claim_text)
-
-    prompt = f"""Verify this claim:
-
-CLAIM: "{claim_text}"
-
-DRAFT CONTEXT (for finding citations):
-{full_draft[:3000]}
-
-CITED URLS NEARBY:
-{chr(10).join(urls) if urls else "No URLs found"}
-
-Assess:
-1. Does the claim have a credible source cited?
-2. Is the claim appropriately hedged for its evidence?
-3. Is it overstated relative to available evidence?
-
-Return JSON:
-{{
-  "status": "pass"|"warning"|"fail",
-  "reason": "explanation",
-  "evidence_urls": ["url1", "url2"],
-  "confidence_assessment": "appropriate"|"overstated"|"understated",
-  "suggested_revision": "if needed"
-}}
-
-FAIL if: no credible source, claim is overstated, or appears to be speculation presented as fact.
-WARNING if: weak source, hedge needed, or missing context.
-PASS if: claim has credible source and appropriate confidence level."""
+    citations = citations or CitationIndex(full_draft)
+    urls = citations.urls_near(claim_text)
+
+    # Top passages from stored sources and intake (never fetched here)
+    passages = retrieve_evidence(claim_text, urls)
+    url_text = "\n".join(urls) if urls else "No URLs found"
+
+    # Passages first, then as much of the draft around the claim as fits
+    budget = PromptBudget('verify_single_claim')
+    budget.reserve(VERIFY_PROMPT.format(claim_text=claim_text, draft_context='', urls=url_text, passages=''))
+    excerpt_text, _ = budget.items('passages', (
+        f"[{p['url']}]{' (cited)' if p['cited'] else ''}\n{p['text']}"
+        for p in passages
+    ))
+    span = citations.locate(claim_text)
+    blocks = [full_draft[start:end] for start, end in citations.paragraphs]
+    center = citations.paragraphs.index(citations.paragraph_of(span[0])) if span and blocks else 0
+    draft_context = budget.around('draft', blocks, center)
+
+    prompt = VERIFY_PROMPT.format(
+        claim_text=claim_text,
+        draft_context=draft_context,
+        urls=url_text,
+        passages=excerpt_text or "No stored source passages match this claim"
+    )
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
+    result, _ = routed_call(
+        client, 'verify_single_claim',
+        messages=[{"role": "user", "content": prompt}],
         max_tokens=1000,
         temperature=0.3,
-        messages=[{"role": "user", "content": prompt}]
+        parse=parse_json_object,
+        low_confidence=lambda r: str(r.get('verdict_confidence', '')).lower() == 'low',
+        budget=budget
     )
-
-    result_text = response.content[0].text
-
-    # Extract JSON
-    try:
-        start = result_text.find('{')
-        end = result_text.rfind('}') + 1
-        if start != -1 and end > start:
-            result = json.loads(result_text[start:end])
-            result['claim_text'] = claim_text
-            return result
-    except:
-        pass
+    if result is not None:
+        result['claim_text'] = claim_text
+        result['evidence_passages'] = [
+            {'url': p['url'], 'score': p['score'], 'cited': p['cited']} for p in passages
+        ]
+        return result
 
     # Fallback
     return {
@@ -217,46 +403,53 @@ PASS if: claim has credible source and appropriate confidence level."""
     }
 
 
-def extract_urls_near_claim(text, claim_text):
-    """Extract URLs within 500 chars of claim"""
-    # Find claim position
-    claim_pos = text.lower().find(claim_text.lower())
-    if claim_pos == -1:
-        claim_pos = 0
-
-    # Get context around claim
-    start = max(0, claim_pos - 500)
-    end = min(len(text), claim_pos + len(claim_text) + 500)
-    context = text[start:end]
+def parse_json_object(text):
+    """The outermost {...} in a model reply, or None"""
+    start = text.find('{')
+    end = text.rfind('}') + 1
+    if start == -1 or end <= start:
+        return None
+    value = json.loads(text[start:end])
+    return value if isinstance(value, dict) else None
 
-    # Extract URLs
-    url_pattern = r'https?://[^\s\)"\']+'
-    urls = re.findall(url_pattern, context)
 
-    return urls
+def parse_json_array(text):
+    """The outermost [...] in a model reply, or None"""
+    start = text.find('[')
+    end = text.rfind(']') + 1
+    if start == -1 or end <= start:
+        return None
+    value = json.loads(text[start:end])
+    return value if isinstance(value, list) else None
 
 
-def check_risky_content(text):
-    """Check for risky content patterns"""
-    issues = []
+def extract_urls_near_claim(text, claim_text):
+    """
+    Extract URLs cited near a claim
 
-    # Check for venue-specific exploitation guidance
-    risky_patterns = [
-        (r'exploit\s+\w+\s+exchange', 'Appears to describe venue-specific exploitation'),
-        (r'take advantage of.+vulnerability', 'May describe vulnerability exploitation'),
-        (r'backdoor|loophole|trick', 'Contains potentially manipulative language'),
-    ]
+    Builds a one-off CitationIndex; callers checking many claims against the
+    same draft should build the index once and call urls_near() directly.
+    """
+    return CitationIndex(text).urls_near(claim_text)
 
-    for pattern, reason in risky_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            issues.append({
-                'status': 'fail',
-                'reason': reason,
-                'claim_text': 'Risky content detected',
-                'type': 'risky_content'
-            })
 
-    # Check for undefined technical terms
-    # TODO: Cross-reference with glossary
+def check_risky_content(text, allow=None, line_offset=0):
+    """
+    Check for risky content patterns
 
-    return issues
+    Every match of the rules in agents/configs/risky_content.yaml becomes
+    one issue, with its line, column and surrounding context.
+    """
+    return [
+        {
+            'status': 'fail',
+            'reason': f"{finding['reason']} (line {finding['line']}, col {finding['column']})",
+            'claim_text': finding['context'],
+            'type': 'risky_content',
+            'rule': finding['rule'],
+            'match': finding['match'],
+            'line': finding['line'],
+            'column': finding['column']
+        }
+        for finding in get_scanner().scan(text, allow, line_offset)
+    ]
@@ -0,0 +1,241 @@
+"""
+Feed Builder (Daily Automation)
+Publishes new intake briefs to content/feed/latest.md, rotating older days
+into monthly archive pages, so each update only touches new items
+"""
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from agents.content_index import split_frontmatter
+from agents.utils import (
+    atomic_write,
+    append_jsonl,
+    load_jsonl,
+    print_section,
+    print_success,
+    print_error,
+    print_info,
+    print_warning
+)
+
+
+FEED_DIR = 'content/feed'
+INTAKE_DIR = 'data/intake'
+INDEX_PATH = 'data/feed/published.jsonl'
+
+# Days kept on the latest page; older days move to content/feed/archive/YYYY-MM.md
+LATEST_DAYS = 7
+
+DAY_PATTERN = re.compile(r'^## (\d{4}-\d{2}-\d{2})\s*$', re.MULTILINE)
+ITEM_LINK_PATTERN = re.compile(r'^### \[[^\]]*\]\(([^)\s]+)\)', re.MULTILINE)
+
+ITEM_SEPARATOR = '\n\n---\n\n'
+DAY_SEPARATOR = '\n\n\n'
+
+
+def split_days(body):
+    """
+    Split a feed body into (header, {date: section_text})
+
+    A date heading that appears more than once (e.g. hand-edited pages) is
+    merged into one section, items in page order, so nothing is dropped.
+    """
+    matches = list(DAY_PATTERN.finditer(body))
+    if not matches:
+        return body.rstrip(), {}
+    header = body[:matches[0].start()].rstrip()
+    days = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
+        section = body[match.start():end].strip()
+        date = match.group(1)
+        if date in days:
+            items = section.split('\n', 1)[1].strip() if '\n' in section else ''
+            if items:
+                days[date] = f"{days[date]}\n\n{items}"
+        else:
+            days[date] = section
+    return header, days
+
+
+def join_days(header, days):
+    """Render header plus day sections, newest first"""
+    sections = [days[date] for date in sorted(days, reverse=True)]
+    return DAY_SEPARATOR.join([header] + sections) + '\n'
+
+
+def format_item(brief):
+    """One feed entry: linked title, summary, domains"""
+    domains = brief.get('domains') or []
+    if isinstance(domains, str):
+        domains = [domains]
+    lines = [f"### [{brief.get('title', 'Untitled')}]({brief['url']})", '', brief.get('summary', '').strip()]
+    if domains:
+        lines += ['', f"*Domains: {', '.join(domains)}*"]
+    return '\n'.join(lines).strip()
+
+
+def add_items(days, date, briefs):
+    """Append formatted briefs to a day's section, creating it if needed"""
+    items = ITEM_SEPARATOR.join(format_item(b) for b in briefs) + ITEM_SEPARATOR.rstrip()
+    if date in days:
+        days[date] = f"{days[date]}\n\n{items}"
+    else:
+        days[date] = f"## {date}\n\n{items}"
+
+
+def read_page(path):
+    """(frontmatter_str, header, days) for a feed page, empty if missing"""
+    if not Path(path).exists():
+        return '', '', {}
+    frontmatter, body = split_frontmatter(Path(path).read_text())
+    header, days = split_days(body)
+    return frontmatter, header, days
+
+
+def write_page(path, frontmatter, header, days):
+    with atomic_write(path) as f:
+        f.write(f"---\n{frontmatter}\n---\n\n{join_days(header, days)}")
+
+
+class PublishedIndex:
+    """
+    Append-only log of published URLs: data/feed/published.jsonl
+
+    One {url, date} record per item. A missing log is bootstrapped from the
+    links already on the feed pages.
+    """
+
+    def __init__(self, path=INDEX_PATH, feed_dir=FEED_DIR):
+        self.path = path
+        self.urls = set()
+        self.last_date = ''
+        if not Path(path).exists():
+            self._bootstrap(feed_dir)
+        for record in load_jsonl(path):
+            self.urls.add(record['url'])
+            self.last_date = max(self.last_date, record.get('date', ''))
+
+    def _bootstrap(self, feed_dir):
+        records = []
+        for page in sorted(Path(feed_dir).glob('**/*.md')):
+            _, days = split_days(split_frontmatter(page.read_text())[1])
+            for date, section in days.items():
+                records.extend({'url': url, 'date': date} for url in ITEM_LINK_PATTERN.findall(section))
+        append_jsonl(records, self.path)
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def add(self, date, urls):
+        append_jsonl([{'url': url, 'date': date} for url in urls], self.path)
+        self.urls.update(urls)
+        self.last_date = max(self.last_date, date)
+
+
+def pending_briefs(index, intake_dir=INTAKE_DIR):
+    """
+    Unpublished briefs grouped by day, oldest day first
+
+    Only intake files dated on or after the last published day are read.
+    """
+    pending = {}
+    for file in sorted(Path(intake_dir).glob('*.json')):
+        if file.stem[:10] < index.last_date:
+            continue
+        try:
+            with open(file) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print_warning(f"Could not load {file.name}: {e}")
+            continue
+
+        date = (data.get('date') or file.stem)[:10]
+        briefs = data['briefs'] if 'briefs' in data else [data]
+        for brief in briefs:
+            url = brief.get('url')
+            if not url or url in index or any(url == b['url'] for b in pending.get(date, [])):
+                continue
+            pending.setdefault(date, []).append(brief)
+    return dict(sorted(pending.items()))
+
+
+def archive_path(feed_dir, month):
+    return Path(feed_dir) / 'archive' / f"{month}.md"
+
+
+def archive_frontmatter(month, days):
+    title = datetime.strptime(month, '%Y-%m').strftime('%B %Y')
+    return f'title: "Research Feed: {title}"\ndate: {max(days)}\nlayout: single'
+
+
+def rotate_days(feed_dir, days, keep):
+    """Move all but the newest `keep` days into monthly archive pages"""
+    old = sorted(days, reverse=True)[keep:]
+    by_month = {}
+    for date in old:
+        by_month.setdefault(date[:7], {})[date] = days.pop(date)
+
+    for month, month_days in by_month.items():
+        path = archive_path(feed_dir, month)
+        _, header, archived = read_page(path)
+        for date, section in month_days.items():
+            if date in archived:
+                # Same day split across runs: keep both halves
+                items = section.split('\n', 1)[1].strip()
+                section = f"{archived[date]}\n\n{items}"
+            archived[date] = section
+        header = header or f"# Research Feed: {datetime.strptime(month, '%Y-%m').strftime('%B %Y')}"
+        write_page(path, archive_frontmatter(month, archived), header, archived)
+
+    index_page = Path(feed_dir) / 'archive' / '_index.md'
+    if by_month and not index_page.exists():
+        with atomic_write(index_page) as f:
+            f.write('---\ntitle: "Research Feed Archive"\n---\n\nOlder daily links, one page per month.\n')
+    return sorted(by_month)
+
+
+def publish_feed(intake_dir=INTAKE_DIR, feed_dir=FEED_DIR, keep_days=LATEST_DAYS):
+    """
+    Publish new intake briefs to the feed
+
+    Cost is proportional to the new items plus the bounded latest page and
+    any month page receiving rotated days, never to the full history.
+    """
+    print_section("FEED UPDATE")
+
+    if keep_days < 1:
+        print_error(f"keep_days must be at least 1 (got {keep_days})")
+        return 0
+
+    index = PublishedIndex(feed_dir=feed_dir)
+    pending = pending_briefs(index, intake_dir)
+    if not pending:
+        print_info("No new briefs to publish")
+        return 0
+
+    latest = Path(feed_dir) / 'latest.md'
+    frontmatter, header, days = read_page(latest)
+    if not frontmatter:
+        frontmatter = f'title: "Research Feed"\ndate: {max(pending)}\nlayout: single'
+        header = "# What We're Reading\n\nDaily links from the research collective's morning standups.\n\n---"
+
+    for date, briefs in pending.items():
+        add_items(days, date, briefs)
+
+    rotated = rotate_days(feed_dir, days, keep_days)
+    newest = max(days) if days else max(pending)
+    frontmatter = re.sub(r'^date: .*$', f"date: {newest}", frontmatter, count=1, flags=re.MULTILINE)
+    write_page(latest, frontmatter, header, days)
+
+    # Record only after the archive and latest pages are written, so a crash republishes rather than drops
+    published = 0
+    for date, briefs in pending.items():
+        index.add(date, [b['url'] for b in briefs])
+        published += len(briefs)
+
+    print_success(f"Published {published} items across {len(pending)} days: {latest}")
+    if rotated:
+        print_info(f"Archived months: {', '.join(rotated)}")
+    return published
@@ -2,9 +2,7 @@
 Finalization Agent (Friday Automation)
 Finalizes draft, runs evidence gate, generates artifacts, creates PR
 """
-import yaml
 from pathlib import Path
-from datetime import datetime
 from agents.utils import (
     get_anthropic_client,
     load_markdown,
@@ -18,9 +16,18 @@ from agents.utils import (
     print_info
 )
 from agents.evidence_gate import run_evidence_gate
+from agents.social import generate_social_drafts
+from agents.frontmatter import generate_frontmatter
+from agents.profiling import mark_stage
+from agents.linking import (
+    find_link_candidates,
+    rerank_with_llm,
+    format_link_suggestions,
+    strip_link_suggestions
+)
 
 
-def finalize_post(draft_path, skip_gate=False, no_pr=False):
+def finalize_post(draft_path, skip_gate=False, no_pr=False, rerank_links=False, fail_fast=True):
     """
     Finalize draft and prepare for publishing
 
@@ -47,7 +54,7 @@ def finalize_post(draft_path, skip_gate=False, no_pr=False):
     # Step 1: Evidence gate
     if not skip_gate:
         print()
-        passed, claim_table, issues = run_evidence_gate(str(draft_path))
+        passed, claim_table, issues = run_evidence_gate(str(draft_path), fail_fast=fail_fast)
 
         if not passed:
             print()
@@ -65,14 +72,16 @@ def finalize_post(draft_path, skip_gate=False, no_pr=False):
 
     # Step 2: Generate/update frontmatter
     print()
+    mark_stage("finalize: frontmatter")
     print_info("Generating frontmatter metadata...")
     frontmatter = generate_frontmatter(draft['body'], draft.get('frontmatter', ''))
     print_success("Frontmatter generated")
 
     # Step 3: Add internal links
     print()
+    mark_stage("finalize: internal links")
     print_info("Suggesting internal links...")
-    updated_body = suggest_internal_links(draft['body'])
+    updated_body = suggest_internal_links(draft['body'], str(draft_path), rerank_links)
     if updated_body != draft['body']:
         print_success("Added internal link suggestions (marked with <!-- SUGGESTED -->)")
     else:
@@ -84,6 +93,7 @@ def finalize_post(draft_path, skip_gate=False, no_pr=False):
 
     # Step 4: Generate social drafts
     print()
+    mark_stage("finalize: social drafts")
     print_info("Generating social media drafts...")
     social_drafts = generate_social_drafts(draft['body'], frontmatter)
     social_path = f"data/social/{draft_path.stem}.json"
@@ -109,203 +119,21 @@ def finalize_post(draft_path, skip_gate=False, no_pr=False):
         print_info("\nTo auto-create PR, re-run without --no-pr")
 
 
-def generate_frontmatter(body, existing_frontmatter=''):
-    """Generate frontmatter from body content"""
-    client = get_anthropic_client()
-
-    # Parse existing frontmatter if any
-    existing_data = {}
-    if existing_frontmatter:
-        try:
-            existing_data = yaml.safe_load(existing_frontmatter)
-        except:
-            pass
-
-    prompt = f"""Analyze this draft and generate Hugo frontmatter:
-
-DRAFT:
-{body[:3000]}
-
-EXISTING FRONTMATTER (if any):
-{existing_frontmatter}
-
-Generate complete frontmatter with:
-- title (if not exists)
-- date (today if not exists)
-- description (150-170 chars, SEO-optimized)
-- markets: ["equities"|"crypto"|"both"]
-- mechanisms: [1-6] (adverse selection=1, inventory risk=2, coordination cost=3, arbitrage=4, info asymmetry=5, queue priority=6)
-- latency_budget: ["propagation","processing","queuing","jitter"]
-- mean_vs_tail: ["mean"|"tail"|"both"]
-- status: ["reference"|"working-notes"|"speculation"]
-- confidence: ["high"|"medium"|"low"]
-- sources: [URLs cited in draft]
-
-Return as valid YAML (not JSON). Preserve existing fields unless they need updating."""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1500,
-        temperature=0.3,
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    result_text = response.content[0].text
-
-    # Extract YAML
-    try:
-        # Find YAML block
-        if '```' in result_text:
-            start = result_text.find('```') + 3
-            if result_text[start:start+4] == 'yaml':
-                start += 4
-            end = result_text.find('```', start)
-            yaml_text = result_text[start:end].strip()
-        else:
-            yaml_text = result_text.strip()
-
-        frontmatter_data = yaml.safe_load(yaml_text)
-
-        # Ensure required fields
-        if 'date' not in frontmatter_data:
-            frontmatter_data['date'] = datetime.now().strftime('%Y-%m-%d')
-
-        return frontmatter_data
-
-    except Exception as e:
-        print_warning(f"Could not parse frontmatter: {e}")
-        # Return existing or minimal
-        return existing_data or {
-            'title': 'Untitled',
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'draft': True
-        }
-
-
-def suggest_internal_links(body):
-    """Suggest internal links to evergreen hubs"""
-    client = get_anthropic_client()
-
-    # List of evergreen hubs (TODO: load dynamically)
-    evergreen_hubs = [
-        {"slug": "adverse-selection", "title": "Adverse Selection"},
-        {"slug": "inventory-risk", "title": "Inventory Risk"},
-        {"slug": "coordination-cost", "title": "Coordination Cost"},
-        {"slug": "arbitrage-capture", "title": "Arbitrage Capture"},
-        {"slug": "information-asymmetry", "title": "Information Asymmetry"},
-        {"slug": "queue-priority", "title": "Queue Priority"}
-    ]
-
-    prompt = f"""Analyze this draft and suggest 2-5 internal links to evergreen hubs:
-
-DRAFT:
-{body[:2500]}
-
-AVAILABLE EVERGREEN HUBS:
-{chr(10).join([f"- /evergreen/{h['slug']}/ ({h['title']})" for h in evergreen_hubs])}
-
-For each suggested link:
-1. Identify the sentence or phrase to link
-2. Specify which evergreen hub to link to
-3. Explain why
-
-Return as JSON:
-[
-  {{"phrase": "...", "hub_slug": "...", "reason": "..."}},
-  ...
-]
-
-Only suggest links that add value - don't over-link."""
+def suggest_internal_links(body, draft_path=None, rerank=False):
+    """
+    Suggest internal links to evergreen hubs, glossary terms and posts
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1000,
-        temperature=0.5,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    Candidates come from the local content index; Claude is only asked to
+    re-rank them when rerank=True.
+    """
+    body = strip_link_suggestions(body)
+    candidates = find_link_candidates(body, draft_path)
 
-    result_text = response.content[0].text
+    if rerank and candidates:
+        candidates = rerank_with_llm(get_anthropic_client(), body, candidates)
 
     # For now, just add as comments (human decides whether to add)
-    updated_body = body
-
-    try:
-        import json
-        start = result_text.find('[')
-        end = result_text.rfind(']') + 1
-        if start != -1 and end > start:
-            suggestions = json.loads(result_text[start:end])
-
-            if suggestions:
-                updated_body += "\n\n<!-- SUGGESTED INTERNAL LINKS:\n"
-                for s in suggestions:
-                    updated_body += f"- Link '{s['phrase']}' to /evergreen/{s['hub_slug']}/\n"
-                    updated_body += f"  Reason: {s['reason']}\n"
-                updated_body += "-->\n"
-
-    except:
-        pass
-
-    return updated_body
-
-
-def generate_social_drafts(body, frontmatter):
-    """Generate social media drafts"""
-    client = get_anthropic_client()
-
-    title = frontmatter.get('title', 'Untitled')
-    description = frontmatter.get('description', '')
-
-    prompt = f"""Generate social media drafts for this article:
-
-TITLE: {title}
-
-DESCRIPTION: {description}
-
-BODY EXCERPT:
-{body[:2000]}
-
-Generate:
-1. LinkedIn Post (Variant A) - Professional, insight-focused (200-250 words)
-2. LinkedIn Post (Variant B) - Question/hook-driven (150-200 words)
-3. X Thread (5-7 tweets) - Technical, data-driven
-4. 3 Community Discussion Prompts - Open-ended questions to spark discussion
-
-Return as JSON:
-{{
-  "linkedin_a": "...",
-  "linkedin_b": "...",
-  "x_thread": ["tweet1", "tweet2", ...],
-  "community_prompts": ["...", "...", "..."]
-}}
-
-Guidelines:
-- LinkedIn: Professional tone, cite data, thought-provoking
-- X: Punchy, technical, thread format
-- Prompts: Open questions that invite expertise"""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=2500,
-        temperature=0.7,
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    result_text = response.content[0].text
-
-    # Extract JSON
-    try:
-        import json
-        start = result_text.find('{')
-        end = result_text.rfind('}') + 1
-        if start != -1 and end > start:
-            return json.loads(result_text[start:end])
-    except:
-        pass
+    if not candidates:
+        return body
 
-    return {
-        "linkedin_a": "Draft generation failed",
-        "linkedin_b": "Draft generation failed",
-        "x_thread": [],
-        "community_prompts": []
-    }
+    return body.rstrip() + "\n\n" + format_link_suggestions(candidates)
@@ -0,0 +1,342 @@
+"""
+Frontmatter - derive post frontmatter locally, ask the model only for judgment
+
+Mechanical fields (date, title, sources, markets, latency_budget,
+mean_vs_tail) come from the draft itself using the vocabulary in
+agents/configs/frontmatter.yaml. The model is asked for description,
+status, confidence and mechanisms, plus any required field the draft
+doesn't settle, from a short excerpt. Mechanisms the draft mentions are
+only shown to it as suggestions: a post touches more mechanisms than it
+is about. The result is merged with the
+post's existing frontmatter and validated against the schema in the same
+config, so re-running finalize on an unchanged draft gives the same
+frontmatter.
+"""
+import re
+from datetime import date, datetime
+from pathlib import Path
+import yaml
+from agents.utils import (
+    get_anthropic_client,
+    parse_frontmatter,
+    print_info,
+    print_warning
+)
+from agents.citations import CitationIndex
+from agents.content_index import MECHANISM_NAMES, build_mechanism_matcher
+from agents.glossary import MASK_PATTERN
+from agents.text_match import PhraseMatcher
+from agents.model_router import routed_call
+from agents.prompt_budget import PromptBudget
+
+
+FRONTMATTER_CONFIG = Path(__file__).parent / 'configs' / 'frontmatter.yaml'
+
+# Fields only the model can judge
+JUDGMENT_FIELDS = ('description', 'status', 'confidence')
+# Share of the prompt budget for the draft's opening; later headings get the rest
+OPENING_SHARE = 0.75
+# Both counts within this ratio of each other means mean_vs_tail: both
+BOTH_RATIO = 0.5
+
+H1_PATTERN = re.compile(r'^#\s+(.+?)\s*#*\s*$', re.MULTILINE)
+
+JUDGE_PROMPT = """Fill in frontmatter fields for this research post.
+
+KNOWN FIELDS:
+{known}
+
+DRAFT EXCERPT:
+{excerpt}
+
+Return YAML with exactly these fields:
+{fields}"""
+
+_config = None
+_matchers = {}
+
+
+def load_frontmatter_config(path=FRONTMATTER_CONFIG):
+    """Schema and vocabulary, read once per process (or again once _config is reset)"""
+    global _config
+    if _config is None:
+        with open(path) as f:
+            _config = yaml.safe_load(f) or {}
+        # Matchers are built from the vocabulary they were loaded with
+        _matchers.clear()
+    return _config
+
+
+def _matcher(field):
+    """PhraseMatcher from phrase to value for a keyword-derived field"""
+    if field not in _matchers:
+        if field == 'mechanisms':
+            _matchers[field] = build_mechanism_matcher()
+        else:
+            matcher = PhraseMatcher()
+            for value, phrases in load_frontmatter_config()['keywords'][field].items():
+                for phrase in phrases:
+                    matcher.add(phrase, value)
+            _matchers[field] = matcher.build()
+    return _matchers[field]
+
+
+def count_mentions(text, field):
+    """{value: mentions} for a keyword-derived field"""
+    counts = {}
+    for match in _matcher(field).find_all(text):
+        for value in set(match['payloads']):
+            counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def derive_frontmatter(body):
+    """
+    Fields computable from the draft alone (no LLM call)
+
+    Fields the draft doesn't settle (e.g. no market is mentioned often
+    enough) are left out.
+    """
+    config = load_frontmatter_config()
+    min_mentions = config.get('min_mentions', 2)
+    prose = MASK_PATTERN.sub(lambda m: ' ' * len(m.group()), body)
+    derived = {'date': date.today()}
+
+    heading = H1_PATTERN.search(body)
+    if heading:
+        derived['title'] = heading.group(1).strip()
+
+    urls = [url for _, url in CitationIndex(body).urls]
+    if urls:
+        derived['sources'] = list(dict.fromkeys(urls))
+
+    for field, spec in config['fields'].items():
+        if spec.get('derive') != 'keywords':
+            continue
+        counts = count_mentions(prose, field)
+        found = [v for v in spec['values'] if counts.get(v, 0) >= min_mentions]
+
+        if field == 'markets' and {'equities', 'crypto'} <= set(found):
+            found = ['both']
+        if field == 'mean_vs_tail':
+            if len(found) == 2:
+                low, high = sorted(counts.get(v, 0) for v in found)
+                found = ['both'] if low >= BOTH_RATIO * high else [max(found, key=lambda v: counts[v])]
+            found = found[:1]
+
+        if found:
+            derived[field] = found[0] if spec['type'] == 'str' else found
+
+    return derived
+
+
+def suggest_frontmatter(body):
+    """
+    {field: values} for fields with `suggest`: values the draft mentions
+    often enough to offer the model, never written as they are
+    """
+    config = load_frontmatter_config()
+    min_mentions = config.get('min_mentions', 2)
+    prose = MASK_PATTERN.sub(lambda m: ' ' * len(m.group()), body)
+    suggestions = {}
+    for field, spec in config['fields'].items():
+        if not spec.get('suggest'):
+            continue
+        counts = count_mentions(prose, field)
+        found = [v for v in spec['values'] if counts.get(v, 0) >= min_mentions]
+        if found:
+            suggestions[field] = found
+    return suggestions
+
+
+def _coerce(field, value, spec):
+    """Normalize one field to its schema type; raises ValueError if it can't"""
+    kind = spec['type']
+    if kind == 'date':
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value)[:10])
+
+    if kind == 'list':
+        items = value if isinstance(value, list) else [value]
+        if field == 'mechanisms':
+            items = [int(v) for v in items]
+        elif 'values' in spec:
+            items = [str(v).strip().lower() for v in items]
+        return list(dict.fromkeys(items))
+
+    # A one-item list stays a list: posts store `status: [working-notes]`
+    if isinstance(value, list):
+        if len(value) != 1:
+            raise ValueError(f"expected one value, got {len(value)}")
+        return [_coerce(field, value[0], spec)]
+    value = str(value).strip()
+    return value.lower() if 'values' in spec else value
+
+
+def validate_frontmatter(data):
+    """
+    Check frontmatter against the schema
+
+    Returns (clean, problems): clean has every known field coerced to its
+    type with invalid values removed; unknown fields pass through unchanged
+    and field order is kept. A `str` field stored as a one-item list keeps
+    that shape.
+    """
+    fields = load_frontmatter_config()['fields']
+    clean = {}
+    problems = []
+
+    for field, value in data.items():
+        spec = fields.get(field)
+        if spec is None or value is None:
+            if value is not None:
+                clean[field] = value
+            continue
+        try:
+            value = _coerce(field, value, spec)
+        except (TypeError, ValueError) as e:
+            problems.append(f"{field}: {e}")
+            continue
+        allowed = spec.get('values')
+        if allowed is not None:
+            if isinstance(value, list):
+                invalid = [v for v in value if v not in allowed]
+                value = [v for v in value if v in allowed]
+            else:
+                invalid = [value] if value not in allowed else []
+                value = None if invalid else value
+            if invalid:
+                problems.append(f"{field}: not allowed {invalid} (expected one of {allowed})")
+        if value in (None, '', []):
+            continue
+        if field == 'description':
+            if not spec.get('min_length', 0) <= len(value) <= spec.get('max_length', len(value)):
+                problems.append(f"description: {len(value)} chars (aim for "
+                                f"{spec.get('min_length')}-{spec.get('max_length')})")
+        clean[field] = value
+
+    for field, spec in fields.items():
+        if spec.get('required') and field not in clean:
+            problems.append(f"{field}: missing")
+
+    return clean, problems
+
+
+def merge_frontmatter(existing, derived, judged=None):
+    """
+    Existing values win, except sources, which also gain newly cited URLs;
+    derived values fill gaps, then the model's answers fill what's left
+    """
+    merged = dict(existing)
+    for source in (derived, judged or {}):
+        for field, value in source.items():
+            if field == 'sources' and merged.get('sources'):
+                current = merged['sources'] if isinstance(merged['sources'], list) else [merged['sources']]
+                merged['sources'] = list(dict.fromkeys(current + list(value)))
+            elif merged.get(field) in (None, '', []):
+                merged[field] = value
+    return merged
+
+
+def excerpt(body, budget):
+    """Opening paragraphs of the draft, cut at a paragraph break, plus its later headings"""
+    text = budget.text('opening', body.strip(), limit=int(budget.remaining * OPENING_SHARE))
+    headings = [line for line in body.splitlines() if line.startswith('#') and line not in text]
+    if not headings:
+        return text
+    header = budget.reserve('\n\nLater sections:\n')
+    listed, _ = budget.items('headings', headings, separator='\n')
+    return text + header + listed
+
+
+def judge_fields(body, current, wanted, suggestions=None):
+    """One small LLM call for the fields in wanted; returns {field: value}"""
+    fields = load_frontmatter_config()['fields']
+    suggestions = suggestions or {}
+    lines = []
+    for field in wanted:
+        spec = fields[field]
+        if field == 'mechanisms':
+            options = ', '.join(f"{i}={name}" for i, name in MECHANISM_NAMES.items())
+            line = f"- mechanisms: list of ids ({options})"
+            if suggestions.get(field):
+                mentioned = ', '.join(str(v) for v in suggestions[field])
+                line += f"; the draft mentions {mentioned}, keep only those the post is mainly about"
+            lines.append(line)
+        elif field == 'description':
+            lines.append(f"- description: {spec.get('min_length')}-{spec.get('max_length')} characters, SEO-optimized")
+        elif 'values' in spec:
+            shape = 'list from' if spec['type'] == 'list' else 'one of'
+            lines.append(f"- {field}: {shape} {spec['values']}")
+        else:
+            lines.append(f"- {field}")
+
+    known = {k: v for k, v in current.items() if k in ('title', 'markets', 'mechanisms', 'mean_vs_tail')}
+    known_text = yaml.dump(known, default_flow_style=True, sort_keys=False).strip() if known else '(none)'
+    budget = PromptBudget('generate_frontmatter')
+    budget.reserve(JUDGE_PROMPT.format(known=known_text, excerpt='', fields='\n'.join(lines)))
+    prompt = JUDGE_PROMPT.format(known=known_text, excerpt=excerpt(body, budget), fields='\n'.join(lines))
+
+    client = get_anthropic_client()
+    answer, _ = routed_call(
+        client, 'generate_frontmatter',
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=400,
+        temperature=0.3,
+        parse=parse_yaml_block,
+        budget=budget
+    )
+    if answer is None:
+        print_warning("Could not parse frontmatter fields from the model")
+        return {}
+    return {k: v for k, v in answer.items() if k in wanted}
+
+
+def generate_frontmatter(body, existing_frontmatter=''):
+    """
+    Frontmatter for a draft: existing fields, then locally derived ones,
+    then the model's answers for whatever is still missing
+    """
+    existing = parse_frontmatter(existing_frontmatter)
+    fields = load_frontmatter_config()['fields']
+
+    merged = merge_frontmatter(existing, derive_frontmatter(body))
+    wanted = [
+        field for field, spec in fields.items()
+        if merged.get(field) in (None, '', [])
+        and (field in JUDGMENT_FIELDS or spec.get('required'))
+    ]
+    if wanted:
+        print_info(f"Asking the model for: {', '.join(wanted)}")
+        judged = judge_fields(body, merged, wanted, suggest_frontmatter(body))
+        merged = merge_frontmatter(merged, {}, judged)
+    else:
+        print_info("All frontmatter fields derived locally")
+
+    if not merged.get('title'):
+        merged['title'] = 'Untitled'
+    # Keep the post's own field order; new fields follow in schema order
+    order = list(existing) + [field for field in fields if field not in existing]
+    merged = {field: merged[field] for field in order + list(merged) if field in merged}
+    frontmatter, problems = validate_frontmatter(merged)
+    for problem in problems:
+        print_warning(f"  Frontmatter {problem}")
+    return frontmatter
+
+
+def parse_yaml_block(result_text):
+    """YAML mapping from a reply, fenced or bare; None if it isn't one"""
+    if '```' in result_text:
+        start = result_text.find('```') + 3
+        if result_text[start:start+4] == 'yaml':
+            start += 4
+        end = result_text.find('```', start)
+        yaml_text = result_text[start:end].strip()
+    else:
+        yaml_text = result_text.strip()
+
+    frontmatter_data = yaml.safe_load(yaml_text)
+    return frontmatter_data if isinstance(frontmatter_data, dict) else None
@@ -0,0 +1,322 @@
+"""
+Gate Watch - re-run the evidence gate on drafts as they are saved
+
+`run.py gate --watch` watches content/posts/ (or the given drafts) with
+inotify, falling back to polling where inotify isn't available. Saves are
+debounced. Each draft's paragraphs are compared with the last checked
+version, and only claims in new or edited paragraphs are re-extracted and
+re-verified. Claims from unchanged paragraphs keep their verdicts. Work
+queued for paragraphs that were edited again is cancelled, and results
+from calls already in flight are discarded.
+
+Watch mode doesn't write claim tables or the claim registry; run the
+full gate (or finalize) once the draft settles.
+"""
+import ctypes
+import hashlib
+import os
+import re
+import select
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from agents.utils import (
+    get_anthropic_client,
+    load_markdown,
+    parse_frontmatter,
+    print_section,
+    print_success,
+    print_error,
+    print_warning,
+    print_info
+)
+from agents.citations import CitationIndex
+from agents.evidence_gate import extract_claims, verify_single_claim, check_risky_content, GATE_CONCURRENCY
+from agents.risk_scan import get_scanner, body_line_offset
+from agents.retrieval import get_evidence_index
+
+
+WATCH_DIR = 'content/posts'
+DEBOUNCE_S = 0.4
+POLL_INTERVAL_S = 0.5
+# Paragraphs shorter than this can't carry a claim worth an LLM call
+MIN_PARAGRAPH_WORDS = 8
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Directory watcher on Linux inotify (via libc, no extra dependency)"""
+
+    def __init__(self, dirs):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        for d in dirs:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(d)), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {d}")
+            self.dirs[wd] = Path(d)
+
+    def changes(self, timeout):
+        """Paths written or renamed into place within timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name and wd in self.dirs:
+                paths.add(self.dirs[wd] / os.fsdecode(name))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollWatcher:
+    """mtime polling, for platforms without inotify"""
+
+    def __init__(self, dirs):
+        self.dirs = [Path(d) for d in dirs]
+        self.stamps = self._scan()
+
+    def _scan(self):
+        return {p: p.stat().st_mtime_ns for d in self.dirs for p in d.glob('*.md')}
+
+    def changes(self, timeout):
+        time.sleep(min(timeout, POLL_INTERVAL_S))
+        stamps = self._scan()
+        changed = {p for p, mtime in stamps.items() if self.stamps.get(p) != mtime}
+        self.stamps = stamps
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(dirs):
+    try:
+        return InotifyWatcher(dirs)
+    except (OSError, AttributeError):
+        print_warning("inotify unavailable; polling for changes")
+        return PollWatcher(dirs)
+
+
+def split_paragraphs(body):
+    """Prose paragraphs of a Markdown body (headings, shortcodes and short lines skipped)"""
+    paragraphs = []
+    for block in re.split(r'\n\s*\n', body):
+        text = ' '.join(block.split())
+        if not text or text.startswith(('#', '{{', '<!--', '```')):
+            continue
+        if len(text.split()) >= MIN_PARAGRAPH_WORDS:
+            paragraphs.append(text)
+    return paragraphs
+
+
+def paragraph_key(text):
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+class ParagraphCheck:
+    """Claims and verdicts for one version of one paragraph"""
+
+    def __init__(self, text):
+        self.text = text
+        self.claims = None
+        self.results = {}
+        # Outstanding work: {future: claim index, or None for extraction}
+        self.futures = {}
+
+    @property
+    def done(self):
+        return self.claims is not None and len(self.results) == len(self.claims)
+
+    def cancel(self):
+        """Drop queued calls; calls already running finish and are ignored"""
+        for future in self.futures:
+            future.cancel()
+        self.futures = {}
+
+
+class DraftWatch:
+    """
+    Incremental gate state for one draft
+
+    Workers only make LLM calls; scheduling and bookkeeping happen on the
+    watching thread in update() and poll().
+    """
+
+    def __init__(self, path, pool, client):
+        self.path = Path(path)
+        self.pool = pool
+        self.client = client
+        self.paragraphs = {}
+        self.body = ''
+        self.citations = None
+        self.risky = []
+        self.saved_at = None
+        self.reported = True
+
+    def update(self):
+        """Re-read the draft and queue work for changed paragraphs"""
+        try:
+            draft = load_markdown(str(self.path))
+        except OSError as e:
+            print_error(f"{self.path.name}: {e}")
+            return
+
+        self.body = draft['body']
+        self.citations = CitationIndex(self.body)
+        self.saved_at = time.perf_counter()
+        frontmatter = parse_frontmatter(draft['frontmatter'])
+        allow = get_scanner().allowed_for(frontmatter.get('slug') or self.path.stem, frontmatter)
+        self.risky = check_risky_content(self.body, allow, body_line_offset(draft['full'], self.body))
+
+        current = {paragraph_key(text): text for text in split_paragraphs(self.body)}
+        removed = [key for key in self.paragraphs if key not in current]
+        added = [key for key in current if key not in self.paragraphs]
+        for key in removed:
+            self.paragraphs.pop(key).cancel()
+
+        for key in added:
+            check = ParagraphCheck(current[key])
+            check.futures[self.pool.submit(extract_claims, check.text)] = None
+            self.paragraphs[key] = check
+
+        self.reported = False
+        print_info(f"{time.strftime('%H:%M:%S')} {self.path.name}: "
+                   f"{len(added)} paragraphs to check, {len(removed)} dropped, "
+                   f"{len(current) - len(added)} unchanged")
+
+    def poll(self):
+        """Collect finished calls, queue verifications for extracted claims"""
+        for check in self.paragraphs.values():
+            for future in [f for f in check.futures if f.done()]:
+                i = check.futures.pop(future)
+                error = future.exception()
+                if i is None:
+                    check.claims = [] if error else future.result()
+                    for j, claim in enumerate(check.claims):
+                        job = self.pool.submit(verify_single_claim, self.client, claim, self.body, self.citations)
+                        check.futures[job] = j
+                elif error:
+                    check.results[i] = {
+                        'claim_text': check.claims[i].get('claim_text', ''),
+                        'status': 'warning',
+                        'reason': f"Not verified: {error}"
+                    }
+                else:
+                    check.results[i] = future.result()
+                if error:
+                    print_error(f"{self.path.name}: {error}")
+        self.report()
+
+    @property
+    def settled(self):
+        return all(check.done for check in self.paragraphs.values())
+
+    def report(self):
+        """Print the pass/fail summary once every changed paragraph is checked"""
+        if self.reported or not self.settled:
+            return
+        self.reported = True
+        results = [r for check in self.paragraphs.values() for r in check.results.values()]
+        failures = [r for r in results if r['status'] == 'fail']
+        warnings = [r for r in results if r['status'] == 'warning']
+        elapsed = time.perf_counter() - self.saved_at
+
+        summary = f"{self.path.name}: {len(results)} claims, {len(warnings)} warnings ({elapsed:.1f}s after save)"
+        if failures or self.risky:
+            print_error(f"GATE FAILED {summary}")
+            for issue in self.risky + failures:
+                print(f"  • {issue.get('reason', 'Unknown issue')}")
+                if 'claim_text' in issue:
+                    print(f"    Claim: \"{issue['claim_text'][:100]}\"")
+        else:
+            print_success(f"GATE PASSED {summary}")
+
+
+def watch_drafts(drafts=None, watch_dir=WATCH_DIR, debounce=DEBOUNCE_S, max_workers=GATE_CONCURRENCY):
+    """
+    Watch drafts and re-gate them incrementally on every save
+
+    drafts: explicit draft paths (checked once at startup), or None to
+    watch every Markdown file in watch_dir. Runs until Ctrl-C.
+    """
+    print_section("EVIDENCE GATE (WATCH)")
+
+    drafts = [Path(d).resolve() for d in drafts or []]
+    dirs = sorted({d.parent for d in drafts}) if drafts else [Path(watch_dir).resolve()]
+    for d in dirs:
+        if not d.is_dir():
+            print_error(f"Not a directory: {d}")
+            return
+
+    client = get_anthropic_client()
+    # Build the shared index before workers race to do it
+    get_evidence_index()
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    watcher = make_watcher(dirs)
+    watches = {}
+    pending = {}
+
+    def watched(path):
+        if drafts:
+            return path in drafts
+        return path.suffix == '.md' and not path.name.startswith(('.', '_'))
+
+    for path in drafts:
+        watches[path] = DraftWatch(path, pool, client)
+        watches[path].update()
+
+    print_info(f"Watching {', '.join(str(d) for d in dirs)} (Ctrl-C to stop)")
+    try:
+        while True:
+            now = time.perf_counter()
+            waits = [debounce - (now - t) for t in pending.values()]
+            busy = any(not w.reported for w in watches.values())
+            timeout = max(0.0, min(waits + [0.2 if busy else 1.0]))
+
+            for path in watcher.changes(timeout):
+                path = path.resolve()
+                if watched(path) and path.exists():
+                    pending[path] = time.perf_counter()
+
+            now = time.perf_counter()
+            for path in [p for p, t in pending.items() if now - t >= debounce]:
+                del pending[path]
+                if path not in watches:
+                    watches[path] = DraftWatch(path, pool, client)
+                watches[path].update()
+
+            for watch in watches.values():
+                watch.poll()
+
+    except KeyboardInterrupt:
+        print()
+        print_info("Stopped watching")
+    finally:
+        watcher.close()
+        for watch in watches.values():
+            for check in watch.paragraphs.values():
+                check.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
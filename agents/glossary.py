@@ -0,0 +1,134 @@
+"""
+Glossary Cross-Reference
+Flags technical terms in a draft that have no content/glossary/ entry,
+in a single local pass with no LLM calls
+"""
+import re
+from pathlib import Path
+import yaml
+from agents.content_index import get_content_index
+from agents.text_match import PhraseMatcher
+
+
+TERMS_CONFIG = Path(__file__).parent / 'configs' / 'technical_terms.yaml'
+
+# Two or more capitals (digits allowed), optional plural: FPGA, RDMA, L2s, MEV
+ACRONYM_PATTERN = re.compile(r'\b([A-Z][A-Z0-9]*[A-Z][A-Z0-9]*|[A-Z][0-9]+)s?\b')
+
+# Regions where terms are not prose: code, URLs, headings and HTML comments
+MASK_PATTERN = re.compile(
+    r'```.*?```|`[^`\n]*`|https?://\S+|\]\([^)]*\)|<!--.*?-->|^#{1,6}[ \t][^\n]*',
+    re.DOTALL | re.MULTILINE
+)
+
+
+def load_terms_config(path=TERMS_CONFIG):
+    """Load the technical vocabulary and acronym ignore list (acronyms plus caps words)"""
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+    ignore = list(config.get('ignore_acronyms') or []) + list(config.get('caps_words') or [])
+    return {
+        'terms': config.get('terms') or [],
+        'ignore_acronyms': {a.upper() for a in ignore}
+    }
+
+
+def _variants(term):
+    """A term plus its simple plural, so 'market makers' matches 'market maker'"""
+    term = term.strip()
+    return (term, term + 's') if not term.endswith('s') else (term,)
+
+
+def _normalize(term):
+    term = ' '.join(term.lower().split())
+    return term[:-1] if len(term) > 3 and term.endswith('s') else term
+
+
+def glossary_terms(index=None):
+    """Normalized set of terms defined in content/glossary/"""
+    index = index or get_content_index()
+    defined = set()
+    for entry in index.pages('glossary'):
+        names = [entry['title'], entry['slug'].replace('-', ' ')]
+        names.extend(entry['frontmatter'].get('synonyms') or [])
+        for name in names:
+            if isinstance(name, str) and name.strip():
+                defined.add(_normalize(name))
+    return defined
+
+
+def build_term_matcher(index=None, config=None):
+    """Compile glossary terms and the technical vocabulary into one automaton"""
+    config = config or load_terms_config()
+    defined = glossary_terms(index)
+
+    matcher = PhraseMatcher()
+    for term in config['terms']:
+        for variant in _variants(term):
+            matcher.add(variant, 'technical')
+    for term in defined:
+        for variant in _variants(term):
+            matcher.add(variant, 'glossary')
+
+    return matcher.build(), defined, config['ignore_acronyms']
+
+
+def _mask(text):
+    """Blank out code, URLs, headings and comments while keeping offsets intact"""
+    return MASK_PATTERN.sub(lambda m: ' ' * len(m.group()), text)
+
+
+def find_undefined_terms(text, index=None, matcher=None):
+    """
+    Find technical terms and acronyms used in text but missing from the glossary
+
+    Returns one dict per distinct term: {term, count, line}, in order of
+    first appearance.
+    """
+    if matcher is None:
+        matcher, defined, ignore = build_term_matcher(index)
+    else:
+        matcher, defined, ignore = matcher
+
+    scan_text = _mask(text)
+    found = {}
+
+    def record(term, start):
+        key = _normalize(term)
+        if key in defined:
+            return
+        if key not in found:
+            found[key] = {
+                'term': term,
+                'count': 0,
+                'line': text.count('\n', 0, start) + 1,
+                'start': start
+            }
+        found[key]['count'] += 1
+
+    for match in matcher.find_all(scan_text):
+        if 'technical' in match['payloads'] and 'glossary' not in match['payloads']:
+            record(match['text'], match['start'])
+
+    for m in ACRONYM_PATTERN.finditer(scan_text):
+        acronym = m.group(1)
+        if acronym in ignore:
+            continue
+        record(acronym, m.start())
+
+    return sorted(found.values(), key=lambda t: t['start'])
+
+
+def check_glossary_terms(text, index=None):
+    """Undefined-term warnings in the claim table's issue format"""
+    return [
+        {
+            'status': 'warning',
+            'reason': f"Term '{t['term']}' is not defined in the glossary",
+            'claim_text': t['term'],
+            'type': 'undefined_term',
+            'line': t['line'],
+            'occurrences': t['count']
+        }
+        for t in find_undefined_terms(text, index)
+    ]
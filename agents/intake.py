@@ -13,6 +13,13 @@ from agents.utils import (
     print_info,
     print_warning
 )
+from agents.snapshots import snapshot_urls
+from agents.embeddings import (
+    EmbeddingStore,
+    embeddings_available,
+    brief_entries,
+    dedupe_briefs
+)
 
 
 def run_intake(sources_config=None):
@@ -40,10 +47,26 @@ def run_intake(sources_config=None):
         'status': 'placeholder'
     }
 
+    # Drop near-duplicates of each other and of earlier intake, then index the rest
+    if embeddings_available() and intake_brief['briefs']:
+        store = EmbeddingStore()
+        kept, dropped = dedupe_briefs(intake_brief['briefs'], store)
+        if dropped:
+            print_info(f"Dropped {len(dropped)} duplicate briefs")
+        intake_brief['briefs'] = kept
+        store.add_texts(brief_entries(kept))
+
     output_path = f"data/intake/{date_slug}.json"
     save_json(intake_brief, output_path)
 
     print_success(f"Intake brief saved: {output_path}")
+
+    # Keep offline copies of every source for the evidence gate
+    brief_urls = [b['url'] for b in intake_brief['briefs'] if b.get('url')]
+    if brief_urls:
+        snapshots = snapshot_urls(brief_urls)
+        stored = sum(1 for r in snapshots.values() if r.get('sha256'))
+        print_success(f"Source snapshots stored: {stored}/{len(brief_urls)}")
     print()
     print_info("To implement:")
     print("  1. Add RSS feed parser")
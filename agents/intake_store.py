@@ -0,0 +1,172 @@
+"""
+Intake Store - compact in-memory intake briefs
+
+Months of intake means tens of thousands of briefs. Holding each one as
+the dict json.load returns costs a hash table per brief, plus a fresh copy
+of every repeated domain, source and date string. Here each brief is a
+`__slots__` record and those strings are interned, so they are stored once.
+Records still answer `.get()` like a dict, so brief_id(), brief_entries()
+and other dict-style callers work unchanged.
+"""
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from agents.utils import orjson, print_error
+
+
+INTAKE_DIR = 'data/intake'
+
+# Brief fields with a slot; anything else goes to `extra`
+FIELDS = ('title', 'url', 'summary', 'source', 'domains', 'date')
+FIELD_SET = frozenset(FIELDS)
+
+_MISSING = object()
+
+
+class Brief:
+    """One intake brief; read-only by convention"""
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, title='', url='', summary='', source='', domains=(), date='', extra=None):
+        self.title = title
+        self.url = url
+        self.summary = summary
+        self.source = source
+        self.domains = domains
+        self.date = date
+        self.extra = extra
+
+    def get(self, key, default=None):
+        if key in FIELDS:
+            value = getattr(self, key)
+            return value if value not in ('', ()) else default
+        return (self.extra or {}).get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self):
+        data = {k: getattr(self, k) for k in FIELDS if getattr(self, k) not in ('', ())}
+        if 'domains' in data:
+            data['domains'] = list(data['domains'])
+        data.update(self.extra or {})
+        return data
+
+    def __repr__(self):
+        return f"Brief({self.title!r}, {self.url!r})"
+
+
+class Interner:
+    """Shares one object per distinct short string or domain tuple"""
+
+    def __init__(self):
+        self.tuples = {}
+
+    def text(self, value):
+        return sys.intern(value) if isinstance(value, str) else value or ''
+
+    def domains(self, values):
+        if not values:
+            return ()
+        if isinstance(values, str):
+            values = [values]
+        key = tuple(values)
+        shared = self.tuples.get(key)
+        if shared is None:
+            shared = tuple(sys.intern(v) if isinstance(v, str) else v for v in key)
+            self.tuples[key] = shared
+        return shared
+
+
+_interner = Interner()
+
+
+def make_brief(data, file_date='', interner=_interner):
+    """Brief from one intake dict; dated by its file unless it has its own date"""
+    get = data.get
+    source = get('source')
+    # Set difference runs in C; most briefs have no extra keys
+    extra_keys = data.keys() - FIELD_SET
+    extra = {sys.intern(k): data[k] for k in extra_keys if data[k] is not None} if extra_keys else None
+    return Brief(
+        get('title') or '',
+        get('url') or '',
+        get('summary') or '',
+        sys.intern(source) if isinstance(source, str) else '',
+        interner.domains(get('domains')),
+        interner.text(get('date')) or file_date,
+        extra or None
+    )
+
+
+_intake_files = {}
+
+
+def read_intake_file(path):
+    """
+    (date, [Brief]) for one intake file, cached until it changes on disk
+
+    Intake files are written once a day and then only read, so a long-lived
+    process (the daemon, a multi-topic run) parses each one once, and keeps
+    only the compact records.
+    """
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _intake_files.get(str(path))
+    if cached is None or cached[0] != stamp:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        file_date = _interner.text(data.get('date', ''))
+        # Handle both nested ({date, briefs: [...]}) and flat (one brief) files
+        items = data['briefs'] if 'briefs' in data else [data]
+        cached = (stamp, (file_date, [make_brief(item, file_date) for item in items]))
+        _intake_files[str(path)] = cached
+    return cached[1]
+
+
+def _file_day(path):
+    """Day in an intake file name (YYYY-MM-DD.json); date.max if it has none"""
+    try:
+        return datetime.strptime(path.stem[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return date.max
+
+
+def load_recent_intake(days=7, intake_dir=INTAKE_DIR):
+    """
+    Load intake briefs from past N days, newest file first
+
+    A URL seen in more than one file is kept once, from the newest file.
+    """
+    intake_dir = Path(intake_dir)
+    if not intake_dir.exists():
+        return []
+
+    cutoff = datetime.now() - timedelta(days=days)
+    briefs = []
+    seen = set()
+
+    for file in sorted(intake_dir.glob('*.json'), reverse=True):
+        if _file_day(file) < cutoff.date() - timedelta(days=1):
+            # Named for its day and clearly too old: don't parse (or cache) it
+            continue
+        try:
+            date_str, file_briefs = read_intake_file(file)
+            # Check if recent enough
+            if not date_str or datetime.fromisoformat(date_str.split('T')[0]) < cutoff:
+                continue
+            for brief in file_briefs:
+                if brief.url:
+                    if brief.url in seen:
+                        continue
+                    seen.add(brief.url)
+                briefs.append(brief)
+        except Exception as e:
+            print_error(f"Could not load {file.name}: {e}")
+
+    return briefs
@@ -0,0 +1,274 @@
+"""
+Lab Notes Agent (Weekly Automation)
+Streams one week of intake briefs and research summaries, groups them by
+domain and mechanism in a single pass, and drafts a lab-notes post
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from agents.content_index import MECHANISM_NAMES, build_mechanism_matcher
+from agents.text_match import fold_case
+from agents.model_router import routed_call
+from agents.prompt_budget import PromptBudget
+from agents.utils import (
+    get_anthropic_client,
+    save_markdown,
+    print_section,
+    print_success,
+    print_info,
+    print_warning,
+    print_error
+)
+
+
+INTAKE_DIR = 'data/intake'
+RESEARCH_DIR = 'data/research'
+LAB_DIR = 'content/lab'
+
+# Concurrent LLM calls (one per domain section)
+MAX_CONCURRENCY = 4
+# Largest domains get their own section; the rest are folded into "Other"
+MAX_DOMAINS = 6
+
+OTHER_DOMAIN = 'Other'
+
+SECTION_PROMPT = """You are writing one section of TernQED's weekly lab notes ({week_label}).
+
+Domain: {domain}
+
+This week's material for this domain:
+
+{items}
+
+Write 2-4 paragraphs of findings for this domain in the collective's lab-notes voice:
+- Lead with what we learned, not what we read
+- Bold the single most important finding
+- Cite every factual claim with its source URL inline in parentheses, e.g. (https://...)
+- Only use URLs from the list above
+- Name the mechanism at work (adverse selection, inventory risk, queue priority, ...) when one applies
+- No heading; return markdown paragraphs only"""
+
+
+def week_bounds(week=None, year=None):
+    """(monday, sunday) of an ISO week; defaults to the current week"""
+    today = date.today()
+    iso_year, iso_week, _ = today.isocalendar()
+    monday = date.fromisocalendar(year or iso_year, week or iso_week, 1)
+    return monday, monday + timedelta(days=6)
+
+
+def _file_date(path):
+    """Leading YYYY-MM-DD of a data file name, or None"""
+    try:
+        return datetime.strptime(path.name[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _week_files(directory, start, end):
+    for path in sorted(Path(directory).glob('*.json')):
+        file_date = _file_date(path)
+        if file_date and start <= file_date <= end and not path.name.endswith('.context.json'):
+            yield path
+
+
+def iter_week_items(start, end, intake_dir=INTAKE_DIR, research_dir=RESEARCH_DIR):
+    """
+    Stream the week's material one file at a time
+
+    Yields {kind, title, url, summary, domains, topic}. Intake comes first
+    so research claims can inherit the domains of the brief they cite.
+    """
+    for path in _week_files(intake_dir, start, end):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print_warning(f"Could not load {path.name}: {e}")
+            continue
+        for brief in data['briefs'] if 'briefs' in data else [data]:
+            domains = brief.get('domains') or []
+            yield {
+                'kind': 'brief',
+                'title': brief.get('title', ''),
+                'url': brief.get('url', ''),
+                'summary': brief.get('summary', ''),
+                'domains': [domains] if isinstance(domains, str) else domains
+            }
+
+    for path in _week_files(research_dir, start, end):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print_warning(f"Could not load {path.name}: {e}")
+            continue
+        for claim in data.get('extracted_claims', []):
+            yield {
+                'kind': 'claim',
+                'title': claim.get('claim_text', ''),
+                'url': claim.get('source_url', ''),
+                'summary': claim.get('evidence_snippet', ''),
+                'domains': [],
+                'topic': data.get('topic', '')
+            }
+
+
+def group_items(items, matcher=None):
+    """
+    One pass over items: bucket by primary domain, tag mechanisms
+
+    Returns {domain: [item]} plus per-mechanism {id: {domains}} for the
+    cross-domain summary. Domains are grouped case-insensitively under the
+    first spelling seen.
+    """
+    matcher = matcher or build_mechanism_matcher()
+    groups = {}
+    spellings = {}
+    url_domain = {}
+    mechanism_domains = {}
+
+    for item in items:
+        if item['domains']:
+            domain = item['domains'][0].strip()
+        else:
+            domain = url_domain.get(item['url']) or f"Research: {item.get('topic') or 'untitled'}"
+        domain = spellings.setdefault(fold_case(domain), domain)
+        if item['url'] and item['kind'] == 'brief':
+            url_domain.setdefault(item['url'], domain)
+
+        mechanisms = sorted({
+            m for match in matcher.find_all(f"{item['title']}\n{item['summary']}") for m in match['payloads']
+        })
+        item['mechanisms'] = mechanisms
+        for m in mechanisms:
+            mechanism_domains.setdefault(m, set()).add(domain)
+        groups.setdefault(domain, []).append(item)
+
+    return groups, mechanism_domains
+
+
+def fold_small_domains(groups, max_domains=MAX_DOMAINS):
+    """Keep the largest domains, merging the rest into OTHER_DOMAIN"""
+    ranked = sorted(groups, key=lambda d: -len(groups[d]))
+    folded = {d: groups[d] for d in ranked[:max_domains]}
+    rest = [item for d in ranked[max_domains:] for item in groups[d]]
+    if rest:
+        folded.setdefault(OTHER_DOMAIN, []).extend(rest)
+    return folded
+
+
+def format_items(items):
+    """Item lines, most mechanism-rich first (formatted lazily as they're packed)"""
+    for item in sorted(items, key=lambda i: -len(i['mechanisms'])):
+        mechanisms = ', '.join(MECHANISM_NAMES[m] for m in item['mechanisms']) or 'none tagged'
+        yield (
+            f"- [{item['kind']}] {item['title']} ({item['url']})\n"
+            f"  {item['summary']}\n"
+            f"  Mechanisms: {mechanisms}"
+        )
+
+
+def draft_domain_section(client, domain, items, week_label):
+    """One LLM call: the prose for a single domain section"""
+    budget = PromptBudget('lab_section')
+    budget.reserve(SECTION_PROMPT.format(week_label=week_label, domain=domain, items=''))
+    items_text, _ = budget.items('items', format_items(items), separator='\n')
+    prompt = SECTION_PROMPT.format(week_label=week_label, domain=domain, items=items_text)
+
+    text, _ = routed_call(
+        client, 'lab_section',
+        messages=[{
+            "role": "user",
+            "content": prompt
+        }],
+        max_tokens=1500,
+        temperature=0.4,
+        budget=budget
+    )
+    return text.strip()
+
+
+def cross_domain_section(mechanism_domains):
+    """Mechanisms that showed up in more than one domain this week"""
+    shared = sorted(
+        ((m, domains) for m, domains in mechanism_domains.items() if len(domains) > 1),
+        key=lambda item: -len(item[1])
+    )
+    if not shared:
+        return ''
+    lines = ['## Cross-Domain Mechanisms', '']
+    for m, domains in shared:
+        lines.append(f"- **{MECHANISM_NAMES[m].capitalize()}**: {', '.join(sorted(domains))}")
+    return '\n'.join(lines)
+
+
+def generate_lab_notes(week=None, year=None, max_concurrency=MAX_CONCURRENCY, output_dir=LAB_DIR, force=False):
+    """
+    Draft content/lab/week-WW-YYYY.md from the week's intake and research
+
+    An existing file for the week (possibly hand-written and published) is
+    left alone unless force=True.
+    """
+    print_section("WEEKLY LAB NOTES")
+
+    start, end = week_bounds(week, year)
+    iso_year, iso_week, _ = start.isocalendar()
+    week_label = f"Week {iso_week}, {iso_year}"
+    print_info(f"{week_label}: {start.isoformat()} to {end.isoformat()}")
+
+    path = Path(output_dir) / f"week-{iso_week:02d}-{iso_year}.md"
+    if path.exists() and not force:
+        print_error(f"{path} already exists; re-run with --force to overwrite it")
+        return None
+
+    groups, mechanism_domains = group_items(iter_week_items(start, end))
+    total = sum(len(items) for items in groups.values())
+    if not total:
+        print_warning("No intake or research found for this week")
+        return None
+
+    groups = fold_small_domains(groups)
+    print_info(f"Grouped {total} items into {len(groups)} domains; drafting sections...")
+
+    client = get_anthropic_client()
+    domains = list(groups)
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        sections = list(pool.map(
+            lambda d: draft_domain_section(client, d, groups[d], week_label), domains
+        ))
+
+    if start.month == end.month:
+        span = f"{start.strftime('%B %-d')}-{end.strftime('%-d, %Y')}"
+    else:
+        span = f"{start.strftime('%B %-d')} - {end.strftime('%B %-d, %Y')}"
+    briefs = sum(1 for items in groups.values() for i in items if i['kind'] == 'brief')
+    body = [
+        f"# Lab Notes: Week of {span}",
+        '',
+        '## Research Overview',
+        '',
+        f"This week the collective logged {briefs} intake briefs and {total - briefs} research claims "
+        f"across {len(domains)} domains.",
+        '',
+        '## Key Findings by Domain'
+    ]
+    for domain, section in zip(domains, sections):
+        body += ['', f"### {domain}", '', section]
+
+    cross = cross_domain_section(mechanism_domains)
+    if cross:
+        body += ['', cross]
+
+    frontmatter = {
+        'title': f"Lab Notes: {week_label}",
+        'date': min(end, date.today()).isoformat(),
+        'draft': True,
+        'tags': ['lab-notes', 'research-process']
+    }
+    save_markdown(path, frontmatter, '\n'.join(body))
+
+    print_success(f"Lab notes drafted: {path}")
+    print_info("Review and set draft: false to publish")
+    return path
@@ -0,0 +1,191 @@
+"""
+Internal Linking Engine
+Finds internal link candidates in a draft from the content index, locally
+and deterministically; an LLM is only used optionally to re-rank
+"""
+import json
+import re
+from pathlib import Path
+from agents.content_index import get_content_index, MECHANISM_NAMES
+from agents.text_match import PhraseMatcher
+from agents.model_router import routed_call
+from agents.prompt_budget import PromptBudget
+
+
+# Sections that can be link targets, with their ranking weight
+SECTION_WEIGHTS = {
+    'evergreen': 3,
+    'glossary': 2,
+    'posts': 1
+}
+
+# How strongly each kind of term identifies its page
+TERM_WEIGHTS = {
+    'title': 3,
+    'slug': 2,
+    'mechanism': 1
+}
+
+MAX_LINKS = 5
+
+RERANK_PROMPT = """These internal link candidates were found in a draft:
+
+{listing}
+
+Pick the {max_links} or fewer links that add the most value to a reader, best first.
+Drop links that are redundant or that interrupt the argument.
+
+Return only a JSON array of candidate numbers, e.g. [2, 0, 3]"""
+
+# Regions of markdown that must never receive a link
+PROTECTED_PATTERN = re.compile(
+    r'```.*?```'              # fenced code
+    r'|`[^`\n]*`'             # inline code
+    r'|<!--.*?-->'            # HTML comments
+    r'|!?\[[^\]]*\]\([^)]*\)'  # existing links and images
+    r'|https?://\S+'          # bare URLs
+    r'|^#{1,6}[^\n]*',        # headings
+    re.DOTALL | re.MULTILINE
+)
+
+SUGGESTION_BLOCK_PATTERN = re.compile(r'\n*<!-- SUGGESTED INTERNAL LINKS:.*?-->\n?', re.DOTALL)
+
+
+def page_url(entry):
+    """Hugo permalink for a content entry (see [permalinks] in hugo.toml)"""
+    return f"/{entry['section']}/{entry['url_slug']}/"
+
+
+def build_link_matcher(index=None):
+    """Build a phrase matcher over titles, slugs and mechanisms of linkable pages"""
+    index = index or get_content_index()
+    matcher = PhraseMatcher()
+
+    for section, section_weight in SECTION_WEIGHTS.items():
+        for entry in index.pages(section):
+            target = {
+                'url': page_url(entry),
+                'title': entry['title'] or entry['slug'],
+                'section': section,
+                'path': entry['path']
+            }
+            terms = []
+            if entry['title']:
+                terms.append(('title', entry['title']))
+            terms.append(('slug', entry['slug'].replace('-', ' ')))
+            for mechanism in entry['frontmatter'].get('mechanisms') or []:
+                if mechanism in MECHANISM_NAMES:
+                    terms.append(('mechanism', MECHANISM_NAMES[mechanism]))
+
+            for kind, term in terms:
+                matcher.add(term, dict(
+                    target,
+                    kind=kind,
+                    score=section_weight * TERM_WEIGHTS[kind]
+                ))
+
+    return matcher.build()
+
+
+def _protected_spans(body):
+    return [(m.start(), m.end()) for m in PROTECTED_PATTERN.finditer(body)]
+
+
+def _overlaps(spans, start, end):
+    # Spans are sorted and non-overlapping; a linear scan is fine for drafts
+    for span_start, span_end in spans:
+        if span_start >= end:
+            return False
+        if span_end > start:
+            return True
+    return False
+
+
+def find_link_candidates(body, draft_path=None, matcher=None, max_links=MAX_LINKS):
+    """
+    Find internal link candidates in a draft
+
+    Returns up to max_links dicts {phrase, url, title, section, start, end,
+    score, reason}, at most one per target page, in document order.
+    """
+    matcher = matcher or build_link_matcher()
+    own_path = Path(draft_path).as_posix() if draft_path else None
+    protected = _protected_spans(body)
+
+    best_by_url = {}
+    for match in matcher.find_all(body):
+        if _overlaps(protected, match['start'], match['end']):
+            continue
+        targets = [t for t in match['payloads'] if t['path'] != own_path]
+        if not targets:
+            continue
+        # One link per phrase: the strongest target for this occurrence
+        target = max(targets, key=lambda t: t['score'])
+        current = best_by_url.get(target['url'])
+        if current is None or target['score'] > current['score']:
+            best_by_url[target['url']] = {
+                'phrase': match['text'],
+                'url': target['url'],
+                'title': target['title'],
+                'section': target['section'],
+                'start': match['start'],
+                'end': match['end'],
+                'score': target['score'],
+                'reason': f"Matches {target['kind']} of {target['section']} page '{target['title']}'"
+            }
+
+    ranked = sorted(best_by_url.values(), key=lambda c: (-c['score'], c['start']))
+    return sorted(ranked[:max_links], key=lambda c: c['start'])
+
+
+def rerank_with_llm(client, body, candidates, max_links=MAX_LINKS):
+    """Ask Claude to keep and order the most useful candidates; falls back to input order"""
+    if len(candidates) <= 1:
+        return candidates
+
+    budget = PromptBudget('rerank_links')
+    budget.reserve(RERANK_PROMPT.format(listing='', max_links=max_links))
+    listing, _ = budget.items('candidates', (
+        f"{i}. \"{c['phrase']}\" -> {c['url']} ({c['title']})\n"
+        f"   Context: ...{body[max(0, c['start'] - 120):c['end'] + 120]}..."
+        for i, c in enumerate(candidates)
+    ), separator='\n')
+    prompt = RERANK_PROMPT.format(listing=listing, max_links=max_links)
+
+    def parse(result_text):
+        start = result_text.find('[')
+        end = result_text.rfind(']') + 1
+        if start == -1 or end <= start:
+            return None
+        order = json.loads(result_text[start:end])
+        picked = [candidates[i] for i in order if isinstance(i, int) and 0 <= i < len(candidates)]
+        return picked or None
+
+    picked, _ = routed_call(
+        client, 'rerank_links',
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=200,
+        temperature=0.3,
+        parse=parse,
+        budget=budget
+    )
+    return (picked or candidates)[:max_links]
+
+
+def format_link_suggestions(candidates):
+    """Render candidates as the HTML comment block appended to drafts"""
+    if not candidates:
+        return ''
+    lines = ["<!-- SUGGESTED INTERNAL LINKS:"]
+    for c in candidates:
+        lines.append(f"- Link '{c['phrase']}' to {c['url']}")
+        lines.append(f"  Reason: {c['reason']}")
+    lines.append("-->")
+    return "\n".join(lines) + "\n"
+
+
+def strip_link_suggestions(body):
+    """Remove a previously appended suggestion block"""
+    if not SUGGESTION_BLOCK_PATTERN.search(body):
+        return body
+    return SUGGESTION_BLOCK_PATTERN.sub('\n', body).rstrip() + '\n'
@@ -0,0 +1,178 @@
+"""
+Model Router
+Per-task model tiers from agents/configs/model_routes.yaml, escalation to
+the large tier on parse failure or low confidence, and a per-call log of
+latency, tokens and cost
+"""
+import time
+from datetime import datetime
+from pathlib import Path
+import yaml
+from agents.utils import (
+    append_jsonl,
+    load_jsonl,
+    print_section,
+    print_info
+)
+
+
+ROUTES_CONFIG = Path(__file__).parent / 'configs' / 'model_routes.yaml'
+USAGE_LOG = 'data/routing/usage.jsonl'
+DEFAULT_PROMPT_BUDGET = 8000
+
+_config = None
+
+
+def load_routes(path=ROUTES_CONFIG):
+    """Routing config, read once per process"""
+    global _config
+    if _config is None:
+        with open(path) as f:
+            _config = yaml.safe_load(f) or {}
+    return _config
+
+
+def route_for(task):
+    """{tier, model, escalate_on, prompt_budget} for a task; unknown tasks use the defaults"""
+    config = load_routes()
+    route = (config.get('routes') or {}).get(task) or {}
+    tier = route.get('tier') or config.get('default_tier', 'large')
+    return {
+        'tier': tier,
+        'model': config['tiers'][tier],
+        'escalate_on': route.get('escalate_on') or [],
+        'prompt_budget': route.get('prompt_budget') or config.get('default_prompt_budget') or DEFAULT_PROMPT_BUDGET
+    }
+
+
+def model_for(task):
+    return route_for(task)['model']
+
+
+def call_cost(tier, input_tokens, output_tokens):
+    price = (load_routes().get('pricing') or {}).get(tier) or {}
+    return (input_tokens * price.get('input', 0) + output_tokens * price.get('output', 0)) / 1e6
+
+
+def _record(task, tier, model, response, latency, escalated_from=None, reason=None, budget=None):
+    usage = getattr(response, 'usage', None)
+    input_tokens = getattr(usage, 'input_tokens', 0) or 0
+    output_tokens = getattr(usage, 'output_tokens', 0) or 0
+    try:
+        append_jsonl({
+            'task': task,
+            'tier': tier,
+            'model': model,
+            'latency_ms': round(latency * 1000),
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cost_usd': round(call_cost(tier, input_tokens, output_tokens), 6),
+            'escalated_from': escalated_from,
+            'reason': reason,
+            'prompt_budget': budget.total if budget is not None else None,
+            'prompt_estimate': budget.used if budget is not None else None,
+            'at': datetime.now().isoformat(timespec='seconds')
+        }, USAGE_LOG)
+    except OSError:
+        pass
+
+
+def routed_call(client, task, messages, max_tokens, temperature=None, parse=None, low_confidence=None,
+                budget=None):
+    """
+    Call the model configured for task
+
+    parse(text) turns the reply into a value and should raise (or return
+    None) on malformed output. low_confidence(value) flags answers worth a
+    second opinion. Either triggers one retry on the large tier when the
+    route lists it under escalate_on. budget is the PromptBudget the
+    prompt was packed with; its use is logged next to the real token count.
+
+    Returns (value, text): value is parse(text), or the text itself when no
+    parser is given; None if parsing failed on the last tier tried.
+    """
+    route = route_for(task)
+    tier = route['tier']
+    escalated_from = reason = None
+    if budget is not None:
+        budget.report()
+
+    while True:
+        model = load_routes()['tiers'][tier]
+        kwargs = {'model': model, 'max_tokens': max_tokens, 'messages': messages}
+        if temperature is not None:
+            kwargs['temperature'] = temperature
+
+        start = time.perf_counter()
+        response = client.messages.create(**kwargs)
+        _record(task, tier, model, response, time.perf_counter() - start, escalated_from, reason, budget)
+        text = response.content[0].text
+
+        if parse is None:
+            return text, text
+
+        try:
+            value = parse(text)
+        except Exception:
+            value = None
+
+        if value is None:
+            reason = 'parse_failure'
+        elif low_confidence is not None and low_confidence(value):
+            reason = 'low_confidence'
+        else:
+            return value, text
+
+        if tier == 'large' or reason not in route['escalate_on']:
+            return value, text
+        escalated_from, tier = tier, 'large'
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize_usage(path=USAGE_LOG, since=None):
+    """Per-task stats from the usage log: calls, escalations, latency, cost"""
+    tasks = {}
+    for record in load_jsonl(path):
+        if since and record.get('at', '') < since:
+            continue
+        stats = tasks.setdefault(record['task'], {'calls': 0, 'escalations': 0, 'latencies': [],
+                                                  'cost_usd': 0.0, 'models': {}, 'budget_use': []})
+        stats['calls'] += 1
+        stats['escalations'] += 1 if record.get('escalated_from') else 0
+        stats['latencies'].append(record.get('latency_ms', 0))
+        stats['cost_usd'] += record.get('cost_usd', 0.0)
+        stats['models'][record['model']] = stats['models'].get(record['model'], 0) + 1
+        if record.get('prompt_budget') and record.get('input_tokens'):
+            stats['budget_use'].append(record['input_tokens'] / record['prompt_budget'])
+    return tasks
+
+
+def run_routes_report(since=None):
+    """Print the per-route summary (`run.py routes`)"""
+    print_section("MODEL ROUTES")
+    for task in sorted((load_routes().get('routes') or {})):
+        route = route_for(task)
+        print(f"  {task:<22} {route['tier']:<6} {route['model']}  {route['prompt_budget']:>6} tok"
+              + (f"  (escalates on {', '.join(route['escalate_on'])})" if route['escalate_on'] else ''))
+
+    tasks = summarize_usage(since=since)
+    if not tasks:
+        print_info(f"\nNo calls logged yet in {USAGE_LOG}")
+        return
+
+    print(f"\n  {'task':<22} {'calls':>6} {'escal.':>7} {'p50 ms':>8} {'p95 ms':>8} {'cost $':>9} {'budget p50/max':>15}")
+    total = 0.0
+    for task, stats in sorted(tasks.items(), key=lambda item: -item[1]['cost_usd']):
+        latencies = stats['latencies']
+        total += stats['cost_usd']
+        # Real input tokens as a share of the prompt budget
+        use = stats['budget_use']
+        budget = f"{_percentile(use, 0.5):.0%}/{max(use):.0%}" if use else '-'
+        print(f"  {task:<22} {stats['calls']:>6} {stats['escalations']:>7} "
+              f"{_percentile(latencies, 0.5):>8} {_percentile(latencies, 0.95):>8} {stats['cost_usd']:>9.4f} "
+              f"{budget:>15}")
+    print(f"\n  Total cost: ${total:.4f}")
@@ -0,0 +1,220 @@
+"""
+Research Preview Writer
+Streams an escaped, paginated HTML preview of research results to disk
+section by section, so previews of large or partial runs use flat memory
+"""
+import html
+from pathlib import Path
+from agents.utils import (
+    atomic_write,
+    load_json,
+    print_section,
+    print_success,
+    print_info
+)
+
+
+# Items (sources, claims, questions) per HTML page
+PAGE_SIZE = 100
+
+STYLE = """
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                line-height: 1.6; max-width: 900px; margin: 0 auto; padding: 20px; }
+        h1 { color: #333; }
+        h2 { color: #666; margin-top: 30px; border-bottom: 2px solid #eee; padding-bottom: 5px; }
+        .source { background: #f5f5f5; padding: 15px; margin: 10px 0; border-left: 4px solid #4c6ef5; }
+        .claim { background: #f0f9ff; padding: 12px; margin: 8px 0; border-left: 3px solid #3b82f6; }
+        .question { background: #fef3c7; padding: 10px; margin: 6px 0; }
+        .meta { color: #666; font-size: 14px; }
+        .partial { background: #fee2e2; padding: 10px; border-left: 4px solid #dc2626; }
+        .pager { margin: 30px 0; display: flex; justify-content: space-between; }
+        code { background: #eee; padding: 2px 6px; border-radius: 3px; }
+"""
+
+
+def esc(value):
+    """HTML-escape any value"""
+    return html.escape('' if value is None else str(value))
+
+
+def safe_href(url):
+    """Only http(s) URLs become links"""
+    url = '' if url is None else str(url)
+    return esc(url) if url.startswith(('http://', 'https://')) else '#'
+
+
+class PreviewWriter:
+    """
+    Incremental HTML writer with automatic pagination
+
+    Usage:
+        with PreviewWriter(path, topic, meta) as w:
+            w.section('Relevant Sources', total=len(sources))
+            for s in sources:
+                w.source(s)
+
+    Page 1 is written to `path`, later pages to `path-2.html`, ... Each page
+    is renamed into place only once complete, so a browser never shows a
+    half-written page.
+    """
+
+    def __init__(self, html_path, topic, meta='', partial=False, page_size=PAGE_SIZE):
+        self.html_path = Path(html_path)
+        self.topic = topic
+        self.meta = meta
+        self.partial = partial
+        self.page_size = page_size
+        self.page = 0
+        self.pages = []
+        self._items_on_page = 0
+        self._section = None
+        self._writer = None
+        self._file = None
+
+    def page_path(self, page):
+        if page == 1:
+            return self.html_path
+        return self.html_path.with_name(f"{self.html_path.stem}-{page}{self.html_path.suffix}")
+
+    def __enter__(self):
+        self._open_page()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._close_page(has_next=False, exc_info=(exc_type, exc, tb))
+        # Drop trailing pages left over from a longer earlier render
+        stale = self.page + 1
+        while self.page_path(stale).exists():
+            self.page_path(stale).unlink()
+            stale += 1
+        return False
+
+    def _open_page(self):
+        self.page += 1
+        self._items_on_page = 0
+        self._writer = atomic_write(self.page_path(self.page))
+        self._file = self._writer.__enter__()
+        self.pages.append(self.page_path(self.page))
+
+        title = f"Research Summary: {esc(self.topic)}"
+        if self.page > 1:
+            title += f" (page {self.page})"
+        self._file.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>{STYLE}    </style>
+</head>
+<body>
+    <h1>{title}</h1>
+    <p class="meta">{esc(self.meta)}</p>
+""")
+        if self.partial:
+            self._file.write('    <p class="partial">Partial results: this run is still in progress or was interrupted.</p>\n')
+        if self.page > 1 and self._section:
+            self._file.write(f"\n    <h2>{esc(self._section)} (continued)</h2>\n")
+
+    def _close_page(self, has_next, exc_info=(None, None, None)):
+        self._file.write('\n    <div class="pager">')
+        if self.page > 1:
+            self._file.write(f'<a href="{esc(self.page_path(self.page - 1).name)}">&larr; Previous</a>')
+        self._file.write('<span></span>')
+        if has_next:
+            self._file.write(f'<a href="{esc(self.page_path(self.page + 1).name)}">Next &rarr;</a>')
+        self._file.write('</div>\n</body>\n</html>\n')
+        self._writer.__exit__(*exc_info)
+        self._writer = self._file = None
+
+    def _item(self, markup):
+        if self._items_on_page >= self.page_size:
+            self._close_page(has_next=True)
+            self._open_page()
+        self._file.write(markup)
+        self._items_on_page += 1
+
+    def section(self, title, total=None):
+        """Start a section; total is shown in the heading when known"""
+        self._section = title
+        count = f" ({total})" if total is not None else ''
+        self._file.write(f"\n    <h2>{esc(title)}{count}</h2>\n")
+
+    def paragraphs(self, text):
+        """One or more paragraphs (string or list of strings)"""
+        for paragraph in ([text] if isinstance(text, str) else text or []):
+            self._file.write(f"    <p>{esc(paragraph)}</p>\n")
+
+    def source(self, source):
+        key_claims = source.get('key_claims') or []
+        if isinstance(key_claims, str):
+            key_claims = [key_claims]
+        self._item(f"""
+    <div class="source">
+        <strong>{esc(source.get('title', 'Unknown'))}</strong><br>
+        <a href="{safe_href(source.get('url'))}">{esc(source.get('url', ''))}</a><br>
+        <em>Relevance: {esc(source.get('relevance_score', 'N/A'))}</em><br>
+        Key claims: {esc(', '.join(str(c) for c in key_claims))}
+    </div>
+""")
+
+    def claim(self, claim):
+        self._item(f"""
+    <div class="claim">
+        <strong>Claim:</strong> {esc(claim.get('claim_text', ''))}<br>
+        <strong>Source:</strong> <a href="{safe_href(claim.get('source_url'))}">{esc(claim.get('source_url', ''))}</a><br>
+        <strong>Evidence:</strong> "{esc(claim.get('evidence_snippet', ''))}"<br>
+        <strong>Confidence:</strong> {esc(claim.get('confidence', 'unknown'))}
+    </div>
+""")
+
+    def question(self, question):
+        self._item(f'\n    <div class="question">&bull; {esc(question)}</div>\n')
+
+
+def _total(items):
+    return len(items) if hasattr(items, '__len__') else None
+
+
+def generate_preview(research_data, html_path, partial=False, page_size=PAGE_SIZE):
+    """
+    Generate HTML preview of research summary
+
+    Every source, claim and question is rendered. Sections may be lists or
+    any iterable (e.g. a generator over partial map-reduce results).
+    """
+    relevant_sources = research_data.get('relevant_sources', [])
+    extracted_claims = research_data.get('extracted_claims', [])
+    open_questions = research_data.get('open_questions', [])
+    synthesis = research_data.get('synthesis_suggestions', '')
+
+    meta = (f"Generated: {research_data.get('generated_at', '')} | "
+            f"Sources analyzed: {research_data.get('total_sources_analyzed', 0)}")
+
+    with PreviewWriter(html_path, research_data.get('topic', 'Unknown'), meta, partial, page_size) as writer:
+        writer.section('Synthesis Suggestions')
+        writer.paragraphs(synthesis)
+
+        writer.section('Relevant Sources', _total(relevant_sources))
+        for source in relevant_sources:
+            writer.source(source)
+
+        writer.section('Extracted Claims', _total(extracted_claims))
+        for claim in extracted_claims:
+            writer.claim(claim)
+
+        writer.section('Open Questions', _total(open_questions))
+        for question in open_questions:
+            writer.question(question)
+
+    print_success(f"Preview generated: {html_path}" + (f" ({len(writer.pages)} pages)" if len(writer.pages) > 1 else ''))
+    print_info("Open in browser to review research summary")
+    return writer.pages
+
+
+def run_preview(research_path, partial=False, page_size=PAGE_SIZE):
+    """Re-render the preview for a saved (possibly partial) research JSON"""
+    print_section("RESEARCH PREVIEW")
+    research_data = load_json(research_path)
+    return generate_preview(research_data, str(Path(research_path).with_suffix('.html')),
+                            partial=partial, page_size=page_size)
@@ -0,0 +1,219 @@
+"""
+Profiling - CPU profile plus a wall-clock span trace of stages and LLM calls
+
+Enabled by `run.py --profile`. Agents don't call this module directly:
+print_section() marks stages and get_anthropic_client() returns a client
+whose calls are traced. mark_stage() and span() are available for finer
+detail. The trace is written in Chrome trace-event format (open it in
+chrome://tracing or https://ui.perfetto.dev); concurrent LLM calls show
+up as overlapping spans on their worker threads.
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+PROFILE_DIR = 'data/profiles'
+TOP_FUNCTIONS = 25
+
+_tracer = None
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000
+
+
+class Tracer:
+    """Collects complete ('X') trace events and per-thread CPU profiles"""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.origin = _now_us()
+        self.threads = {}
+        self.open_stages = {}
+        self.profiles = []
+        self.main_profile = cProfile.Profile()
+
+    def add(self, name, cat, start_us, end_us, args=None):
+        thread = threading.current_thread()
+        with self.lock:
+            self.threads[thread.ident] = thread.name
+            self.events.append({
+                'name': name,
+                'cat': cat,
+                'ph': 'X',
+                'ts': round(start_us - self.origin, 1),
+                'dur': round(end_us - start_us, 1),
+                'pid': self.pid,
+                'tid': thread.ident,
+                'args': args or {}
+            })
+
+    def mark_stage(self, name):
+        """Close this thread's current stage (if any) and open a new one"""
+        tid = threading.get_ident()
+        now = _now_us()
+        previous = self.open_stages.pop(tid, None)
+        if previous:
+            self.add(previous[0], 'stage', previous[1], now)
+        if name is not None:
+            self.open_stages[tid] = (name, now)
+
+    def _profile_thread(self, frame, event, arg):
+        """threading.setprofile hook: give each new thread its own profiler"""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Only one active profiler allowed on this Python
+            return
+        with self.lock:
+            self.profiles.append(profile)
+
+    def start(self):
+        threading.setprofile(self._profile_thread)
+        self.main_profile.enable()
+
+    def stop(self):
+        self.main_profile.disable()
+        threading.setprofile(None)
+        now = _now_us()
+        for tid, (name, start) in list(self.open_stages.items()):
+            with self.lock:
+                self.events.append({
+                    'name': name, 'cat': 'stage', 'ph': 'X',
+                    'ts': round(start - self.origin, 1), 'dur': round(now - start, 1),
+                    'pid': self.pid, 'tid': tid, 'args': {}
+                })
+        self.open_stages.clear()
+
+    def stats(self):
+        """Merged pstats.Stats for the main thread and every worker thread"""
+        stats = pstats.Stats(self.main_profile)
+        for profile in self.profiles:
+            try:
+                stats.add(profile)
+            except TypeError:  # A thread that never ran any Python code
+                continue
+        return stats
+
+    def chrome_trace(self):
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in self.threads.items()
+        ]
+        return {'traceEvents': metadata + sorted(self.events, key=lambda e: e['ts']), 'displayTimeUnit': 'ms'}
+
+
+def profiling_enabled():
+    return _tracer is not None
+
+
+@contextmanager
+def span(name, cat='stage', **args):
+    """Record a wall-clock span (no-op unless profiling)"""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    start = _now_us()
+    try:
+        yield
+    finally:
+        tracer.add(name, cat, start, _now_us(), args)
+
+
+def mark_stage(name):
+    """Start a new sequential stage on this thread (no-op unless profiling)"""
+    if _tracer is not None:
+        _tracer.mark_stage(name)
+
+
+def trace_client(client):
+    """Wrap client.messages.create so every LLM call becomes an 'llm' span"""
+    if _tracer is None:
+        return client
+    create = client.messages.create
+
+    def traced_create(*args, **kwargs):
+        start = _now_us()
+        details = {'model': kwargs.get('model'), 'max_tokens': kwargs.get('max_tokens')}
+        try:
+            response = create(*args, **kwargs)
+        except Exception as e:
+            details['error'] = type(e).__name__
+            if _tracer is not None:
+                _tracer.add(f"llm {kwargs.get('model', '')}", 'llm', start, _now_us(), details)
+            raise
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            details['input_tokens'] = usage.input_tokens
+            details['output_tokens'] = usage.output_tokens
+        if _tracer is not None:
+            _tracer.add(f"llm {kwargs.get('model', '')}", 'llm', start, _now_us(), details)
+        return response
+
+    client.messages.create = traced_create
+    return client
+
+
+def start_profiling():
+    global _tracer
+    _tracer = Tracer()
+    _tracer.start()
+    return _tracer
+
+
+def stop_profiling(label, out_dir=PROFILE_DIR, top=TOP_FUNCTIONS):
+    """
+    Stop profiling, write <label>-<time>.trace.json and .prof, print a summary
+
+    Returns (trace_path, prof_path).
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return None, None
+    tracer.stop()
+
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    trace_path = out / f"{label}-{stamp}.trace.json"
+    prof_path = out / f"{label}-{stamp}.prof"
+
+    with open(trace_path, 'w') as f:
+        json.dump(tracer.chrome_trace(), f)
+    stats = tracer.stats()
+    stats.dump_stats(str(prof_path))
+
+    llm = [e for e in tracer.events if e['cat'] == 'llm']
+    stages = sorted((e for e in tracer.events if e['cat'] == 'stage'), key=lambda e: -e['dur'])
+    total_s = max((e['ts'] + e['dur'] for e in tracer.events), default=0) / 1e6
+
+    print(f"\n{'='*70}")
+    print("PROFILE")
+    print(f"{'='*70}\n")
+    print(f"Wall time: {total_s:.2f}s")
+    if llm:
+        llm_s = sum(e['dur'] for e in llm) / 1e6
+        tokens_in = sum(e['args'].get('input_tokens', 0) for e in llm)
+        tokens_out = sum(e['args'].get('output_tokens', 0) for e in llm)
+        print(f"LLM calls: {len(llm)} ({llm_s:.2f}s summed, {tokens_in} in / {tokens_out} out tokens)")
+    if stages:
+        print("\nSlowest stages:")
+        for e in stages[:10]:
+            print(f"  {e['dur'] / 1e6:8.2f}s  {e['name']}")
+    print(f"\nTop {top} functions by own time:")
+    stats.sort_stats('tottime').print_stats(top)
+    print(f"Trace:   {trace_path}  (chrome://tracing or ui.perfetto.dev)")
+    print(f"Profile: {prof_path}  (python3 -m pstats)")
+    return trace_path, prof_path
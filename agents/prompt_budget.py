@@ -0,0 +1,166 @@
+"""
+Prompt Budget - pack prompt sections into a per-call token budget
+
+Each LLM task has a `prompt_budget` (tokens) in
+agents/configs/model_routes.yaml. A builder reserves its fixed template
+text first, then adds its variable sections. Text is cut at a paragraph
+or sentence boundary and lists at an item boundary, so no prompt can
+overflow and nothing ends mid-sentence. routed_call() logs each budget's
+use next to the real input token count (`run.py routes`).
+
+    budget = PromptBudget('lab_section')
+    budget.reserve(TEMPLATE)
+    items_text, shown = budget.items('items', (format_item(i) for i in items))
+    draft_text = budget.text('draft', body, limit=2000)
+
+Inputs that must be read in full (a whole draft to extract claims from)
+go through split_text() and one call per chunk instead of being cut.
+"""
+import re
+from agents.utils import estimate_tokens, print_info
+from agents.model_router import route_for
+
+
+# Headroom for the gap between the local estimate and the real tokenizer
+SAFETY_MARGIN = 0.1
+TRUNCATION_MARK = "\n[...]"
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])["\')\]]?\s+')
+
+
+def _cut_point(head):
+    """Where to end head: the last paragraph break, then sentence end, in its final third, else a space"""
+    floor = len(head) * 2 // 3
+    for pattern in (PARAGRAPH_BREAK, SENTENCE_BREAK):
+        ends = [m.start() for m in pattern.finditer(head, floor)]
+        if ends:
+            return ends[-1]
+    space = head.rfind(' ')
+    return space if space > 0 else len(head)
+
+
+def fit_text(text, max_tokens):
+    """
+    Longest prefix of text within max_tokens, cut at a paragraph break,
+    else a sentence end, else a word boundary. Returns (text, was_cut).
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+    head = text[:max(0, max_tokens * 4 - len(TRUNCATION_MARK))]
+    return head[:_cut_point(head)].rstrip() + TRUNCATION_MARK, True
+
+
+def split_text(text, max_tokens):
+    """
+    Split text into consecutive chunks of at most max_tokens each, at the
+    same boundaries fit_text prefers, so nothing is dropped
+    """
+    chunks = []
+    while estimate_tokens(text) > max_tokens:
+        head = text[:max(1, max_tokens * 4)]
+        end = _cut_point(head) or len(head)
+        chunks.append(head[:end].rstrip())
+        text = text[end:].lstrip()
+    if text.strip() or not chunks:
+        chunks.append(text)
+    return chunks
+
+
+class PromptBudget:
+    """Token accounting for one prompt"""
+
+    def __init__(self, task, budget=None):
+        self.task = task
+        self.total = budget or route_for(task)['prompt_budget']
+        self.limit = int(self.total * (1 - SAFETY_MARGIN))
+        self.used = 0
+        self.sections = {}
+
+    @property
+    def remaining(self):
+        return max(0, self.limit - self.used)
+
+    def reserve(self, text):
+        """
+        Count fixed template text (instructions, headers, the claim itself),
+        or keep a number of tokens free; returns text unchanged
+        """
+        self.used += text if isinstance(text, int) else estimate_tokens(text)
+        return text
+
+    def text(self, name, text, limit=None):
+        """Fit one block of text into what's left (or into limit tokens)"""
+        room = self.remaining if limit is None else min(limit, self.remaining)
+        fitted, cut = fit_text(text, room)
+        tokens = estimate_tokens(fitted)
+        self.used += tokens
+        self.sections[name] = {'tokens': tokens, 'cut': cut}
+        return fitted
+
+    def items(self, name, items, limit=None, separator='\n\n'):
+        """
+        Join leading items while they fit; returns (text, how many fit)
+
+        items may be a generator, so only the items that fit are formatted.
+        """
+        room = self.remaining if limit is None else min(limit, self.remaining)
+        sep_cost = estimate_tokens(separator)
+        taken = []
+        tokens = 0
+        cut = False
+        for item in items:
+            cost = estimate_tokens(item) + (sep_cost if taken else 0)
+            if tokens + cost > room:
+                cut = True
+                break
+            taken.append(item)
+            tokens += cost
+        self.used += tokens
+        self.sections[name] = {'tokens': tokens, 'items': len(taken), 'cut': cut}
+        return separator.join(taken), len(taken)
+
+    def around(self, name, blocks, center, limit=None, separator='\n\n'):
+        """
+        Pack blocks (e.g. paragraphs) outward from blocks[center]: the
+        center block (cut to fit if it must), then its neighbours, nearest
+        first, while they fit. Returns the packed blocks in document order.
+        """
+        room = self.remaining if limit is None else min(limit, self.remaining)
+        if not blocks:
+            self.sections[name] = {'tokens': 0, 'cut': False}
+            return ''
+        first, cut = fit_text(blocks[center], room)
+        tokens = estimate_tokens(first)
+        sep_cost = estimate_tokens(separator)
+        lo = hi = center
+        while not cut and (lo > 0 or hi < len(blocks) - 1):
+            for i in (hi + 1, lo - 1):
+                if not 0 <= i < len(blocks) or lo <= i <= hi:
+                    continue
+                cost = estimate_tokens(blocks[i]) + sep_cost
+                if tokens + cost > room:
+                    cut = True
+                    break
+                tokens += cost
+                lo, hi = min(lo, i), max(hi, i)
+        packed = blocks[lo:center] + [first] + blocks[center + 1:hi + 1]
+        self.used += tokens
+        self.sections[name] = {'tokens': tokens, 'cut': cut, 'window': True}
+        return separator.join(packed)
+
+    def summary(self):
+        """{budget, used, sections} for the usage log"""
+        return {'budget': self.total, 'used': self.used, 'sections': self.sections}
+
+    def report(self, quiet_unless_cut=True):
+        """Print budget use (by default only when a section was cut)"""
+        # A window around a point is expected to stop short of the whole text
+        cut = [name for name, s in self.sections.items() if s['cut'] and not s.get('window')]
+        if quiet_unless_cut and not cut:
+            return
+        detail = ', '.join(
+            f"{name} {s['tokens']}" + (f" ({s['items']} items)" if 'items' in s else '') + (' cut' if s['cut'] else '')
+            for name, s in self.sections.items()
+        )
+        print_info(f"Prompt budget {self.task}: {self.used}/{self.total} tokens ({detail})")
@@ -0,0 +1,215 @@
+"""
+Research Context Bundles
+Precompiled, token-counted slices of a research summary at several budget
+levels, plus a local search index, saved next to the research JSON
+"""
+import re
+from pathlib import Path
+from agents.retrieval import PassageIndex
+from agents.utils import (
+    load_json,
+    save_json,
+    estimate_tokens
+)
+
+
+BUNDLE_VERSION = 1
+BUDGET_LEVELS = (2000, 4000, 8000, 16000, 32000)
+
+# Share of each slice reserved for sources; claims get the rest
+SOURCE_SHARE = 0.4
+
+CONFIDENCE_RANK = {'high': 3, 'medium': 2, 'low': 1}
+RELEVANCE_WORDS = {'high': 0.9, 'medium': 0.6, 'low': 0.3}
+
+SOURCES_HEADER = "RESEARCH CONTEXT:\n\nSOURCES:\n"
+CLAIMS_HEADER = "\nEXTRACTED CLAIMS:\n"
+
+
+def bundle_path(research_path):
+    """data/research/x.json -> data/research/x.context.json"""
+    return Path(research_path).with_suffix('.context.json')
+
+
+def relevance(value):
+    """Relevance score as a float in [0, 1]; accepts 0.8, "8/10", "85%", "high" """
+    if isinstance(value, (int, float)):
+        return float(value) / 10 if value > 1 else float(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in RELEVANCE_WORDS:
+            return RELEVANCE_WORDS[text]
+        numbers = re.findall(r'\d+(?:\.\d+)?', text)
+        if numbers:
+            score = float(numbers[0])
+            if len(numbers) > 1 and '/' in text:
+                return score / float(numbers[1] or 1)
+            if '%' in text:
+                return score / 100
+            return score / 10 if score > 1 else score
+    return 0.0
+
+
+def rank_sources(sources):
+    """Sources by relevance, best first (stable for ties)"""
+    return sorted(sources, key=lambda s: -relevance(s.get('relevance_score')))
+
+
+def rank_claims(claims, sources):
+    """Claims by stated confidence, then by the relevance of their source"""
+    source_relevance = {s.get('url'): relevance(s.get('relevance_score')) for s in sources}
+    return sorted(claims, key=lambda c: (
+        -CONFIDENCE_RANK.get(str(c.get('confidence', '')).lower(), 0),
+        -source_relevance.get(c.get('source_url'), 0.0)
+    ))
+
+
+def format_source(i, source):
+    return (
+        f"{i}. {source.get('title', 'Unknown')} - {source.get('url', '')}\n"
+        f"   Relevance: {source.get('relevance_score', 'N/A')}\n"
+        f"   Key claims: {', '.join(source.get('key_claims', [])[:3])}\n\n"
+    )
+
+
+def format_claim(i, claim):
+    return (
+        f"{i}. \"{claim.get('claim_text', '')}\"\n"
+        f"   Source: {claim.get('source_url', '')}\n"
+        f"   Evidence: \"{claim.get('evidence_snippet', '')}\"\n"
+        f"   Confidence: {claim.get('confidence', 'unknown')}\n\n"
+    )
+
+
+def _take(costs, budget):
+    """How many leading items fit in budget, and the tokens they use"""
+    used = 0
+    for n, cost in enumerate(costs):
+        if used + cost > budget:
+            return n, used
+        used += cost
+    return len(costs), used
+
+
+def pack_slice(sources, claims, budget):
+    """
+    Render the best-ranked sources and claims that fit in `budget` tokens
+
+    Sources get SOURCE_SHARE of the budget and claims the remainder; any
+    budget one side leaves unused goes to the other.
+    """
+    source_lines = [format_source(i, s) for i, s in enumerate(sources, 1)]
+    claim_lines = [format_claim(i, c) for i, c in enumerate(claims, 1)]
+    source_costs = [estimate_tokens(line) for line in source_lines]
+    claim_costs = [estimate_tokens(line) for line in claim_lines]
+
+    available = budget - estimate_tokens(SOURCES_HEADER + CLAIMS_HEADER)
+    n_sources, used = _take(source_costs, int(available * SOURCE_SHARE))
+    n_claims, claim_used = _take(claim_costs, available - used)
+    used += claim_used
+    # Claims ran out first: give the leftover back to sources
+    extra, extra_used = _take(source_costs[n_sources:], available - used)
+    n_sources += extra
+
+    text = SOURCES_HEADER + ''.join(source_lines[:n_sources]) + CLAIMS_HEADER + ''.join(claim_lines[:n_claims])
+    return {
+        'budget': budget,
+        'tokens': estimate_tokens(text),
+        'sources': n_sources,
+        'claims': n_claims,
+        'complete': n_sources == len(sources) and n_claims == len(claims),
+        'text': text
+    }
+
+
+def build_search_index(sources, claims):
+    """BM25 index over sources and claims for instant local lookups"""
+    index = PassageIndex()
+    for i, source in enumerate(sources):
+        text = f"{source.get('title', '')}\n\n{' '.join(source.get('key_claims', []))}"
+        index.add_document(source.get('url', ''), text, source.get('title', ''), origin='research',
+                           kind='source', ref=i)
+    for i, claim in enumerate(claims):
+        text = f"{claim.get('claim_text', '')}\n\n{claim.get('evidence_snippet', '')}"
+        index.add_document(claim.get('source_url', ''), text, claim.get('claim_text', '')[:120],
+                           origin='research', kind='claim', ref=i)
+    return index
+
+
+def build_context_bundle(research_data, research_path=None):
+    """Ranked slices at each budget level, stopping once everything fits"""
+    sources = rank_sources(research_data.get('relevant_sources', []))
+    claims = rank_claims(research_data.get('extracted_claims', []), sources)
+
+    slices = []
+    for budget in BUDGET_LEVELS:
+        packed = pack_slice(sources, claims, budget)
+        slices.append(packed)
+        if packed['complete']:
+            break
+
+    research_mtime = None
+    if research_path and Path(research_path).exists():
+        research_mtime = Path(research_path).stat().st_mtime_ns
+
+    return {
+        'version': BUNDLE_VERSION,
+        'research_path': str(research_path) if research_path else None,
+        'research_mtime_ns': research_mtime,
+        'topic': research_data.get('topic', ''),
+        'total_sources': len(sources),
+        'total_claims': len(claims),
+        'slices': slices,
+        'search_index': build_search_index(sources, claims).to_dict()
+    }
+
+
+def save_context_bundle(research_data, research_path):
+    """Build the bundle for a saved research JSON and write it alongside"""
+    path = bundle_path(research_path)
+    save_json(build_context_bundle(research_data, research_path), path, compact=True)
+    return path
+
+
+def load_context_bundle(research_path, research_data=None):
+    """
+    Load the precompiled bundle, rebuilding it if missing or stale
+
+    A bundle is stale when the research JSON changed after it was built.
+    """
+    path = bundle_path(research_path)
+    current_mtime = Path(research_path).stat().st_mtime_ns if Path(research_path).exists() else None
+
+    if path.exists():
+        try:
+            bundle = load_json(path)
+            if bundle.get('version') == BUNDLE_VERSION and bundle.get('research_mtime_ns') == current_mtime:
+                return bundle
+        except (OSError, ValueError):
+            pass
+
+    if research_data is None:
+        research_data = load_json(research_path) if current_mtime else {}
+    bundle = build_context_bundle(research_data, research_path)
+    try:
+        save_json(bundle, path, compact=True)
+    except OSError:
+        pass
+    return bundle
+
+
+def select_slice(bundle, max_tokens):
+    """The largest slice that fits max_tokens (the smallest if none do)"""
+    slices = bundle.get('slices') or []
+    if not slices:
+        return {'budget': 0, 'tokens': 0, 'sources': 0, 'claims': 0, 'complete': True, 'text': ''}
+    fitting = [s for s in slices if s['tokens'] <= max_tokens]
+    return fitting[-1] if fitting else slices[0]
+
+
+def search_bundle(bundle, query, k=5):
+    """Top-k sources/claims for a query from the bundle's local index"""
+    index = bundle.get('search_index')
+    if not index or not index.get('passages'):
+        return []
+    return PassageIndex.from_dict(index).search(query, k=k)
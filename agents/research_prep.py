@@ -2,9 +2,10 @@
 Research Prep Agent (Monday Automation)
 Analyzes intake briefs and prepares research summary for human writer
 """
+import hashlib
 import json
-from pathlib import Path
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from agents.utils import (
     get_anthropic_client,
     save_json,
@@ -15,72 +16,25 @@ from agents.utils import (
     print_info,
     print_warning
 )
+from agents.research_context import save_context_bundle
+from agents.intake_store import load_recent_intake
+from agents.retrieval import PassageIndex
+from agents.preview import generate_preview
+from agents.model_router import routed_call
+from agents.prompt_budget import PromptBudget
+from agents.embeddings import (
+    EmbeddingStore,
+    embeddings_available,
+    brief_entries,
+    brief_id,
+    claim_entries
+)
 
 
-def load_recent_intake(days=7):
-    """Load intake briefs from past N days"""
-    intake_dir = Path('data/intake')
-    if not intake_dir.exists():
-        return []
-
-    cutoff = datetime.now() - timedelta(days=days)
-    briefs = []
-
-    for file in sorted(intake_dir.glob('*.json'), reverse=True):
-        try:
-            with open(file) as f:
-                data = json.load(f)
-                # Check if recent enough
-                date_str = data.get('date', '')
-                if date_str:
-                    file_date = datetime.fromisoformat(date_str.split('T')[0])
-                    if file_date >= cutoff:
-                        # Handle both flat and nested formats
-                        if 'briefs' in data:
-                            # Nested format - extract briefs array
-                            briefs.extend(data['briefs'])
-                        else:
-                            # Flat format - use data directly
-                            briefs.append(data)
-        except Exception as e:
-            print_error(f"Could not load {file.name}: {e}")
-
-    return briefs
-
-
-def research_prep(topic, days=7, min_sources=10):
-    """
-    Prepare research summary for writing
-
-    Args:
-        topic: Research angle/topic to focus on
-        days: How many days of intake to analyze
-        min_sources: Minimum number of relevant sources needed
-    """
-    print_section(f"RESEARCH PREP: {topic}")
-
-    # Load recent intake
-    print_info(f"Loading intake briefs from past {days} days...")
-    briefs = load_recent_intake(days)
-
-    if not briefs:
-        print_error("No intake briefs found. Run 'python3 run.py intake' first.")
-        return
-
-    print_success(f"Loaded {len(briefs)} intake briefs")
-
-    # Prepare context for Claude
-    intake_text = "\n\n".join([
-        f"Source: {b.get('title', 'Unknown')}\nURL: {b.get('url', '')}\nSummary: {b.get('summary', '')}"
-        for b in briefs[:50]  # Limit to avoid token overflow
-    ])
-
-    print_info(f"Analyzing sources for topic: '{topic}'...")
-
-    # Call Claude to analyze and extract relevant information
-    client = get_anthropic_client()
+# Topics analyzed at once (one LLM call each)
+RESEARCH_CONCURRENCY = 4
 
-    prompt = f"""You are a research assistant preparing materials for a writer working on an article about latency value in electronic markets.
+RESEARCH_PROMPT = """You are a research assistant preparing materials for a writer working on an article about latency value in electronic markets.
 
 TOPIC: {topic}
 
@@ -104,18 +58,124 @@ Output a structured JSON research summary with:
 
 Be rigorous: only include claims with clear evidence from sources."""
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=8000,
-        temperature=0.3,  # Lower temperature for factual extraction
+
+def load_topics(topics=None, topics_file=None):
+    """
+    Topics from the command line plus a file (one per line; blank lines and
+    # comments skipped), in order with repeats dropped
+    """
+    if isinstance(topics, str):
+        topics = [topics]
+    found = list(topics or [])
+    if topics_file:
+        with open(topics_file) as f:
+            found.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith('#'))
+    return list(dict.fromkeys(t.strip() for t in found if t.strip()))
+
+
+def topic_slug(topic):
+    return topic.lower().replace(' ', '-').replace('/', '-')[:50]
+
+
+def topic_slugs(topics):
+    """
+    {topic: slug} for one run; topics whose slugs collide (same first 50
+    characters, or differing only in spaces, slashes and hyphens) get a
+    short hash of the topic appended so no output overwrites another
+    """
+    slugs = {topic: topic_slug(topic) for topic in topics}
+    counts = {}
+    for slug in slugs.values():
+        counts[slug] = counts.get(slug, 0) + 1
+    return {
+        topic: f"{slug}-{hashlib.sha1(topic.encode()).hexdigest()[:6]}" if counts[slug] > 1 else slug
+        for topic, slug in slugs.items()
+    }
+
+
+def build_brief_index(briefs):
+    """BM25 index over brief titles and summaries (the ranking used without numpy)"""
+    index = PassageIndex()
+    for i, brief in enumerate(briefs):
+        index.add_document(brief.url, f"{brief.title}\n\n{brief.summary}", brief.title, origin='intake', brief=i)
+    return index
+
+
+def rank_briefs_by_topic(briefs, topic, store=None, index=None, ids=None):
+    """
+    Order briefs by similarity to the topic: embedding cosine when a store
+    is given (its briefs must already be added), else BM25 over index.
+    Briefs that don't match keep their original order at the end.
+    """
+    if store is not None:
+        ids = ids or [brief_id(b) for b in briefs]
+        ranked = store.top_k(topic, k=len(ids), kind='brief', ids=ids)
+        order = {record['id']: rank for rank, (_, record) in enumerate(ranked)}
+        return sorted(briefs, key=lambda b: order.get(brief_id(b), len(order)))
+
+    # A long summary spans several passages; its best one ranks the brief
+    order = {}
+    for _, passage in index.search(topic, k=len(index)):
+        order.setdefault(passage['brief'], len(order))
+    return [briefs[i] for i in sorted(range(len(briefs)), key=lambda i: order.get(i, len(order)))]
+
+
+class IntakeWindow:
+    """
+    Recent intake loaded and indexed once, shared by every topic in a run
+
+    Ranking only reads the index (or store), so topics can be ranked
+    concurrently; nothing may be appended to the store until they finish.
+    """
+
+    def __init__(self, days):
+        self.days = days
+        self.briefs = load_recent_intake(days)
+        self.store = EmbeddingStore() if embeddings_available() else None
+        self.index = None
+        self.ids = None
+        if not self.briefs:
+            return
+        if self.store is not None:
+            # Briefs missing from the store are embedded once, here, for all topics
+            self.store.add_texts(brief_entries(self.briefs))
+            self.ids = [brief_id(b) for b in self.briefs]
+            # Map the matrix now so concurrent top_k calls only read
+            self.store.matrix
+        else:
+            self.index = build_brief_index(self.briefs)
+
+    def ranked(self, topic):
+        return rank_briefs_by_topic(self.briefs, topic, self.store, self.index, self.ids)
+
+
+def analyze_topic(client, window, topic, min_sources):
+    """Rank the window for one topic and ask Claude for its research summary"""
+    briefs = window.ranked(topic)
+
+    # Pack as many briefs as the prompt budget allows, best-ranked first
+    budget = PromptBudget('research_prep')
+    budget.reserve(RESEARCH_PROMPT.format(topic=topic, days=window.days, min_sources=min_sources, intake_text=''))
+    intake_text, shown = budget.items('intake', (
+        f"Source: {b.title or 'Unknown'}\nURL: {b.url}\nSummary: {b.summary}"
+        for b in briefs
+    ))
+
+    print_info(f"Analyzing {shown} of {len(briefs)} sources for topic: '{topic}'...")
+
+    prompt = RESEARCH_PROMPT.format(topic=topic, days=window.days, min_sources=min_sources, intake_text=intake_text)
+
+    result_text, _ = routed_call(
+        client, 'research_prep',
         messages=[{
             "role": "user",
             "content": prompt
-        }]
+        }],
+        max_tokens=8000,
+        temperature=0.3,  # Lower temperature for factual extraction
+        budget=budget
     )
 
-    result_text = response.content[0].text
-
     # Extract JSON from response
     try:
         # Find JSON in response
@@ -138,18 +198,24 @@ Be rigorous: only include claims with clear evidence from sources."""
     # Add metadata
     research_data['topic'] = topic
     research_data['generated_at'] = datetime.now().isoformat()
-    research_data['intake_period_days'] = days
+    research_data['intake_period_days'] = window.days
     research_data['total_sources_analyzed'] = len(briefs)
+    return research_data
+
 
-    # Save research summary
-    date_slug = get_date_slug()
-    topic_slug = topic.lower().replace(' ', '-').replace('/', '-')[:50]
-    filename = f"data/research/{date_slug}-{topic_slug}.json"
+def save_research(research_data, min_sources, slug=None):
+    """Write the research JSON, its context bundle and preview; returns the JSON path"""
+    slug = slug or topic_slug(research_data['topic'])
+    filename = f"data/research/{get_date_slug()}-{slug}.json"
 
     save_json(research_data, filename)
 
     print_success(f"Research summary saved: {filename}")
 
+    # Precompiled context slices for the assistant
+    bundle_file = save_context_bundle(research_data, filename)
+    print_success(f"Context bundle saved: {bundle_file}")
+
     # Print quick summary
     if 'relevant_sources' in research_data:
         num_sources = len(research_data.get('relevant_sources', []))
@@ -163,92 +229,69 @@ Be rigorous: only include claims with clear evidence from sources."""
 
     # Generate HTML preview
     generate_preview(research_data, filename.replace('.json', '.html'))
+    return filename
 
-    print()
-    print_success("Research prep complete!")
-    print(f"Next steps:")
-    print(f"  1. Review research summary: {filename}")
-    print(f"  2. Start writing in content/posts/")
-    print(f"  3. Use: python3 run.py assist --research {filename}")
-
-
-def generate_preview(research_data, html_path):
-    """Generate HTML preview of research summary"""
-
-    relevant_sources = research_data.get('relevant_sources', [])
-    extracted_claims = research_data.get('extracted_claims', [])
-    open_questions = research_data.get('open_questions', [])
-    synthesis = research_data.get('synthesis_suggestions', '')
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Research Summary: {research_data.get('topic', 'Unknown')}</title>
-    <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                line-height: 1.6; max-width: 900px; margin: 0 auto; padding: 20px; }}
-        h1 {{ color: #333; }}
-        h2 {{ color: #666; margin-top: 30px; border-bottom: 2px solid #eee; padding-bottom: 5px; }}
-        .source {{ background: #f5f5f5; padding: 15px; margin: 10px 0; border-left: 4px solid #4c6ef5; }}
-        .claim {{ background: #f0f9ff; padding: 12px; margin: 8px 0; border-left: 3px solid #3b82f6; }}
-        .question {{ background: #fef3c7; padding: 10px; margin: 6px 0; }}
-        .meta {{ color: #666; font-size: 14px; }}
-        code {{ background: #eee; padding: 2px 6px; border-radius: 3px; }}
-    </style>
-</head>
-<body>
-    <h1>Research Summary: {research_data.get('topic', 'Unknown')}</h1>
-    <p class="meta">Generated: {research_data.get('generated_at', '')} | Sources analyzed: {research_data.get('total_sources_analyzed', 0)}</p>
-
-    <h2>Synthesis Suggestions</h2>
-    <p>{synthesis}</p>
-
-    <h2>Relevant Sources ({len(relevant_sources)})</h2>
-"""
 
-    for source in relevant_sources:
-        html += f"""
-    <div class="source">
-        <strong>{source.get('title', 'Unknown')}</strong><br>
-        <a href="{source.get('url', '#')}">{source.get('url', '')}</a><br>
-        <em>Relevance: {source.get('relevance_score', 'N/A')}</em><br>
-        Key claims: {', '.join(source.get('key_claims', [])[:3])}
-    </div>
-"""
+def research_prep(topics, days=7, min_sources=10, topics_file=None, max_concurrency=RESEARCH_CONCURRENCY):
+    """
+    Prepare research summaries for writing, one per topic
 
-    html += f"""
-    <h2>Extracted Claims ({len(extracted_claims)})</h2>
-"""
+    The intake window is loaded and indexed once; each topic's ranking and
+    LLM analysis then run in parallel. Results are saved in topic order.
 
-    for claim in extracted_claims[:20]:  # Limit to first 20
-        html += f"""
-    <div class="claim">
-        <strong>Claim:</strong> {claim.get('claim_text', '')}<br>
-        <strong>Source:</strong> <a href="{claim.get('source_url', '#')}">{claim.get('source_url', '')}</a><br>
-        <strong>Evidence:</strong> "{claim.get('evidence_snippet', '')}"<br>
-        <strong>Confidence:</strong> {claim.get('confidence', 'unknown')}
-    </div>
-"""
+    Args:
+        topics: Research angle/topic to focus on, or a list of them
+        days: How many days of intake to analyze
+        min_sources: Minimum number of relevant sources needed
+        topics_file: File with more topics, one per line
+    """
+    topics = load_topics(topics, topics_file)
+    if not topics:
+        print_error("No topics given")
+        return []
+    print_section(f"RESEARCH PREP: {topics[0]}" if len(topics) == 1 else f"RESEARCH PREP: {len(topics)} topics")
 
-    html += f"""
-    <h2>Open Questions ({len(open_questions)})</h2>
-"""
+    # Load recent intake
+    print_info(f"Loading intake briefs from past {days} days...")
+    window = IntakeWindow(days)
 
-    for q in open_questions:
-        html += f"""
-    <div class="question">• {q}</div>
-"""
+    if not window.briefs:
+        print_error("No intake briefs found. Run 'python3 run.py intake' first.")
+        return []
 
-    html += """
-</body>
-</html>
-"""
+    print_success(f"Loaded {len(window.briefs)} intake briefs")
 
-    Path(html_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(html_path, 'w') as f:
-        f.write(html)
+    # Call Claude to analyze and extract relevant information
+    client = get_anthropic_client()
+    slugs = topic_slugs(topics)
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(topics)))) as pool:
+        futures = [pool.submit(analyze_topic, client, window, topic, min_sources) for topic in topics]
+        for topic, future in zip(topics, futures):
+            try:
+                research_data = future.result()
+            except Exception as e:
+                print_error(f"Research prep failed for '{topic}': {e}")
+                continue
+            if len(topics) > 1:
+                print()
+                print_info(f"Topic: {topic}")
+            results.append((save_research(research_data, min_sources, slugs[topic]), research_data))
+
+    # Every topic is ranked, so the store can take new rows
+    claims = [c for _, data in results for c in data.get('extracted_claims') or []]
+    if window.store is not None and claims:
+        added = window.store.add_texts(claim_entries(claims))
+        print_info(f"Indexed {added} new claims in embedding store")
+
+    if not results:
+        return []
 
-    print_success(f"Preview generated: {html_path}")
-    print_info("Open in browser to review research summary")
+    filenames = [filename for filename, _ in results]
+    print()
+    print_success("Research prep complete!")
+    print(f"Next steps:")
+    print(f"  1. Review research summary: {', '.join(filenames)}")
+    print(f"  2. Start writing in content/posts/")
+    print(f"  3. Use: python3 run.py assist --research {filenames[0]}")
+    return filenames
@@ -0,0 +1,234 @@
+"""
+Passage Retrieval
+Chunked BM25 index (plus optional NumPy embeddings) over the text of cited
+sources and intake briefs, so claim verification only sees the top passages
+"""
+import heapq
+import math
+from agents.citations import tokenize
+from agents.content_index import get_content_index
+from agents.embeddings import hash_embed, np, EMBEDDING_DIM
+from agents.snapshots import SnapshotStore
+from agents.intake_store import load_recent_intake
+
+
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 30
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Weight of embedding cosine vs. normalized BM25 in hybrid scoring
+EMBEDDING_WEIGHT = 0.3
+
+INTAKE_DAYS = 90
+
+
+def chunk_text(text, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """
+    Split text into passages of about `size` words
+
+    Short paragraphs are packed together; long ones are split into
+    overlapping word windows.
+    """
+    chunks = []
+    current = []
+    for paragraph in text.split('\n\n'):
+        words = paragraph.split()
+        if not words:
+            continue
+        if len(words) > size:
+            if current:
+                chunks.append(' '.join(current))
+                current = []
+            step = size - overlap
+            for i in range(0, len(words), step):
+                chunks.append(' '.join(words[i:i + size]))
+                if i + size >= len(words):
+                    break
+            continue
+        if len(current) + len(words) > size and current:
+            chunks.append(' '.join(current))
+            current = []
+        current.extend(words)
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+class PassageIndex:
+    """
+    BM25 over passages, with optional dense vectors for hybrid ranking
+
+    Passages are dicts {url, title, text, origin}. Call add_document() for
+    each source, then search().
+    """
+
+    def __init__(self, use_embeddings=False, embed_fn=None):
+        if use_embeddings and np is None:
+            raise ImportError("Embeddings require numpy: pip install numpy")
+        self.use_embeddings = use_embeddings
+        self.embed_fn = embed_fn or hash_embed
+        self.passages = []
+        self._lengths = []
+        self._postings = {}
+        self._matrix = None
+        self._vectors = []
+
+    def __len__(self):
+        return len(self.passages)
+
+    def to_dict(self):
+        """JSON-serializable BM25 state (dense vectors are not saved)"""
+        return {'passages': self.passages, 'lengths': self._lengths, 'postings': self._postings}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an index saved with to_dict()"""
+        index = cls()
+        index.passages = data['passages']
+        index._lengths = data['lengths']
+        index._postings = data['postings']
+        return index
+
+    def add_document(self, url, text, title='', origin='snapshot', **extra):
+        """Chunk a document and index its passages; extra fields are kept on each passage"""
+        for chunk in chunk_text(text):
+            tokens = tokenize(chunk)
+            if not tokens:
+                continue
+            pid = len(self.passages)
+            self.passages.append(dict(extra, url=url, title=title, text=chunk, origin=origin))
+            self._lengths.append(len(tokens))
+
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self._postings.setdefault(token, []).append((pid, tf))
+
+            if self.use_embeddings:
+                self._vectors.append(self.embed_fn(tokens))
+                self._matrix = None
+
+    def _bm25(self, query_tokens, allowed=None):
+        n = len(self.passages)
+        avg_len = sum(self._lengths) / n
+        scores = {}
+        for token in set(query_tokens):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for pid, tf in postings:
+                if allowed is not None and pid not in allowed:
+                    continue
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[pid] / avg_len)
+                scores[pid] = scores.get(pid, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        return scores
+
+    def _cosine(self, query_tokens):
+        if self._matrix is None:
+            self._matrix = np.vstack(self._vectors) if self._vectors else np.zeros((0, EMBEDDING_DIM), np.float32)
+        return self._matrix @ self.embed_fn(query_tokens)
+
+    def search(self, query, k=5, urls=None):
+        """
+        Top-k passages for query as (score, passage), best first
+
+        urls limits results to passages from those sources.
+        """
+        query_tokens = tokenize(query)
+        if not self.passages or not query_tokens:
+            return []
+
+        allowed = None
+        if urls is not None:
+            wanted = set(urls)
+            allowed = {pid for pid, p in enumerate(self.passages) if p['url'] in wanted}
+            if not allowed:
+                return []
+
+        scores = self._bm25(query_tokens, allowed)
+
+        if self.use_embeddings and scores:
+            top_bm25 = max(scores.values())
+            cosine = self._cosine(query_tokens)
+            scores = {
+                pid: (1 - EMBEDDING_WEIGHT) * score / top_bm25 + EMBEDDING_WEIGHT * float(cosine[pid])
+                for pid, score in scores.items()
+            }
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, self.passages[pid]) for pid, score in best]
+
+
+def post_source_urls(index=None):
+    """URLs listed in the `sources` frontmatter of every post"""
+    index = index or get_content_index()
+    urls = []
+    for entry in index.pages('posts'):
+        urls.extend(u for u in entry['frontmatter'].get('sources') or [] if isinstance(u, str))
+    return list(dict.fromkeys(urls))
+
+
+def build_evidence_index(use_embeddings=False, store=None, intake_days=INTAKE_DAYS):
+    """
+    Index snapshot text of post sources plus recent intake briefs
+
+    Sources without a stored snapshot are skipped; run `run.py snapshot`
+    to fill them in.
+    """
+    store = store or SnapshotStore()
+    index = PassageIndex(use_embeddings=use_embeddings and np is not None)
+
+    urls = list(dict.fromkeys(post_source_urls() + list(store.index)))
+    for url in urls:
+        text = store.get_text(url)
+        if text:
+            index.add_document(url, text, store.record(url).get('title', ''))
+
+    for brief in load_recent_intake(intake_days):
+        text = f"{brief.get('title', '')}\n\n{brief.get('summary', '')}"
+        index.add_document(brief.get('url', ''), text, brief.get('title', ''), origin='intake')
+
+    return index
+
+
+_evidence_index = None
+
+
+def get_evidence_index():
+    """Shared evidence index, built on first use"""
+    global _evidence_index
+    if _evidence_index is None:
+        _evidence_index = build_evidence_index(use_embeddings=np is not None)
+    return _evidence_index
+
+
+def retrieve_evidence(claim_text, cited_urls=(), k=4, index=None):
+    """
+    Passages to show the verifier for one claim
+
+    Passages from the claim's own cited sources come first; remaining slots
+    are filled from the rest of the corpus. Returns [{url, title, text,
+    origin, score, cited}].
+    """
+    index = index or get_evidence_index()
+    results = []
+    seen = set()
+
+    if cited_urls:
+        for score, passage in index.search(claim_text, k=k, urls=cited_urls):
+            results.append(dict(passage, score=round(score, 3), cited=True))
+            seen.add(passage['text'])
+
+    if len(results) < k:
+        for score, passage in index.search(claim_text, k=k):
+            if passage['text'] in seen:
+                continue
+            results.append(dict(passage, score=round(score, 3), cited=False))
+            if len(results) >= k:
+                break
+
+    return results
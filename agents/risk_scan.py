@@ -0,0 +1,200 @@
+"""
+Risky Content Scanner
+Compiles the rule file into one combined regex and reports every match
+with line/column and context, for a single draft or the whole site
+"""
+import re
+from pathlib import Path
+import yaml
+from agents.content_index import get_content_index, split_frontmatter
+from agents.text_match import LineIndex
+from agents.utils import (
+    print_section,
+    print_success,
+    print_error,
+    print_info
+)
+
+
+RULES_CONFIG = Path(__file__).parent / 'configs' / 'risky_content.yaml'
+
+CONTEXT_CHARS = 60
+
+# Patterns that can't share the combined alternation: numbered
+# backreferences and inline flags change meaning inside a larger regex
+STANDALONE_PATTERN = re.compile(r'\\[1-9]|\(\?[aiLmsux]+\)')
+
+
+class RiskScanner:
+    """
+    Single-pass scanner over a set of named regex rules
+
+    All rules are joined into one alternation of named groups, so the text
+    is walked once no matter how many rules there are. The alternation
+    reports one rule per span, so each combined match is followed by a
+    look at the other rules' next match: any that starts inside the span is
+    reported too, and allowing one rule never hides another's finding.
+    Rules the alternation can't hold (numbered backreferences, inline
+    flags) are scanned on their own.
+    """
+
+    def __init__(self, rules, allowlist=None):
+        self.rules = []
+        groups = []
+        self.separate = []
+        for i, rule in enumerate(rules):
+            # Compile each pattern on its own so errors name the rule
+            try:
+                pattern = re.compile(rule['pattern'], re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern for rule '{rule['id']}': {e}")
+            self.rules.append((rule, pattern))
+            if STANDALONE_PATTERN.search(rule['pattern']):
+                self.separate.append(i)
+            else:
+                groups.append(f"(?P<r{i}>{rule['pattern']})")
+
+        self.combined = re.compile('|'.join(groups), re.IGNORECASE) if groups else None
+        self.allowlist = allowlist or {}
+
+    @classmethod
+    def from_config(cls, path=RULES_CONFIG):
+        """Build a scanner from the YAML rule file"""
+        with open(path) as f:
+            config = yaml.safe_load(f) or {}
+        return cls(config.get('rules') or [], config.get('allowlist') or {})
+
+    def allowed_for(self, slug=None, frontmatter=None):
+        """Combine the rule file allowlist for a post with its frontmatter `risky_allow`"""
+        allowed = set(self.allowlist.get(slug, []) if slug else [])
+        allowed.update((frontmatter or {}).get('risky_allow') or [])
+        return allowed
+
+    def scan(self, text, allow=None, line_offset=0):
+        """
+        Return every match as {rule, reason, match, line, column, context}
+
+        allow is a set of rule ids, or "rule-id:phrase" entries that allow
+        a single phrase (case-insensitive) for that rule. line_offset shifts
+        reported lines when text is the body of a file with frontmatter.
+        """
+        allow = allow or set()
+        lines = LineIndex(text)
+        findings = []
+        # Per rule: where its next match may start, and its next match ahead
+        resume = [0] * len(self.rules)
+        upcoming = {}
+
+        def report(i, m):
+            if m.start() < resume[i]:
+                return  # Overlaps a match already reported for this rule
+            resume[i] = max(m.end(), m.start() + 1)
+            rule = self.rules[i][0]
+            matched = m.group()
+            if rule['id'] in allow or f"{rule['id']}:{matched.lower()}" in allow:
+                return
+
+            line, column = lines.locate(m.start())
+            context = text[max(0, m.start() - CONTEXT_CHARS):m.end() + CONTEXT_CHARS]
+            findings.append((m.start(), i, {
+                'rule': rule['id'],
+                'reason': rule['reason'],
+                'match': matched,
+                'line': line + line_offset,
+                'column': column,
+                'context': ' '.join(context.split())
+            }))
+
+        def next_match(i, pos):
+            m = upcoming.get(i)
+            if m is None or (m and m.start() < pos):
+                m = upcoming[i] = self.rules[i][1].search(text, pos) or False
+            return m
+
+        combined_ids = [i for i in range(len(self.rules)) if i not in self.separate]
+        for m in self.combined.finditer(text) if self.combined else ():
+            winner = int(m.lastgroup[1:])
+            report(winner, m)
+            # Other rules can only have been skipped where they start inside this span
+            for i in combined_ids:
+                if i == winner:
+                    continue
+                other = next_match(i, max(m.start(), resume[i]))
+                while other and other.start() < m.end():
+                    report(i, other)
+                    other = next_match(i, resume[i])
+
+        for i in self.separate:
+            for m in self.rules[i][1].finditer(text):
+                report(i, m)
+
+        # Document order; rule file order for matches at the same position
+        findings.sort(key=lambda f: f[:2])
+        return [finding for _, _, finding in findings]
+
+
+def body_line_offset(content, body):
+    """Number of file lines that precede the body (frontmatter and blank lines)"""
+    pos = content.find(body[:200]) if body else -1
+    return content.count('\n', 0, pos) if pos > 0 else 0
+
+
+_default_scanner = None
+
+
+def get_scanner():
+    """Return the shared scanner compiled from the rule file"""
+    global _default_scanner
+    if _default_scanner is None:
+        _default_scanner = RiskScanner.from_config()
+    return _default_scanner
+
+
+def scan_content_tree(content_dir='content', scanner=None):
+    """
+    Scan every markdown file under content_dir
+
+    Returns {path: findings} for files with at least one finding.
+    """
+    scanner = scanner or get_scanner()
+    index = get_content_index(content_dir)
+    results = {}
+
+    for entry in index.pages(include_index=True):
+        with open(entry['path']) as f:
+            content = f.read()
+        _, body = split_frontmatter(content)
+        allow = scanner.allowed_for(entry['slug'], entry['frontmatter'])
+        findings = scanner.scan(body, allow, body_line_offset(content, body))
+        if findings:
+            results[entry['path']] = findings
+
+    return results
+
+
+def run_site_scan(content_dir='content'):
+    """
+    Scan the whole content tree and print findings by file
+    Returns True if the site is clean
+    """
+    print_section("RISKY CONTENT SCAN")
+
+    results = scan_content_tree(content_dir)
+    scanned = len(get_content_index(content_dir).pages(include_index=True))
+    print_info(f"Scanned {scanned} files under {content_dir}/")
+
+    if not results:
+        print_success("No risky content found")
+        return True
+
+    total = sum(len(findings) for findings in results.values())
+    print_error(f"{total} findings in {len(results)} files")
+    print()
+    for path, findings in results.items():
+        print(path)
+        for finding in findings:
+            print(f"  {finding['line']}:{finding['column']}  [{finding['rule']}] {finding['reason']}")
+            print(f"      ...{finding['context']}...")
+        print()
+
+    return False
@@ -0,0 +1,294 @@
+"""
+Source Snapshot Store
+Content-addressed local copies of cited source pages, with extracted text
+indexed by URL, so evidence verification can run fully offline
+"""
+import gzip
+import hashlib
+import re
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from agents.citations import CitationIndex
+from agents.utils import (
+    load_markdown,
+    parse_frontmatter,
+    append_jsonl,
+    load_jsonl,
+    atomic_write,
+    print_section,
+    print_success,
+    print_error,
+    print_info,
+    print_warning
+)
+
+
+SNAPSHOT_DIR = 'data/snapshots'
+USER_AGENT = 'TernQED-Research/1.0 (+https://ternqed.com/about/)'
+FETCH_TIMEOUT = 20
+MAX_FETCH_WORKERS = 8
+MAX_PAGE_BYTES = 10 * 1024 * 1024
+ALLOWED_SCHEMES = ('http', 'https')
+
+
+class _TextExtractor(HTMLParser):
+    """Collect visible text and the <title> from an HTML page"""
+
+    SKIP_TAGS = {'script', 'style', 'noscript', 'nav', 'footer', 'header', 'svg', 'form'}
+    BLOCK_TAGS = {'p', 'div', 'section', 'article', 'li', 'br', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'blockquote'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.title = ''
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        elif tag == 'title':
+            self._in_title = True
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag == 'title':
+            self._in_title = False
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n\n')
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def extract_text(html):
+    """Return (title, text) from HTML, with paragraphs separated by blank lines"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    text = ''.join(parser.parts)
+    paragraphs = [' '.join(p.split()) for p in re.split(r'\n\s*\n', text)]
+    return ' '.join(parser.title.split()), '\n\n'.join(p for p in paragraphs if p)
+
+
+class SnapshotStore:
+    """
+    Snapshots under data/snapshots/
+
+        objects/ab/abcd....gz    raw response body, keyed by SHA-256
+        text/ab/abcd....txt      extracted text
+        index.jsonl              append-only URL -> snapshot records
+
+    Identical pages fetched from different URLs share one object; the
+    latest record for a URL wins, except that a failed re-fetch never
+    replaces a stored snapshot.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = Path(root)
+        self.index_path = self.root / 'index.jsonl'
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {}
+            for record in load_jsonl(self.index_path):
+                self._keep(record)
+        return self._index
+
+    def _keep(self, record):
+        """Index record unless it is a failure and the URL has a snapshot"""
+        current = self._index.get(record['url'])
+        if record.get('sha256') or not (current and current.get('sha256')):
+            self._index[record['url']] = record
+
+    def _path(self, kind, digest, suffix):
+        return self.root / kind / digest[:2] / f"{digest}{suffix}"
+
+    def has(self, url):
+        return url in self.index
+
+    def record(self, url):
+        return self.index.get(url)
+
+    def get_text(self, url):
+        """Extracted text for a URL, or None if it has no snapshot"""
+        record = self.index.get(url)
+        if not record or not record.get('sha256'):
+            return None
+        path = self._path('text', record['sha256'], '.txt')
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return f.read()
+
+    def add(self, url, body, content_type='', charset=None, truncated=False):
+        """
+        Store a fetched body and index it under url
+
+        Text is decoded with the response's charset (UTF-8 when it has none
+        or names one Python doesn't know). truncated marks a body that was
+        cut at MAX_PAGE_BYTES.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+
+        object_path = self._path('objects', digest, '.gz')
+        if not object_path.exists():
+            with atomic_write(object_path, 'wb') as f:
+                f.write(gzip.compress(body))
+
+        title, text = '', ''
+        if 'html' in content_type or not content_type:
+            title, text = extract_text(decode_body(body, charset))
+        elif content_type.startswith('text/'):
+            text = decode_body(body, charset)
+
+        text_path = self._path('text', digest, '.txt')
+        if not text_path.exists():
+            with atomic_write(text_path) as f:
+                f.write(text)
+
+        record = {
+            'url': url,
+            'sha256': digest,
+            'title': title,
+            'content_type': content_type,
+            'bytes': len(body),
+            'text_chars': len(text),
+            'fetched_at': datetime.now().isoformat()
+        }
+        if charset:
+            record['charset'] = charset
+        if truncated:
+            record['truncated'] = True
+        append_jsonl(record, self.index_path)
+        self.index[url] = record
+        return record
+
+    def add_failure(self, url, error):
+        """
+        Record a failed fetch so it is visible in the index
+
+        If the URL already has a snapshot it stays in use; the returned
+        record is that snapshot with the new `refresh_error`.
+        """
+        record = {'url': url, 'sha256': None, 'error': str(error), 'fetched_at': datetime.now().isoformat()}
+        append_jsonl(record, self.index_path)
+        self._keep(record)
+        current = self.index[url]
+        return record if current is record else {**current, 'refresh_error': str(error)}
+
+
+def decode_body(body, charset=None):
+    """Decode a response body with its charset, falling back to UTF-8"""
+    try:
+        return body.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+def fetch_url(url, timeout=FETCH_TIMEOUT):
+    """
+    Fetch an http(s) URL; returns (body_bytes, content_type, charset, truncated)
+
+    Bodies over MAX_PAGE_BYTES are cut there and flagged as truncated.
+    """
+    scheme = urllib.parse.urlsplit(url).scheme.lower()
+    if scheme not in ALLOWED_SCHEMES:
+        raise ValueError(f"unsupported URL scheme: {scheme or '(none)'}")
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        content_type = response.headers.get_content_type() if response.headers.get('Content-Type') else ''
+        charset = response.headers.get_content_charset()
+        body = response.read(MAX_PAGE_BYTES + 1)
+    truncated = len(body) > MAX_PAGE_BYTES
+    return body[:MAX_PAGE_BYTES], content_type, charset, truncated
+
+
+def snapshot_urls(urls, store=None, refresh=False, max_workers=MAX_FETCH_WORKERS):
+    """
+    Fetch and store snapshots for urls, skipping ones already stored
+
+    Returns {url: record}. Fetches run concurrently; index writes happen on
+    the calling thread.
+    """
+    store = store or SnapshotStore()
+    urls = list(dict.fromkeys(urls))
+    pending = []
+    for url in urls:
+        if refresh or not store.has(url) or not store.record(url).get('sha256'):
+            pending.append(url)
+
+    results = {url: store.record(url) for url in urls if url not in pending}
+    if not pending:
+        return results
+
+    def fetch(url):
+        try:
+            return url, fetch_url(url), None
+        except Exception as e:
+            return url, None, e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url, fetched, error in executor.map(fetch, pending):
+            if error is not None:
+                results[url] = store.add_failure(url, error)
+            else:
+                results[url] = store.add(url, *fetched)
+
+    return results
+
+
+def draft_source_urls(draft_path):
+    """URLs cited in a draft's body and frontmatter `sources`"""
+    draft = load_markdown(draft_path)
+    frontmatter = parse_frontmatter(draft['frontmatter'])
+    urls = [u for u in frontmatter.get('sources') or [] if isinstance(u, str)]
+    urls.extend(url for _, url in CitationIndex(draft['body']).urls)
+    return list(dict.fromkeys(urls))
+
+
+def run_snapshot(draft_path=None, urls=None, refresh=False):
+    """Snapshot the sources cited by a draft and/or explicit URLs"""
+    print_section("SOURCE SNAPSHOTS")
+
+    targets = list(urls or [])
+    if draft_path:
+        try:
+            targets.extend(draft_source_urls(draft_path))
+        except Exception as e:
+            print_error(f"Could not load draft: {e}")
+            return
+    targets = list(dict.fromkeys(targets))
+
+    if not targets:
+        print_warning("No URLs to snapshot")
+        return
+
+    print_info(f"Snapshotting {len(targets)} URLs...")
+    results = snapshot_urls(targets, refresh=refresh)
+
+    ok = [r for r in results.values() if r.get('sha256')]
+    for url, record in results.items():
+        if record.get('refresh_error'):
+            print_warning(f"{url}: {record['refresh_error']} (kept snapshot from {record.get('fetched_at', '?')[:10]})")
+        elif record.get('truncated'):
+            print_warning(f"{url} ({record.get('text_chars', 0)} chars, truncated at {MAX_PAGE_BYTES} bytes)")
+        elif record.get('sha256'):
+            print_success(f"{url} ({record.get('text_chars', 0)} chars)")
+        else:
+            print_error(f"{url}: {record.get('error', 'fetch failed')}")
+
+    print()
+    print_info(f"{len(ok)}/{len(results)} sources stored in {SNAPSHOT_DIR}/")
@@ -0,0 +1,191 @@
+"""
+Social Drafts
+One short LLM call per channel, run in parallel, each validated and
+retried on its own, with results cached by post content hash
+"""
+import hashlib
+import json
+import anthropic
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from agents.model_router import routed_call
+from agents.prompt_budget import PromptBudget
+from agents.utils import (
+    get_anthropic_client,
+    load_json,
+    save_json,
+    print_warning
+)
+
+
+CACHE_DIR = 'data/cache/social'
+
+# Bump when prompts or validation change so cached drafts are regenerated
+PROMPT_VERSION = 2
+
+MAX_ATTEMPTS = 3
+# Tokens kept free for "previous answer was rejected (...)" on a retry
+RETRY_NOTE_TOKENS = 100
+
+FAILED_TEXT = "Draft generation failed"
+
+# kind 'text' returns {"text": "..."}, kind 'list' returns {"items": [...]}
+CHANNELS = {
+    'linkedin_a': {
+        'kind': 'text',
+        'instructions': "A LinkedIn post (Variant A): professional, insight-focused, 200-250 words. "
+                        "Professional tone, cite data, thought-provoking.",
+        'words': (150, 320),
+        'max_tokens': 700
+    },
+    'linkedin_b': {
+        'kind': 'text',
+        'instructions': "A LinkedIn post (Variant B): question/hook-driven, 150-200 words. "
+                        "Open with a question that makes practitioners stop scrolling.",
+        'words': (100, 260),
+        'max_tokens': 600
+    },
+    'x_thread': {
+        'kind': 'list',
+        'instructions': "An X thread of 5-7 tweets: punchy, technical, data-driven. "
+                        "Each tweet under 280 characters.",
+        'items': (5, 7),
+        'max_chars': 280,
+        'max_tokens': 900
+    },
+    'community_prompts': {
+        'kind': 'list',
+        'instructions': "3 community discussion prompts: open-ended questions that invite expertise.",
+        'items': (3, 3),
+        'max_tokens': 400
+    }
+}
+
+
+def content_hash(body, frontmatter):
+    """Cache key for a post: title, description and body"""
+    key = json.dumps([PROMPT_VERSION, frontmatter.get('title', ''), frontmatter.get('description', ''), body])
+    return hashlib.sha256(key.encode()).hexdigest()[:24]
+
+
+def build_prompt(spec, title, description, excerpt):
+    shape = '{"text": "..."}' if spec['kind'] == 'text' else '{"items": ["...", "..."]}'
+    return f"""Write social media copy for this article.
+
+TITLE: {title}
+
+DESCRIPTION: {description}
+
+BODY EXCERPT:
+{excerpt}
+
+Write: {spec['instructions']}
+
+Return only JSON: {shape}"""
+
+
+def validate(spec, result):
+    """The channel's value if result is well-formed, else raise ValueError"""
+    if spec['kind'] == 'text':
+        text = result.get('text') if isinstance(result, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("missing text")
+        low, high = spec['words']
+        words = len(text.split())
+        if not low <= words <= high:
+            raise ValueError(f"{words} words, expected {low}-{high}")
+        return text.strip()
+
+    items = result.get('items') if isinstance(result, dict) else None
+    if not isinstance(items, list) or not all(isinstance(i, str) and i.strip() for i in items):
+        raise ValueError("missing items")
+    low, high = spec['items']
+    if not low <= len(items) <= high:
+        raise ValueError(f"{len(items)} items, expected {low}-{high}")
+    too_long = [i for i in items if len(i) > spec.get('max_chars', float('inf'))]
+    if too_long:
+        raise ValueError(f"{len(too_long)} items over {spec['max_chars']} characters")
+    return [i.strip() for i in items]
+
+
+def generate_channel(client, channel, title, description, body):
+    """Generate one channel, retrying on parse or validation failure"""
+    spec = CHANNELS[channel]
+    # The body excerpt gets whatever the instructions and a retry note leave
+    budget = PromptBudget('social_channel')
+    budget.reserve(build_prompt(spec, title, description, ''))
+    budget.reserve(RETRY_NOTE_TOKENS)
+    prompt = build_prompt(spec, title, description, budget.text('excerpt', body))
+    error = None
+
+    for _ in range(MAX_ATTEMPTS):
+        messages = [{"role": "user", "content": prompt}]
+        if error:
+            messages[0]["content"] += f"\n\nYour previous answer was rejected ({error}). Fix that."
+
+        try:
+            result_text, _ = routed_call(
+                client, 'social_channel',
+                messages=messages,
+                max_tokens=spec['max_tokens'],
+                temperature=0.7,
+                budget=budget
+            )
+        except anthropic.APIError as e:
+            error = f"API error: {e}"
+            continue
+
+        try:
+            start = result_text.find('{')
+            end = result_text.rfind('}') + 1
+            if start == -1 or end <= start:
+                raise ValueError("no JSON object")
+            return validate(spec, json.loads(result_text[start:end])), None
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            error = str(e)
+
+    return None, error
+
+
+def generate_social_drafts(body, frontmatter, cache_dir=CACHE_DIR):
+    """
+    Generate social media drafts, one parallel call per channel
+
+    Channels already cached for this exact content are reused; a channel
+    that still fails after MAX_ATTEMPTS gets a placeholder and is listed
+    under 'failed_channels' without affecting the others.
+    """
+    title = frontmatter.get('title', 'Untitled')
+    description = frontmatter.get('description', '')
+
+    cache_path = Path(cache_dir) / f"{content_hash(body, frontmatter)}.json"
+    cached = load_json(cache_path) if cache_path.exists() else {}
+    missing = [c for c in CHANNELS if c not in cached]
+
+    results = dict(cached)
+    errors = {}
+    if missing:
+        client = get_anthropic_client()
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            outcomes = pool.map(lambda c: generate_channel(client, c, title, description, body), missing)
+            for channel, (value, error) in zip(missing, outcomes):
+                if value is None:
+                    errors[channel] = error
+                else:
+                    results[channel] = value
+
+        # Cache only validated channels, so failures are retried next run
+        if len(results) > len(cached):
+            save_json({c: results[c] for c in CHANNELS if c in results}, cache_path)
+
+    drafts = {}
+    for channel, spec in CHANNELS.items():
+        if channel in results:
+            drafts[channel] = results[channel]
+        else:
+            drafts[channel] = FAILED_TEXT if spec['kind'] == 'text' else []
+    if errors:
+        for channel, error in errors.items():
+            print_warning(f"Social draft '{channel}' failed: {error}")
+        drafts['failed_channels'] = sorted(errors)
+    return drafts
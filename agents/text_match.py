@@ -0,0 +1,167 @@
+"""
+Multi-pattern phrase matching (Aho-Corasick)
+Finds every occurrence of a large phrase set in one linear pass over the text
+"""
+from bisect import bisect_right
+from collections import deque
+
+
+def fold_case(text):
+    """Lowercase text without changing its length, so offsets stay valid"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over case-folded phrases
+
+    Add phrases with an optional payload, then call find_all(). Each phrase
+    may carry several payloads (e.g. a term that names two pages).
+    """
+
+    def __init__(self, phrases=None):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._built = False
+        self.payloads = {}
+        for phrase in phrases or ():
+            self.add(phrase)
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def __contains__(self, phrase):
+        return ' '.join(fold_case(phrase).split()) in self.payloads
+
+    def add(self, phrase, payload=None):
+        """Add a phrase; whitespace is normalized and matching is case-insensitive"""
+        key = ' '.join(fold_case(phrase).split())
+        if not key:
+            return
+        if key not in self.payloads:
+            self.payloads[key] = []
+            node = 0
+            for ch in key:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = (key,)
+            self._built = False
+        if payload is not None:
+            self.payloads[key].append(payload)
+
+    def build(self):
+        """Compute failure links (breadth-first over the trie)"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+        self._built = True
+        return self
+
+    def iter_matches(self, text, whole_words=True):
+        """
+        Yield (start, end, phrase) for every occurrence, overlapping included
+
+        Runs of whitespace in the text match the single spaces in phrases.
+        """
+        if not self._built:
+            self.build()
+
+        folded = fold_case(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        prev_space = False
+        # Map positions in the whitespace-collapsed stream back to the text
+        starts = []
+
+        for i, ch in enumerate(folded):
+            if ch.isspace():
+                if prev_space:
+                    continue
+                ch = ' '
+                prev_space = True
+            else:
+                prev_space = False
+            starts.append(i)
+
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            for phrase in out[node]:
+                start = starts[len(starts) - len(phrase)]
+                end = i + 1
+                if whole_words:
+                    if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                        continue
+                    if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                        continue
+                yield start, end, phrase
+
+    def find_all(self, text, whole_words=True, overlapping=False):
+        """
+        Return matches as dicts with start, end, text, phrase and payloads
+
+        By default overlapping matches are resolved leftmost-longest, so
+        "tail latency" wins over "latency" at the same position.
+        """
+        matches = sorted(
+            self.iter_matches(text, whole_words),
+            key=lambda m: (m[0], -(m[1] - m[0]))
+        )
+        results = []
+        last_end = -1
+        for start, end, phrase in matches:
+            if not overlapping and start < last_end:
+                continue
+            results.append({
+                'start': start,
+                'end': end,
+                'text': text[start:end],
+                'phrase': phrase,
+                'payloads': self.payloads[phrase]
+            })
+            last_end = max(last_end, end)
+        return results
+
+
+class LineIndex:
+    """Map character offsets to 1-based (line, column) by binary search"""
+
+    def __init__(self, text):
+        self.starts = [0]
+        pos = text.find('\n')
+        while pos != -1:
+            self.starts.append(pos + 1)
+            pos = text.find('\n', pos + 1)
+
+    def locate(self, offset):
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
@@ -3,9 +3,18 @@ Shared utilities for TernQED agents
 """
 import os
 import json
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 import anthropic
+import yaml
+from agents.profiling import trace_client, mark_stage
+
+try:
+    import orjson
+except ImportError:  # Optional fast serializer
+    orjson = None
 
 
 def load_env():
@@ -34,12 +43,23 @@ def load_env():
 load_env()
 
 
+_clients = {}
+
+
 def get_anthropic_client():
-    """Get configured Anthropic API client"""
+    """
+    Get configured Anthropic API client
+
+    Clients share one connection pool per API key, so repeated calls (and
+    every command served by the daemon) reuse open connections.
+    """
     api_key = os.getenv('ANTHROPIC_API_KEY')
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-    return anthropic.Anthropic(api_key=api_key)
+    if api_key not in _clients:
+        _clients[api_key] = anthropic.Anthropic(api_key=api_key)
+    # A fresh wrapper per caller keeps trace_client from patching the shared client
+    return trace_client(_clients[api_key].with_options())
 
 
 def load_json(filepath):
@@ -48,14 +68,93 @@ def load_json(filepath):
         return json.load(f)
 
 
-def save_json(data, filepath):
-    """Save JSON file"""
+@contextmanager
+def atomic_write(filepath, mode='w'):
+    """
+    Open a temp file next to filepath and rename it into place on success.
+
+    Readers never see a half-written file: they get either the old content
+    or the new content. On error the temp file is removed and the target
+    is left untouched.
+    """
+    target = Path(filepath)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix='.tmp')
+    try:
+        # mkstemp creates 0600 files; keep the permissions a plain open() would give
+        os.chmod(tmp_path, target.stat().st_mode & 0o777 if target.exists() else 0o644)
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def save_json(data, filepath, compact=False):
+    """
+    Save JSON file atomically
+
+    compact=True skips indentation and uses orjson when it is installed.
+    Output is streamed to the temp file rather than built as one string.
+    """
+    if compact and orjson is not None:
+        with atomic_write(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, default=str))
+        return filepath
+
+    with atomic_write(filepath) as f:
+        if compact:
+            json.dump(data, f, separators=(',', ':'), default=str)
+        else:
+            json.dump(data, f, indent=2)
+    return filepath
+
+
+def append_jsonl(records, filepath):
+    """
+    Append records to a JSONL file, one compact JSON object per line
+
+    Each record is written with a single O_APPEND write so concurrent
+    writers never interleave partial lines.
+    """
+    if isinstance(records, dict):
+        records = [records]
+
     Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+    fd = os.open(filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        for record in records:
+            if orjson is not None:
+                line = orjson.dumps(record, default=str) + b'\n'
+            else:
+                line = (json.dumps(record, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+            os.write(fd, line)
+    finally:
+        os.close(fd)
     return filepath
 
 
+def load_jsonl(filepath):
+    """Iterate records from a JSONL file, skipping a torn trailing line"""
+    if not Path(filepath).exists():
+        return
+    with open(filepath, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
 def load_markdown(filepath):
     """Load markdown file with frontmatter parsing"""
     with open(filepath, 'r') as f:
@@ -72,10 +171,33 @@ def load_markdown(filepath):
     return {'frontmatter': '', 'body': content, 'full': content}
 
 
+# libyaml's C loader is an order of magnitude faster than the pure-Python one
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def parse_frontmatter(frontmatter):
+    """
+    Parse a raw frontmatter string into a dict
+
+    Returns {} for empty or invalid YAML. Dates are returned as ISO strings
+    so the result round-trips through JSON caches unchanged.
+    """
+    if not frontmatter:
+        return {}
+    try:
+        data = yaml.load(frontmatter, Loader=YAML_LOADER)
+    except yaml.YAMLError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        key: value.isoformat() if hasattr(value, 'isoformat') else value
+        for key, value in data.items()
+    }
+
+
 def save_markdown(filepath, frontmatter_dict, body):
     """Save markdown file with frontmatter"""
-    import yaml
-
     Path(filepath).parent.mkdir(parents=True, exist_ok=True)
 
     frontmatter_str = yaml.dump(frontmatter_dict, default_flow_style=False, sort_keys=False)
@@ -87,19 +209,25 @@ def save_markdown(filepath, frontmatter_dict, body):
 {body.strip()}
 """
 
-    with open(filepath, 'w') as f:
+    with atomic_write(filepath) as f:
         f.write(full_content)
 
     return filepath
 
 
+def estimate_tokens(text):
+    """Rough local token count (~4 characters per token for English prose)"""
+    return (len(text) + 3) // 4
+
+
 def get_date_slug():
     """Get current date slug for filenames"""
     return datetime.now().strftime('%Y-%m-%d')
 
 
 def print_section(title):
-    """Print formatted section header"""
+    """Print formatted section header (also a stage boundary when profiling)"""
+    mark_stage(title)
     print(f"\n{'='*70}")
     print(f"{title}")
     print(f"{'='*70}\n")
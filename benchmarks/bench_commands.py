@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end run.py commands against a local fake Anthropic API
+
+Builds a synthetic workspace (N intake briefs, a draft with M claims),
+starts benchmarks/fake_anthropic.py in-process, and runs each command as a
+subprocess in the workspace. Records wall time, LLM calls, tokens, 429s,
+peak concurrency and peak RSS per command, and saves the results under
+benchmarks/results/ tagged with the current commit.
+
+Usage:
+    python3 benchmarks/bench_commands.py [--briefs 500] [--claims 30] [--repeat 3]
+        [--commands gate,finalize] [--latency lognormal:0.05,0.3] [--tps 0]
+        [--rate-limit 0.0] [--rpm 0] [--compare last|PATH]
+
+Every run starts from a freshly generated workspace, so caches are cold.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import build_workspace  # noqa: E402
+from fake_anthropic import add_server_args, fake_from_args, start_server  # noqa: E402
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+ASSIST_SCRIPT = """find source: queue position value
+draft: a paragraph on jitter and inventory risk
+verify: Tail latency costs 12 bps per trade
+suggest links
+quit
+"""
+
+
+def command_args(name, paths):
+    """(argv after run.py, stdin text) for each benchmarked command"""
+    draft = str(paths['draft'])
+    research = str(paths['research'])
+    return {
+        'research': (['research', '--topic', 'tail latency in arbitrage', '--min-sources', '1'], None),
+        'gate': (['gate', '--draft', draft], None),
+        'finalize': (['finalize', '--draft', draft, '--no-pr'], None),
+        'assist': (['assist', '--research', research, '--draft', draft], ASSIST_SCRIPT),
+        'lab': (['lab'], None),
+        'feed': (['feed'], None),
+        'scan': (['scan'], None),
+    }[name]
+
+
+COMMANDS = ('research', 'gate', 'finalize', 'assist', 'lab', 'feed', 'scan')
+
+
+def run_command(argv, stdin_text, workspace, base_url, log_path):
+    """Run one command; returns (wall seconds, peak RSS in MB, exit code)"""
+    env = dict(os.environ, ANTHROPIC_API_KEY='bench', ANTHROPIC_BASE_URL=base_url, PYTHONHASHSEED='0')
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / 'run.py')] + argv,
+            cwd=workspace, env=env, stdin=subprocess.PIPE, stdout=log, stderr=subprocess.STDOUT
+        )
+        if stdin_text:
+            proc.stdin.write(stdin_text.encode())
+        proc.stdin.close()
+        # wait4 gives this child's own rusage (ru_maxrss is in KB on Linux)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return wall, usage.ru_maxrss / 1024, proc.returncode
+
+
+def git_revision():
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True)
+        return result.stdout.strip()
+    return git('rev-parse', '--short', 'HEAD') or 'unknown', bool(git('status', '--porcelain', '--untracked-files=no'))
+
+
+def summarize(runs):
+    walls = [r['wall_s'] for r in runs]
+    last = runs[-1]
+    return {
+        'wall_s_median': round(statistics.median(walls), 3),
+        'wall_s_min': round(min(walls), 3),
+        'wall_s_max': round(max(walls), 3),
+        'calls': last['calls'],
+        'input_tokens': last['input_tokens'],
+        'output_tokens': last['output_tokens'],
+        'rate_limited': last['rate_limited'],
+        'max_in_flight': max(r['max_in_flight'] for r in runs),
+        'peak_rss_mb': round(max(r['peak_rss_mb'] for r in runs), 1),
+        'exit_codes': sorted({r['exit_code'] for r in runs}),
+        'runs': runs
+    }
+
+
+def load_baseline(compare, current_path=None):
+    if compare == 'last':
+        candidates = sorted(p for p in RESULTS_DIR.glob('*.json') if p != current_path)
+        return (json.loads(candidates[-1].read_text()), candidates[-1]) if candidates else (None, None)
+    path = Path(compare)
+    return json.loads(path.read_text()), path
+
+
+def _delta(new, old):
+    if not old:
+        return ''
+    return f" ({(new - old) / old * 100:+.0f}%)"
+
+
+def print_report(report, baseline=None):
+    base = (baseline or {}).get('results', {})
+    print(f"\n{'command':<10} {'wall s':>16} {'calls':>12} {'in tok':>16} {'out tok':>14} {'429s':>5} {'peak MB':>14}")
+    for name, r in report['results'].items():
+        b = base.get(name, {})
+        print(f"{name:<10} "
+              f"{r['wall_s_median']:>9.2f}{_delta(r['wall_s_median'], b.get('wall_s_median')):>7} "
+              f"{r['calls']:>5}{_delta(r['calls'], b.get('calls')):>7} "
+              f"{r['input_tokens']:>9}{_delta(r['input_tokens'], b.get('input_tokens')):>7} "
+              f"{r['output_tokens']:>7}{_delta(r['output_tokens'], b.get('output_tokens')):>7} "
+              f"{r['rate_limited']:>5} "
+              f"{r['peak_rss_mb']:>7.1f}{_delta(r['peak_rss_mb'], b.get('peak_rss_mb')):>7}"
+              + ('  EXIT ' + ','.join(map(str, r['exit_codes'])) if r['exit_codes'] != [0] else ''))
+    if baseline:
+        print(f"\nDeltas vs {baseline.get('commit')} ({baseline.get('timestamp')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end run.py benchmarks against a fake LLM')
+    parser.add_argument('--briefs', type=int, default=500, help='Synthetic intake briefs')
+    parser.add_argument('--claims', type=int, default=30, help='Claims in the synthetic draft')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--commands', default=','.join(COMMANDS), help='Comma-separated commands')
+    parser.add_argument('--compare', help="Baseline results file, or 'last'")
+    parser.add_argument('--no-save', action='store_true', help="Don't write a results file")
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    commands = [c.strip() for c in args.commands.split(',') if c.strip()]
+    unknown = [c for c in commands if c not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown commands: {', '.join(unknown)}")
+
+    fake = fake_from_args(args)
+    server, base_url = start_server(fake)
+    commit, dirty = git_revision()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='ternqed-bench-') as tmp:
+        workspace = Path(tmp) / 'ws'
+        for name in commands:
+            runs = []
+            for i in range(args.repeat):
+                paths = build_workspace(workspace, REPO_ROOT, args.briefs, args.claims, seed=args.seed)
+                argv, stdin_text = command_args(name, {k: p.relative_to(workspace) for k, p in paths.items()})
+                fake.reset()
+                wall, rss, code = run_command(argv, stdin_text, workspace, base_url, Path(tmp) / f"{name}-{i}.log")
+                with fake.lock:
+                    stats = dict(fake.stats)
+                runs.append({
+                    'wall_s': round(wall, 3), 'peak_rss_mb': round(rss, 1), 'exit_code': code,
+                    'calls': stats['calls'], 'input_tokens': stats['input_tokens'],
+                    'output_tokens': stats['output_tokens'], 'rate_limited': stats['rate_limited'],
+                    'max_in_flight': stats['max_in_flight'], 'models': stats['models']
+                })
+                if code != 0:
+                    print(f"{name} run {i + 1} exited {code}; log tail:")
+                    print(''.join((Path(tmp) / f"{name}-{i}.log").read_text().splitlines(True)[-15:]))
+            results[name] = summarize(runs)
+            print(f"  {name}: {results[name]['wall_s_median']:.2f}s, {results[name]['calls']} calls")
+    server.shutdown()
+
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'briefs': args.briefs, 'claims': args.claims, 'repeat': args.repeat,
+            'latency': args.latency, 'tps': args.tps, 'rate_limit': args.rate_limit,
+            'rpm': args.rpm, 'seed': args.seed, 'python': sys.version.split()[0]
+        },
+        'results': results
+    }
+
+    out_path = None
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out_path = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{commit}{'-dirty' if dirty else ''}.json"
+        out_path.write_text(json.dumps(report, indent=2))
+
+    baseline = None
+    if args.compare:
+        baseline, baseline_path = load_baseline(args.compare, out_path)
+        if baseline and baseline.get('config', {}).get('briefs') != args.briefs:
+            print(f"Note: baseline {baseline_path} used a different corpus size")
+
+    print_report(report, baseline)
+    if out_path:
+        print(f"\nSaved: {out_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory and load time for recent intake
+
+Writes N synthetic briefs (benchmarks/corpus.py) across D daily intake
+files, then loads them in a fresh subprocess per loader. Each subprocess
+also does the work research prep does on them: brief ids for ranking and
+the prompt text for the top 50.
+
+    dicts    list of the dicts json.load returns (the previous loader)
+    compact  agents.intake_store.load_recent_intake (__slots__ records,
+             interned strings)
+
+Peak RSS is measured after imports and again after loading, so the
+difference is the intake itself.
+
+Usage:
+    python3 benchmarks/bench_intake_memory.py [--briefs 100000] [--days 30] [--repeat 3]
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import write_intake  # noqa: E402
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LOADERS = ('dicts', 'compact')
+PROMPT_BRIEFS = 50
+
+
+def load_dicts(intake_dir, days):
+    """The loader research_prep used before intake_store: plain dicts"""
+    from datetime import datetime, timedelta
+    cutoff = datetime.now() - timedelta(days=days)
+    briefs = []
+    for file in sorted(Path(intake_dir).glob('*.json'), reverse=True):
+        with open(file) as f:
+            data = json.load(f)
+        date_str = data.get('date', '')
+        if date_str and datetime.fromisoformat(date_str.split('T')[0]) >= cutoff:
+            briefs.extend(data['briefs'] if 'briefs' in data else [data])
+    return briefs
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(loader, intake_dir, days):
+    """Runs in the subprocess: load, touch every brief, report as JSON"""
+    sys.path.insert(0, str(REPO_ROOT))
+    from agents.embeddings import brief_id
+    from agents.intake_store import load_recent_intake
+
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    if loader == 'dicts':
+        briefs = load_dicts(intake_dir, days)
+    else:
+        briefs = load_recent_intake(days, intake_dir)
+    load_s = time.perf_counter() - start
+
+    ids = [brief_id(b) for b in briefs]
+    prompt = "\n\n".join(
+        f"Source: {b.get('title', 'Unknown')}\nURL: {b.get('url', '')}\nSummary: {b.get('summary', '')}"
+        for b in briefs[:PROMPT_BRIEFS]
+    )
+    total_s = time.perf_counter() - start
+    print(json.dumps({
+        'briefs': len(briefs),
+        'ids': len(ids),
+        'prompt_chars': len(prompt),
+        'load_s': round(load_s, 3),
+        'total_s': round(total_s, 3),
+        'baseline_mb': round(before, 1),
+        'peak_mb': round(peak_rss_mb(), 1)
+    }))
+
+
+def run_worker(loader, intake_dir, days):
+    result = subprocess.run(
+        [sys.executable, __file__, '--worker', loader, '--intake', str(intake_dir), '--days', str(days)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak RSS of loading recent intake')
+    parser.add_argument('--briefs', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=30, help='Daily files to spread briefs over (and load)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--worker', choices=LOADERS, help=argparse.SUPPRESS)
+    parser.add_argument('--intake', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.intake, args.days)
+        return
+
+    with tempfile.TemporaryDirectory(prefix='ternqed-intake-') as tmp:
+        written = write_intake(tmp, args.briefs, days=args.days)
+        intake_dir = Path(tmp) / 'data' / 'intake'
+        size_mb = sum(p.stat().st_size for p in intake_dir.glob('*.json')) / 1e6
+        print(f"{written} briefs in {args.days} files ({size_mb:.1f} MB of JSON)\n")
+
+        print(f"{'loader':<8} {'briefs':>8} {'load s':>8} {'total s':>8} {'intake MB':>10} {'peak MB':>8}")
+        for loader in LOADERS:
+            runs = [run_worker(loader, intake_dir, args.days) for _ in range(args.repeat)]
+            last = runs[-1]
+            print(f"{loader:<8} {last['briefs']:>8} "
+                  f"{statistics.median(r['load_s'] for r in runs):>8.2f} "
+                  f"{statistics.median(r['total_s'] for r in runs):>8.2f} "
+                  f"{max(r['peak_mb'] - r['baseline_mb'] for r in runs):>10.1f} "
+                  f"{max(r['peak_mb'] for r in runs):>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: risky-content scanning over the whole content/ tree
+
+Compares the old approach (one re.search per pattern, first match only)
+with RiskScanner (each rule precompiled, every match, with locations).
+
+Usage:
+    python3 benchmarks/bench_risky_scan.py [--repeat 200] [--scale 1]
+
+--scale N repeats each file's body N times to simulate a larger site.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.content_index import get_content_index, split_frontmatter  # noqa: E402
+from agents.risk_scan import RiskScanner  # noqa: E402
+
+
+def load_bodies(content_dir, scale):
+    bodies = []
+    for entry in get_content_index(content_dir).pages(include_index=True):
+        with open(entry['path']) as f:
+            _, body = split_frontmatter(f.read())
+        bodies.append('\n'.join([body] * scale))
+    return bodies
+
+
+def legacy_scan(text, rules):
+    """The pre-scanner check_risky_content loop"""
+    hits = []
+    for rule in rules:
+        if re.search(rule['pattern'], text, re.IGNORECASE):
+            hits.append(rule['id'])
+    return hits
+
+
+def timed(fn, bodies, repeat):
+    start = time.perf_counter()
+    total = 0
+    for _ in range(repeat):
+        for body in bodies:
+            total += len(fn(body))
+    return time.perf_counter() - start, total // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--content', default='content')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--scale', type=int, default=1)
+    args = parser.parse_args()
+
+    bodies = load_bodies(args.content, args.scale)
+    size_kb = sum(len(b) for b in bodies) / 1024
+    scanner = RiskScanner.from_config()
+    rules = [rule for rule, _ in scanner.rules]
+
+    legacy_time, legacy_hits = timed(lambda t: legacy_scan(t, rules), bodies, args.repeat)
+    scan_time, scan_hits = timed(scanner.scan, bodies, args.repeat)
+
+    print(f"Corpus: {len(bodies)} files, {size_kb:.0f} KB, {len(rules)} rules, {args.repeat} passes")
+    print(f"{'approach':<28}{'ms/site':>10}{'MB/s':>10}{'findings':>10}")
+    for name, elapsed, hits in [
+        ('per-pattern re.search', legacy_time, legacy_hits),
+        ('RiskScanner (all matches)', scan_time, scan_hits),
+    ]:
+        per_site = elapsed / args.repeat
+        print(f"{name:<28}{per_site * 1000:>10.2f}{size_kb / 1024 / per_site:>10.1f}{hits:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Synthetic corpora for the end-to-end benchmarks
+
+Builds a throwaway workspace that looks like the repo's data/ and content/
+trees: N intake briefs spread over recent days, a research JSON, and a
+draft post with M cited quantitative claims. Everything is seeded, so the
+same arguments always produce the same files.
+"""
+import json
+import random
+import shutil
+from datetime import date, timedelta
+from pathlib import Path
+
+
+DOMAINS = ['HFT', 'market microstructure', 'MEV', 'information theory', 'distributed systems', 'FPGA']
+SUBJECTS = ['tail latency', 'queue position', 'jitter', 'adverse selection', 'inventory risk',
+            'cross-venue arbitrage', 'matching engine', 'price-time priority']
+VENUES = ['Nasdaq', 'CME', 'Binance', 'Coinbase', 'Eurex', 'Arbitrum']
+
+DRAFT_SLUG = 'bench-draft'
+
+
+def _brief(rng, i):
+    subject = rng.choice(SUBJECTS)
+    venue = rng.choice(VENUES)
+    return {
+        'title': f"{venue} study {i}: {subject} costs {rng.randint(1, 90)} bps",
+        'url': f"https://example.com/{venue.lower()}/{i}",
+        'summary': (f"Measurements at {venue} show {subject} of {rng.randint(2, 900)} microseconds "
+                    f"changes fill rates by {rng.randint(1, 40)}%. The effect concentrates in "
+                    f"volatile periods when spreads widen."),
+        'domains': rng.sample(DOMAINS, 2)
+    }
+
+
+def write_intake(root, n_briefs, days=7, seed=0):
+    """n_briefs briefs across `days` daily intake files ending today"""
+    rng = random.Random(seed)
+    intake_dir = Path(root) / 'data' / 'intake'
+    intake_dir.mkdir(parents=True, exist_ok=True)
+    per_day = -(-n_briefs // days)
+    written = 0
+    for d in range(days):
+        day = date.today() - timedelta(days=d)
+        count = min(per_day, n_briefs - written)
+        if count <= 0:
+            break
+        briefs = [_brief(rng, written + i) for i in range(count)]
+        written += count
+        with open(intake_dir / f"{day.isoformat()}.json", 'w') as f:
+            json.dump({'date': day.isoformat(), 'sources_processed': count, 'briefs': briefs}, f)
+    return written
+
+
+def write_research(root, n_sources, n_claims, seed=0):
+    """A research summary JSON like research_prep writes; returns its path"""
+    rng = random.Random(seed)
+    sources = [_brief(rng, i) for i in range(n_sources)]
+    research = {
+        'topic': 'tail latency in arbitrage',
+        'generated_at': date.today().isoformat(),
+        'total_sources_analyzed': n_sources,
+        'relevant_sources': [
+            {'url': s['url'], 'title': s['title'], 'relevance_score': round(rng.random(), 2),
+             'key_claims': [s['summary'].split('.')[0]]}
+            for s in sources
+        ],
+        'extracted_claims': [
+            {'claim_text': sources[i % n_sources]['summary'].split('.')[0],
+             'source_url': sources[i % n_sources]['url'],
+             'evidence_snippet': sources[i % n_sources]['summary'],
+             'confidence': rng.choice(['high', 'medium', 'low'])}
+            for i in range(n_claims)
+        ],
+        'open_questions': ['Does jitter matter more than mean latency?'],
+        'synthesis_suggestions': 'Tail latency decides queue position.'
+    }
+    path = Path(root) / 'data' / 'research' / f"{date.today().isoformat()}-bench.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(research, f)
+    return path
+
+
+def write_draft(root, m_claims, seed=0, cited_share=0.8):
+    """A draft with m_claims quantitative sentences, most with a nearby URL"""
+    rng = random.Random(seed)
+    paragraphs = []
+    sources = []
+    for i in range(m_claims):
+        brief = _brief(rng, i)
+        sentence = (f"At {rng.choice(VENUES)}, {rng.choice(SUBJECTS)} of {rng.randint(2, 900)} "
+                    f"microseconds shifts fill probability by {rng.randint(1, 40)}%.")
+        if rng.random() < cited_share:
+            sentence += f" ([source]({brief['url']}))"
+            sources.append(brief['url'])
+        filler = "Traders who ignore this tend to overpay for speed they cannot use."
+        paragraphs.append(f"{sentence} {filler}")
+
+    body = "# Benchmark Draft\n\n" + "\n\n".join(
+        (f"## Section {i // 5 + 1}\n\n" if i % 5 == 0 else '') + p for i, p in enumerate(paragraphs)
+    )
+    path = Path(root) / 'content' / 'posts' / f"{DRAFT_SLUG}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(f"---\ntitle: Benchmark Draft\ndate: {date.today().isoformat()}\ndraft: true\n---\n\n{body}\n")
+    return path
+
+
+def build_workspace(root, repo_root, n_briefs, m_claims, seed=0):
+    """
+    Fresh workspace: the repo's content/ plus synthetic intake, research
+    and a draft. Returns {'draft': path, 'research': path}.
+    """
+    root = Path(root)
+    if root.exists():
+        shutil.rmtree(root)
+    shutil.copytree(Path(repo_root) / 'content', root / 'content')
+    write_intake(root, n_briefs, seed=seed)
+    research = write_research(root, max(1, min(n_briefs, 200)), max(1, m_claims * 2), seed=seed)
+    draft = write_draft(root, m_claims, seed=seed)
+    return {'draft': draft, 'research': research}
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Deterministic local stand-in for the Anthropic Messages API
+
+Serves POST /v1/messages with canned responses shaped for each agent
+prompt, after a simulated delay (a latency sample plus output tokens at a
+fixed throughput). Rate limits can be injected as HTTP 429s with a
+retry-after header, which the SDK retries like the real thing.
+
+The SDK reads ANTHROPIC_BASE_URL, so agents need no changes:
+
+    python3 benchmarks/fake_anthropic.py --port 8765 --latency lognormal:0.8,0.5 &
+    ANTHROPIC_API_KEY=fake ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python3 run.py gate --draft ...
+
+GET /stats returns call, token and 429 counts; POST /reset clears them.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+URL_PATTERN = re.compile(r'https?://[^\s)\]"\'<>,]+')
+
+
+def parse_latency(spec):
+    """
+    Latency distribution from a spec string, as a function rng -> seconds
+
+    fixed:0.5 | uniform:0.2,1.5 | lognormal:MEDIAN,SIGMA
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(',') if v]
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def _section(prompt, header):
+    """Text after a 'HEADER:' line up to the next blank-line-separated ALLCAPS header"""
+    start = prompt.find(header)
+    if start == -1:
+        return ''
+    rest = prompt[start + len(header):]
+    end = re.search(r'\n\n[A-Z][A-Z ()]+:', rest)
+    return rest[:end.start()] if end else rest
+
+
+def _words(n):
+    return ' '.join(['latency'] * n)
+
+
+# Canned responses: (marker in prompt, function prompt -> response text)
+
+def respond_extract_claims(prompt):
+    draft = _section(prompt, 'DRAFT:').split('\n\nFor each claim')[0]
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', draft) if re.search(r'\d', URL_PATTERN.sub('', s))]
+    claims = [
+        {"claim_id": i, "claim_text": s, "needs_evidence": True,
+         "implied_confidence": "high" if i % 3 == 0 else "medium"}
+        for i, s in enumerate(sentences, 1)
+    ]
+    return json.dumps(claims)
+
+
+def respond_verify(prompt):
+    urls = URL_PATTERN.findall(_section(prompt, 'CITED URLS NEARBY:'))
+    status = 'pass' if urls else 'warning'
+    return json.dumps({
+        "status": status,
+        "reason": "Cited source supports the claim" if urls else "No citation near the claim",
+        "evidence_urls": urls,
+        "confidence_assessment": "appropriate",
+        "suggested_revision": ""
+    })
+
+
+def respond_research(prompt):
+    urls = list(dict.fromkeys(URL_PATTERN.findall(prompt)))
+    return json.dumps({
+        "relevant_sources": [
+            {"url": u, "title": f"Source {i}", "relevance_score": 0.5 + (i % 5) / 10,
+             "key_claims": [f"Latency of {i} microseconds matters"]}
+            for i, u in enumerate(urls)
+        ],
+        "extracted_claims": [
+            {"claim_text": f"Queue position {i} is worth {i * 3} basis points", "source_url": u,
+             "evidence_snippet": f"measured {i * 3} bps", "confidence": ["high", "medium", "low"][i % 3]}
+            for i, u in enumerate(urls)
+        ],
+        "mechanisms": {"queue priority": []},
+        "market_contrasts": {"equities": [], "crypto": [], "both": []},
+        "open_questions": ["How does jitter compound across hops?"],
+        "synthesis_suggestions": "Tail latency, not the mean, decides queue position."
+    })
+
+
+FRONTMATTER_ANSWERS = {
+    'title': 'Benchmark Draft',
+    'markets': '[both]',
+    'mechanisms': '[1, 6]',
+    'latency_budget': '[jitter]',
+    'mean_vs_tail': 'tail',
+    'status': 'working-notes',
+    'confidence': 'medium',
+}
+
+
+def respond_frontmatter(prompt):
+    """Answer only the fields the prompt lists under 'exactly these fields'"""
+    wanted = re.findall(r'^- (\w+)', prompt.split('exactly these fields:')[-1], re.MULTILINE)
+    lines = [f"{field}: {FRONTMATTER_ANSWERS.get(field, _words(20))}" for field in wanted]
+    return "```yaml\n" + '\n'.join(lines) + "\n```"
+
+
+def respond_social(prompt):
+    if '{"text"' in prompt:
+        return json.dumps({"text": _words(180)})
+    count = 6 if 'tweets' in prompt else 3
+    return json.dumps({"items": [f"Point {i}: tail latency matters" for i in range(count)]})
+
+
+def respond_rerank(prompt):
+    return "[0, 1, 2]"
+
+
+ROUTES = [
+    ('Extract all factual claims', respond_extract_claims),
+    ('Verify this claim', respond_verify),
+    ('You are a research assistant preparing', respond_research),
+    ('Fill in frontmatter fields', respond_frontmatter),
+    ('Write social media copy', respond_social),
+    ('internal link candidates', respond_rerank),
+]
+
+
+def canned_response(prompt):
+    for marker, respond in ROUTES:
+        if marker in prompt:
+            return respond(prompt)
+    # Free-text prompts (assistant, lab notes): a paragraph of prose
+    return f"{_words(120)} (https://example.com/source)"
+
+
+class FakeAnthropic:
+    """Server state: delay model, rate limiter and counters"""
+
+    def __init__(self, latency='fixed:0', tokens_per_second=0, rate_limit=0.0, rpm=0, seed=0):
+        self.sample_latency = parse_latency(latency)
+        self.tokens_per_second = tokens_per_second
+        self.rate_limit = rate_limit
+        self.rpm = rpm
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = deque()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stats = {
+                'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'rate_limited': 0,
+                'max_in_flight': 0, 'models': {}
+            }
+            self.in_flight = 0
+
+    def admit(self):
+        """False if this request should get a 429"""
+        with self.lock:
+            now = time.monotonic()
+            while self.window and now - self.window[0] > 60:
+                self.window.popleft()
+            if self.rng.random() < self.rate_limit or (self.rpm and len(self.window) >= self.rpm):
+                self.stats['rate_limited'] += 1
+                return False
+            self.window.append(now)
+            self.in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+            return True
+
+    def handle(self, request):
+        prompt = '\n'.join(
+            m['content'] if isinstance(m['content'], str)
+            else ''.join(b.get('text', '') for b in m['content'])
+            for m in request.get('messages', [])
+        )
+        text = canned_response(prompt)
+        input_tokens = estimate_tokens(prompt + str(request.get('system', '')))
+        output_tokens = min(estimate_tokens(text), request.get('max_tokens', 4096))
+
+        with self.lock:
+            delay = self.sample_latency(self.rng)
+        if self.tokens_per_second:
+            delay += output_tokens / self.tokens_per_second
+        time.sleep(delay)
+
+        model = request.get('model', 'unknown')
+        with self.lock:
+            self.in_flight -= 1
+            self.stats['calls'] += 1
+            self.stats['input_tokens'] += input_tokens
+            self.stats['output_tokens'] += output_tokens
+            self.stats['models'][model] = self.stats['models'].get(model, 0) + 1
+
+        return {
+            'id': f"msg_fake_{self.stats['calls']}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': model,
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens}
+        }
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('content-type', 'application/json')
+            self.send_header('content-length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                with fake.lock:
+                    self._send(200, dict(fake.stats))
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            length = int(self.headers.get('content-length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/reset':
+                fake.reset()
+                self._send(200, {'ok': True})
+            elif self.path.startswith('/v1/messages'):
+                if not fake.admit():
+                    self._send(429, {
+                        'type': 'error',
+                        'error': {'type': 'rate_limit_error', 'message': 'Injected rate limit'}
+                    }, {'retry-after': '0'})
+                    return
+                self._send(200, fake.handle(request))
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_server(fake, port=0):
+    """Serve in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def add_server_args(parser):
+    parser.add_argument('--latency', default='lognormal:0.05,0.3',
+                        help='fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA (seconds)')
+    parser.add_argument('--tps', type=float, default=0, help='Output tokens per second (0 = instant)')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Probability of a 429 per request')
+    parser.add_argument('--rpm', type=int, default=0, help='Requests per minute before 429s (0 = unlimited)')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def fake_from_args(args):
+    return FakeAnthropic(args.latency, args.tps, args.rate_limit, args.rpm, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local fake Anthropic Messages API')
+    parser.add_argument('--port', type=int, default=8765)
+    add_server_args(parser)
+    args = parser.parse_args()
+
+    server, url = start_server(fake_from_args(args), args.port)
+    print(f"Fake Anthropic API on {url} (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,15 +7,85 @@ import sys
 import argparse
 from pathlib import Path
 
+from agents.daemon import forward_to_daemon, run_daemon
+
+# A running daemon already has the agents loaded and warm; hand the command
+# over before paying for the imports below
+if __name__ == '__main__':
+    exit_code = forward_to_daemon(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
 # Agent imports (will create these next)
 from agents.research_prep import research_prep
 from agents.assistant import interactive_assistant
 from agents.finalize import finalize_post
 from agents.intake import run_intake
+from agents.feed import publish_feed, LATEST_DAYS
+from agents.lab_notes import generate_lab_notes, MAX_CONCURRENCY
 from agents.evidence_gate import run_evidence_gate
+from agents.gate_watch import watch_drafts
+from agents.risk_scan import run_site_scan
+from agents.snapshots import run_snapshot
+from agents.preview import run_preview, PAGE_SIZE
+from agents.model_router import run_routes_report
+from agents.profiling import start_profiling, stop_profiling, span, TOP_FUNCTIONS
 
 
-def main():
+def route(args, parsers):
+    """Run the agent for args.command"""
+    if args.command == 'research':
+        if not args.topic and not args.topics_file:
+            parsers['research'].error('provide --topic and/or --topics-file')
+        research_prep(args.topic, args.days, args.min_sources, args.topics_file)
+
+    elif args.command == 'assist':
+        interactive_assistant(args.research, args.draft)
+
+    elif args.command == 'finalize':
+        finalize_post(args.draft, args.skip_gate, args.no_pr, args.rerank_links, not args.no_fail_fast)
+
+    elif args.command == 'intake':
+        run_intake(args.sources)
+
+    elif args.command == 'feed':
+        if args.keep_days < 1:
+            parsers['feed'].error('--keep-days must be at least 1')
+        publish_feed(keep_days=args.keep_days)
+
+    elif args.command == 'lab':
+        generate_lab_notes(args.week, args.year, args.concurrency, force=args.force)
+
+    elif args.command == 'brief':
+        parsers['brief'].print_help()
+        print("\n⚠ Brief command not yet implemented")
+
+    elif args.command == 'gate':
+        if args.watch:
+            watch_drafts([args.draft] if args.draft else None)
+        elif not args.draft:
+            parsers['gate'].error('provide --draft (or --watch to watch content/posts/)')
+        else:
+            run_evidence_gate(args.draft, fail_fast=args.fail_fast)
+
+    elif args.command == 'snapshot':
+        if not args.draft and not args.url:
+            parsers['snapshot'].error('provide --draft and/or --url')
+        run_snapshot(args.draft, args.url, args.refresh)
+
+    elif args.command == 'preview':
+        run_preview(args.research, args.partial, args.page_size)
+
+    elif args.command == 'routes':
+        run_routes_report(args.since)
+
+    elif args.command == 'scan':
+        if not run_site_scan(args.content):
+            sys.exit(1)
+
+
+def build_parser():
+    """The run.py argument parser, plus subparsers route() needs for errors"""
     parser = argparse.ArgumentParser(
         description='TernQED Research Engine CLI',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -24,18 +94,41 @@ Examples:
   # Monday: Prepare research for writing
   python3 run.py research --topic "tail latency in arbitrage"
 
+  # Several topics: intake is loaded once, topics are analyzed in parallel
+  python3 run.py research --topic "tail latency" --topic "queue priority"
+
   # Tuesday-Thursday: Interactive writing assistant
   python3 run.py assist --research data/research/2026-02-24-tail-latency.json
 
   # Friday: Finalize draft and create PR
   python3 run.py finalize --draft content/posts/tail-latency-arbitrage.md
 
+  # Before every build: scan the whole site for risky content
+  python3 run.py scan
+
+  # Where did the time go? CPU profile + Chrome trace of stages and LLM calls
+  python3 run.py --profile finalize --draft content/posts/tail-latency-arbitrage.md
+
+  # Keep clients, caches and indexes warm between commands
+  python3 run.py daemon start
+
   # Daily automation (runs automatically)
   python3 run.py intake
   python3 run.py brief
+  python3 run.py feed
+
+  # Weekly: draft lab notes from the week's intake and research
+  python3 run.py lab
         """
     )
 
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the command: CPU hot spots plus a Chrome trace in data/profiles/')
+    parser.add_argument('--profile-top', type=int, default=TOP_FUNCTIONS,
+                        help='Hot functions to list with --profile')
+    parser.add_argument('--local', action='store_true',
+                        help='Run in this process even if a daemon is running')
+
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
 
     # Research prep command (Monday automation)
@@ -43,7 +136,9 @@ Examples:
         'research',
         help='Prepare research summary for writing (Monday automation)'
     )
-    research_parser.add_argument('--topic', required=True, help='Research topic/angle')
+    research_parser.add_argument('--topic', action='append',
+                                 help='Research topic/angle (repeat for several topics)')
+    research_parser.add_argument('--topics-file', help='File with one topic per line')
     research_parser.add_argument('--days', type=int, default=7, help='Days of intake to analyze')
     research_parser.add_argument('--min-sources', type=int, default=10, help='Minimum relevant sources')
 
@@ -63,6 +158,10 @@ Examples:
     finalize_parser.add_argument('--draft', required=True, help='Path to draft Markdown file')
     finalize_parser.add_argument('--skip-gate', action='store_true', help='Skip evidence gate')
     finalize_parser.add_argument('--no-pr', action='store_true', help='Skip PR creation')
+    finalize_parser.add_argument('--rerank-links', action='store_true',
+                                 help='Let Claude re-rank locally found internal links')
+    finalize_parser.add_argument('--no-fail-fast', action='store_true',
+                                 help='Verify every claim even after the gate has failed')
 
     # Intake command (daily automation)
     intake_parser = subparsers.add_parser(
@@ -71,6 +170,26 @@ Examples:
     )
     intake_parser.add_argument('--sources', help='Path to sources config')
 
+    # Feed command (daily automation)
+    feed_parser = subparsers.add_parser(
+        'feed',
+        help='Publish new intake briefs to the research feed'
+    )
+    feed_parser.add_argument('--keep-days', type=int, default=LATEST_DAYS,
+                             help='Days kept on the latest page before archiving')
+
+    # Lab notes command (weekly automation)
+    lab_parser = subparsers.add_parser(
+        'lab',
+        help="Draft weekly lab notes from the week's intake and research"
+    )
+    lab_parser.add_argument('--week', type=int, help='ISO week number (default: current week)')
+    lab_parser.add_argument('--year', type=int, help='ISO year (default: current year)')
+    lab_parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                            help='Parallel LLM calls (one per domain section)')
+    lab_parser.add_argument('--force', action='store_true',
+                            help="Overwrite the week's existing lab notes")
+
     # Brief command (daily automation)
     brief_parser = subparsers.add_parser(
         'brief',
@@ -83,34 +202,76 @@ Examples:
         'gate',
         help='Run evidence gate on draft'
     )
-    gate_parser.add_argument('--draft', required=True, help='Path to draft')
+    gate_parser.add_argument('--draft', help='Path to draft')
+    gate_parser.add_argument('--watch', action='store_true',
+                             help='Re-gate changed paragraphs on every save (all of content/posts/ without --draft)')
+    gate_parser.add_argument('--fail-fast', action='store_true',
+                             help='Check riskiest claims first and stop at the first blocking failure')
 
-    args = parser.parse_args()
+    # Source snapshot command (offline evidence)
+    snapshot_parser = subparsers.add_parser(
+        'snapshot',
+        help='Store local snapshots of cited source pages'
+    )
+    snapshot_parser.add_argument('--draft', help='Snapshot every source cited in this draft')
+    snapshot_parser.add_argument('--url', action='append', default=[], help='URL to snapshot (repeatable)')
+    snapshot_parser.add_argument('--refresh', action='store_true', help='Re-fetch URLs already stored')
 
-    if not args.command:
-        parser.print_help()
-        sys.exit(1)
+    # Re-render the HTML preview of a research JSON
+    preview_parser = subparsers.add_parser(
+        'preview',
+        help='Render the HTML preview of a research summary'
+    )
+    preview_parser.add_argument('--research', required=True, help='Path to research JSON')
+    preview_parser.add_argument('--partial', action='store_true', help='Mark the preview as partial results')
+    preview_parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Items per HTML page')
 
-    # Route to appropriate agent
-    try:
-        if args.command == 'research':
-            research_prep(args.topic, args.days, args.min_sources)
+    # Model routing config and per-route latency/cost
+    routes_parser = subparsers.add_parser(
+        'routes',
+        help='Show model routes and logged latency/cost per route'
+    )
+    routes_parser.add_argument('--since', help='Only count calls on or after this date (YYYY-MM-DD)')
 
-        elif args.command == 'assist':
-            interactive_assistant(args.research, args.draft)
+    # Risky content scan over the whole site (run before every build)
+    scan_parser = subparsers.add_parser(
+        'scan',
+        help='Scan all content for risky patterns'
+    )
+    scan_parser.add_argument('--content', default='content', help='Content directory to scan')
 
-        elif args.command == 'finalize':
-            finalize_post(args.draft, args.skip_gate, args.no_pr)
+    # Long-running daemon serving the commands above
+    daemon_parser = subparsers.add_parser(
+        'daemon',
+        help='Serve commands from a warm background process'
+    )
+    daemon_parser.add_argument('action', choices=['start', 'stop', 'status'])
 
-        elif args.command == 'intake':
-            run_intake(args.sources)
+    return parser, {'brief': brief_parser, 'snapshot': snapshot_parser, 'gate': gate_parser,
+                    'research': research_parser, 'feed': feed_parser}
 
-        elif args.command == 'brief':
-            brief_parser.print_help()
-            print("\n⚠ Brief command not yet implemented")
 
-        elif args.command == 'gate':
-            run_evidence_gate(args.draft)
+def execute(argv):
+    """Parse argv and run the command (also called by the daemon)"""
+    parser, parsers = build_parser()
+    args = parser.parse_args(argv)
+
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    if args.command == 'daemon':
+        if not run_daemon(args.action, execute):
+            sys.exit(1)
+        return
+
+    if args.profile:
+        start_profiling()
+
+    # Route to appropriate agent
+    try:
+        with span(f"run.py {args.command}", 'command'):
+            route(args, parsers)
 
     except KeyboardInterrupt:
         print("\n\n⊘ Interrupted by user")
@@ -122,6 +283,14 @@ Examples:
         traceback.print_exc()
         sys.exit(1)
 
+    finally:
+        if args.profile:
+            stop_profiling(args.command, top=args.profile_top)
+
+
+def main():
+    execute(sys.argv[1:])
+
 
 if __name__ == '__main__':
     main()
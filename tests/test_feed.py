@@ -0,0 +1,51 @@
+"""Feed page parsing (agents/feed.py)"""
+import json
+from pathlib import Path
+from agents.content_index import split_frontmatter
+from agents.feed import ITEM_LINK_PATTERN, split_days, join_days, publish_feed
+
+
+LATEST = Path(__file__).resolve().parent.parent / 'content' / 'feed' / 'latest.md'
+
+
+def test_latest_round_trip_keeps_every_item():
+    _, body = split_frontmatter(LATEST.read_text())
+    links = ITEM_LINK_PATTERN.findall(body)
+
+    header, days = split_days(body)
+    rendered = join_days(header, days)
+
+    assert len(links) == 27
+    assert sorted(ITEM_LINK_PATTERN.findall(rendered)) == sorted(links)
+    # Repeated date headings are merged, not overwritten
+    assert rendered.count('## 2026-02-21\n') == 1
+
+
+def test_repeated_date_sections_are_merged():
+    body = ("# Feed\n\n## 2026-02-21\n\n### [A](https://a)\n\nx\n\n---\n\n"
+            "## 2026-02-22\n\n### [B](https://b)\n\ny\n\n---\n\n"
+            "## 2026-02-21\n\n### [C](https://c)\n\nz\n\n---\n")
+    header, days = split_days(body)
+    assert header == '# Feed'
+    assert ITEM_LINK_PATTERN.findall(days['2026-02-21']) == ['https://a', 'https://c']
+    assert ITEM_LINK_PATTERN.findall(days['2026-02-22']) == ['https://b']
+
+
+def _write_intake(intake_dir, date, url):
+    intake_dir.mkdir(parents=True, exist_ok=True)
+    brief = {'title': url, 'url': url, 'summary': 's'}
+    (intake_dir / f"{date}.json").write_text(json.dumps({'date': date, 'briefs': [brief]}))
+
+
+def test_keep_days_below_one_publishes_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_intake(tmp_path / 'intake', '2026-02-20', 'https://a')
+    _write_intake(tmp_path / 'intake', '2026-02-21', 'https://b')
+
+    assert publish_feed(tmp_path / 'intake', tmp_path / 'feed', keep_days=0) == 0
+    assert not (tmp_path / 'feed').exists()
+
+    assert publish_feed(tmp_path / 'intake', tmp_path / 'feed', keep_days=1) == 2
+    latest = (tmp_path / 'feed' / 'latest.md').read_text()
+    assert ITEM_LINK_PATTERN.findall(latest) == ['https://b']
+    assert 'date: 2026-02-21' in latest
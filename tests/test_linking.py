@@ -0,0 +1,22 @@
+"""Post permalinks (agents/linking.py)"""
+from pathlib import Path
+from agents.content_index import ContentIndex, urlize
+from agents.linking import page_url
+
+
+CONTENT = Path(__file__).resolve().parent.parent / 'content'
+
+
+def test_post_urls_follow_hugo_title_slugs():
+    index = ContentIndex(CONTENT, cache_path=None).refresh()
+    urls = {Path(entry['path']).stem: page_url(entry) for entry in index.pages('posts')}
+
+    assert urls['jitter-vs-mean-latency'] == '/posts/why-jitter-matters-more-than-mean-latency-in-arbitrage/'
+    assert urls['shannon-limit-financial-markets'] == (
+        '/posts/the-shannon-limit-in-financial-markets-why-speed-alone-wont-save-you/'
+    )
+
+
+def test_urlize_matches_hugo():
+    assert urlize("A - B: C's  d") == 'a--b-cs-d'
+    assert urlize('Café über') == 'café-über'
@@ -0,0 +1,12 @@
+"""Research output naming (agents/research_prep.py)"""
+from agents.research_prep import topic_slugs
+
+
+def test_colliding_topic_slugs_are_disambiguated():
+    long_topic = 'latency ' * 8
+    topics = ['tail latency', 'tail/latency', 'queue priority', long_topic, long_topic + 'extra']
+    slugs = topic_slugs(topics)
+
+    assert slugs['queue priority'] == 'queue-priority'
+    assert len(set(slugs.values())) == len(topics)
+    assert slugs['tail latency'].startswith('tail-latency-')
@@ -0,0 +1,18 @@
+"""Snapshot store (agents/snapshots.py)"""
+from agents import snapshots
+from agents.snapshots import SnapshotStore, snapshot_urls
+
+
+def test_failed_refresh_keeps_stored_snapshot(tmp_path, monkeypatch):
+    store = SnapshotStore(tmp_path)
+    monkeypatch.setattr(snapshots, 'fetch_url', lambda url: (b'<p>evidence</p>', 'text/html', None, False))
+    snapshot_urls(['https://a'], store=store)
+
+    def timeout(url):
+        raise TimeoutError('timed out')
+    monkeypatch.setattr(snapshots, 'fetch_url', timeout)
+    result = snapshot_urls(['https://a'], store=store, refresh=True)
+
+    assert result['https://a']['refresh_error'] == 'timed out'
+    assert store.get_text('https://a') == 'evidence'
+    assert SnapshotStore(tmp_path).get_text('https://a') == 'evidence'